@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import vector_operations as vecop
+
+
+# default settings for the benchmarks are as follows
+
+# default_sizes are the (number of vectors, number of entries per vector) of the sets that are timed
+default_sizes = [(50,50),(200,200),(500,500)]
+# default_precisions are the precisions each engine is timed in, see vecop.precisions
+default_precisions = ["double","mixed"]
+# default_algorithms are the Gram-Schmidt variants each engine is timed with, see vecop.algorithms
+default_algorithms = ["classical","modified","cgs2"]
+# default_repeats is the number of times each benchmark is run, the fastest run is recorded
+default_repeats = 3
+# default_threshold is how much slower (or larger in memory) a benchmark can be than the baseline before it is flagged, 0.25 is 25%
+default_threshold = 0.25
+# the loop engine takes minutes on large sets, so it is only timed when n*n*d is no more than loop_limit
+loop_limit = 200 * 200 * 200
+# the orthogonality error of a benchmark is only flagged when it is above both error_floor and error_factor times the baseline
+error_floor = 1e-12
+error_factor = 10
+# a benchmark is only flagged as slower when it is also at least time_floor seconds slower, as shorter differences are timer noise
+time_floor = 0.001
+
+
+def parser():
+    """
+    Uses the argparse module to add support for a command line interface.
+    """
+
+    parse = argparse.ArgumentParser(description="Time every orthogonalisation engine and file path of vector_operations across a grid of set sizes")
+
+    parse.add_argument('--sizes', nargs = '+', default = None, help = "The sizes of the sets to time, each given as NxD for N vectors of D entries. \ Defaults to 50x50 200x200 500x500")
+
+    parse.add_argument('--engines', nargs = '+', default = None, help = "The engines to time. \ Defaults to every engine in the backends registry")
+
+    parse.add_argument('--precisions', nargs = '+', default = default_precisions, choices = vecop.precisions, help = "The precisions to time each engine in. \ Defaults to double mixed")
+
+    parse.add_argument('--algorithms', nargs = '+', default = default_algorithms, choices = vecop.algorithms, help = "The Gram-Schmidt variants to time each engine with, householder is timed once as it has no variants. \ Defaults to classical modified cgs2")
+
+    parse.add_argument('--kinds', nargs = '+', default = ["real","complex"], choices = ["real","complex"], help = "Whether real and/or complex sets are timed. \ Defaults to both")
+
+    parse.add_argument('--repeats', type = int, default = default_repeats, help = "The number of runs of each benchmark, the fastest is recorded. \ Defaults to 3")
+
+    parse.add_argument('--output', default = None, help = "The name of the JSON file the results are saved to. \ Defaults to printing the results only")
+
+    parse.add_argument('--compare', default = None, help = "The name of a JSON file of earlier results. Any benchmark that is slower, uses more memory or is less orthogonal is flagged")
+
+    parse.add_argument('--threshold', type = float, default = default_threshold, help = "How much slower or larger a benchmark can be than the baseline before it is flagged. \ Defaults to 0.25")
+
+    return parse
+
+
+def make_vector_set(vectors,dimension,complex = False,seed = 0):
+    """
+    Makes a random vector set with the same entries every time for the same arguments.
+
+    Parameters
+    ------------
+    vectors : int
+        The number of vectors in the set.
+    dimension : int
+        The number of entries in each vector.
+    complex : bool
+        True for a set of complex vectors.
+    seed : int
+        The seed of the random number generator.
+
+    Returns
+    ---------
+    vector_set : array
+        A 2-D array where each row is a vector of the set.
+    """
+    generator = np.random.default_rng(seed)
+    vector_set = generator.standard_normal((vectors,dimension))
+    if complex:
+        vector_set = vector_set + 1j * generator.standard_normal((vectors,dimension))
+    return vector_set
+
+
+def measure(function,repeats = default_repeats):
+    """
+    Times a function and finds the peak memory it allocates.
+    The timed runs are carried out without tracemalloc, which slows down allocations, and the peak is found from one more run with it.
+
+    Parameters
+    ------------
+    function : function
+        The function to measure, called without arguments.
+    repeats : int
+        The number of timed runs.
+
+    Returns
+    ---------
+    seconds : float
+        The wall time of the fastest run.
+    peak_bytes : int
+        The largest amount of memory allocated at once during a run.
+    output :
+        The value returned by the function.
+    """
+    seconds = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = function()
+        seconds = min(seconds,time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return seconds, peak_bytes, output
+
+
+def benchmark_key(result):
+    """
+    Gives the settings that identify a benchmark, so that results from different runs can be matched.
+    """
+    return (result["benchmark"],result["engine"],result.get("algorithm"),result["vectors"],result["dimension"],result["complex"],result["precision"])
+
+
+def orthogonalisation_benchmarks(sizes,engines,precisions,kinds,algorithms = default_algorithms,repeats = default_repeats):
+    """
+    Times Vector_Set.orthogonalisation with every engine, algorithm, precision and size.
+    The orthogonality error of the output is found once after the timed runs, so it is not part of the time.
+
+    Parameters
+    ------------
+    sizes : list
+        The (number of vectors, number of entries per vector) of each set.
+    engines : list
+        The names of the engines to time.
+    precisions : list
+        The precisions to time each engine in.
+    kinds : list
+        "real" and/or "complex".
+    algorithms : list
+        The Gram-Schmidt variants to time each engine with. The householder engine has no variants, so it is timed once with an algorithm of None.
+    repeats : int
+        The number of timed runs of each benchmark.
+
+    Returns
+    ---------
+    results : list
+        A dictionary for each benchmark giving its settings, seconds, peak_bytes and orthogonality_error.
+    """
+    results = []
+    for vectors, dimension in sizes:
+        for kind in kinds:
+            vector_set = make_vector_set(vectors,dimension,complex = kind == "complex")
+            for engine in engines:
+                if engine == "loop" and vectors * vectors * dimension > loop_limit:
+                    continue
+                # a set with more vectors than entries is linearly dependent, which the full rank engines cannot orthogonalise
+                if vectors > dimension:
+                    continue
+                for precision in precisions:
+                    # the loop engine is carried out by the numpy engine in any precision other than double
+                    if engine == "loop" and precision != "double":
+                        continue
+                    for algorithm in ([None] if engine == "householder" else algorithms):
+
+                        def run():
+                            return vecop.Vector_Set.orthogonalisation(vector_set,accuracy = False,engine = engine,algorithm = algorithm or "classical",
+                                                                      precision = precision,as_array = True)
+
+                        seconds, peak_bytes, output = measure(run,repeats = repeats)
+                        results.append({"benchmark": "orthogonalisation", "engine": engine, "algorithm": algorithm, "vectors": vectors, "dimension": dimension,
+                                        "complex": kind == "complex", "precision": precision, "seconds": seconds, "peak_bytes": peak_bytes,
+                                        "orthogonality_error": vecop.orthogonality_error(output)})
+    return results
+
+
+def file_benchmarks(sizes,kinds,repeats = default_repeats):
+    """
+    Times the reading and writing of vector sets as CSV and .npy files, and the streaming orthogonalisation of CSV files.
+
+    Parameters
+    ------------
+    sizes : list
+        The (number of vectors, number of entries per vector) of each set.
+    kinds : list
+        "real" and/or "complex".
+    repeats : int
+        The number of timed runs of each benchmark.
+
+    Returns
+    ---------
+    results : list
+        A dictionary for each benchmark giving its settings, seconds and peak_bytes.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        csv_filename = os.path.join(directory,"vector_set.csv")
+        npy_filename = os.path.join(directory,"vector_set.npy")
+        output_filename = os.path.join(directory,"orthogonal_set.csv")
+
+        for vectors, dimension in sizes:
+            for kind in kinds:
+                vector_set = make_vector_set(vectors,dimension,complex = kind == "complex")
+                vector_list = vector_set.tolist()
+
+                file_paths = [("csv_file_creater",lambda: vecop.csv_file_creater(vector_list,csv_filename)),
+                              ("file_parser",lambda: vecop.file_parser(csv_filename)),
+                              ("array_file_parser",lambda: vecop.array_file_parser(csv_filename)),
+                              ("save_vector_set npy",lambda: vecop.save_vector_set(vector_set,npy_filename)),
+                              ("load_vector_set npy",lambda: np.array(vecop.load_vector_set(npy_filename))),
+                              ("stream_orthogonalisation",lambda: vecop.stream_orthogonalisation(csv_filename,output_filename))]
+
+                for name, function in file_paths:
+                    # streaming needs the set to be linearly independent to keep every vector
+                    if name == "stream_orthogonalisation" and vectors > dimension:
+                        continue
+                    seconds, peak_bytes = measure(function,repeats = repeats)[:2]
+                    results.append({"benchmark": name, "engine": None, "algorithm": None, "vectors": vectors, "dimension": dimension, "complex": kind == "complex",
+                                    "precision": None, "seconds": seconds, "peak_bytes": peak_bytes, "orthogonality_error": None})
+    return results
+
+
+def compare(results,baseline,threshold = default_threshold):
+    """
+    Finds the benchmarks that have got worse since the baseline was recorded.
+
+    Parameters
+    ------------
+    results : list
+        The results of this run.
+    baseline : list
+        The results of an earlier run.
+    threshold : float
+        How much slower or larger a benchmark can be than the baseline before it is flagged.
+
+    Returns
+    ---------
+    regressions : list
+        A string describing each regression.
+    """
+    baseline = {benchmark_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        earlier = baseline.get(benchmark_key(result))
+        if earlier is None:
+            continue
+
+        name = describe(result)
+        if result["seconds"] > earlier["seconds"] * (1 + threshold) and result["seconds"] - earlier["seconds"] >= time_floor:
+            regressions.append("{0}: {1:.4f}s is slower than the baseline of {2:.4f}s".format(name,result["seconds"],earlier["seconds"]))
+        if result["peak_bytes"] > earlier["peak_bytes"] * (1 + threshold):
+            regressions.append("{0}: a peak of {1} bytes is larger than the baseline of {2} bytes".format(name,result["peak_bytes"],earlier["peak_bytes"]))
+        if result["orthogonality_error"] is not None and earlier["orthogonality_error"] is not None:
+            if result["orthogonality_error"] > max(error_floor,error_factor * earlier["orthogonality_error"]):
+                regressions.append("{0}: an orthogonality error of {1:.2e} is worse than the baseline of {2:.2e}".format(name,result["orthogonality_error"],earlier["orthogonality_error"]))
+    return regressions
+
+
+def describe(result):
+    """
+    Gives a short name for a benchmark, for example "orthogonalisation numpy-gs cgs2 200x200 complex mixed".
+    """
+    parts = [result["benchmark"]]
+    if result["engine"]:
+        parts.append(result["engine"])
+    if result.get("algorithm"):
+        parts.append(result["algorithm"])
+    parts.append("{0}x{1}".format(result["vectors"],result["dimension"]))
+    parts.append("complex" if result["complex"] else "real")
+    if result["precision"]:
+        parts.append(result["precision"])
+    return " ".join(parts)
+
+
+def parse_sizes(sizes):
+    """
+    Converts sizes given as NxD strings into (N, D) tuples.
+    """
+    parsed = []
+    for size in sizes:
+        try:
+            vectors, dimension = size.lower().split("x")
+            parsed.append((int(vectors),int(dimension)))
+        except ValueError:
+            print("Error: The size {0} should be given as NxD, for example 200x200".format(size))
+            exit()
+    return parsed
+
+
+# run the benchmarks
+if __name__ == "__main__":
+    parsed = parser()
+    given_args = parsed.parse_args()
+
+    sizes = parse_sizes(given_args.sizes) if given_args.sizes else default_sizes
+    engines = given_args.engines if given_args.engines else list(vecop.backends)
+    for engine in engines:
+        if vecop.engine_aliases.get(engine,engine) not in vecop.backends:
+            print("Error: The engine should be one of {0}. An incorrect value of {1} has been inputted".format(list(vecop.backends),engine))
+            exit()
+
+    results = orthogonalisation_benchmarks(sizes,engines,given_args.precisions,given_args.kinds,algorithms = given_args.algorithms,repeats = given_args.repeats)
+    results += file_benchmarks(sizes,given_args.kinds,repeats = given_args.repeats)
+
+    for result in results:
+        error = "" if result["orthogonality_error"] is None else "  orthogonality error {0:.2e}".format(result["orthogonality_error"])
+        print("{0:<62} {1:>10.4f}s {2:>12} bytes{3}".format(describe(result),result["seconds"],result["peak_bytes"],error))
+
+    if given_args.output:
+        summary = {"python": sys.version.split()[0], "numpy": np.__version__, "platform": platform.platform(), "cpu_count": os.cpu_count(), "results": results}
+        with open(given_args.output,"w") as file:
+            json.dump(summary,file,indent = 2)
+        print("The results have been saved to {0}".format(given_args.output))
+
+    if given_args.compare:
+        with open(given_args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results,baseline,threshold = given_args.threshold)
+        if regressions:
+            print("{0} regressions were found against {1}:".format(len(regressions),given_args.compare))
+            for regression in regressions:
+                print(regression)
+            exit(1)
+        print("No regressions were found against {0}".format(given_args.compare))
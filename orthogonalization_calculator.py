@@ -1,4 +1,8 @@
 import argparse 
+import atexit
+import glob
+import os
+import time
 import vector_operations as vecop
 
 
@@ -17,15 +21,114 @@ def parser():
 
     parse = argparse.ArgumentParser(description="Find the orthogonal set of a vector set")
 
-    parse.add_argument('input_type_of_set',type=int,help = "Where the input vector set will come from, 0 is from a file - filename must be provided\ 1 is a manual input")
+    parse.add_argument('input_type_of_set',type=int,nargs = '?',default = None,help = "Where the input vector set will come from, 0 is from a file - filename must be provided\ 1 is a manual input. \ Leave out along with settings and save_output to run --files without any prompts")
 
-    parse.add_argument('settings', type = int, help = "The settings that will be used for the orthogonalisation, 0 is default settings\ 1 is custom settings. \ Defaults to 0 ",default = 0)
+    parse.add_argument('settings', type = int, nargs = '?', help = "The settings that will be used for the orthogonalisation, 0 is default settings\ 1 is custom settings. \ Defaults to 0 ",default = 0)
 
-    parse.add_argument('save_output', type=int, help = "Should the output be saved as a CSV file or not, True will save the output\ False wil not save the output. \ Defaults to True")
+    parse.add_argument('save_output', type=int, nargs = '?', default = 1, help = "Should the output be saved as a CSV file or not, True will save the output\ False wil not save the output. \ Defaults to True")
+
+    parse.add_argument('--files', nargs = '+', help = "The names of several CSV, .npy, .npz or sparse .coo files to orthogonalise in one run instead of entering a single filename. \ Glob patterns such as 'sets/*.csv' can be given. \ Saved outputs are named after each input file")
+
+    parse.add_argument('--output-dir', default = None, help = "The directory the outputs of --files are saved in. \ Defaults to saving each output next to its input")
+
+    parse.add_argument('--output-format', choices = ["csv","npy","npz","coo"], default = None, help = "The file type the outputs of --files are saved as. \ Defaults to the file type of each input")
+
+    parse.add_argument('--accuracy', type = int, default = default_accuracy, help = "The number of decimal places the outputs of --files are rounded to when there are no prompts, 0 for no rounding. \ Defaults to 3")
+
+    parse.add_argument('--not-normalised', action = 'store_true', help = "Give an orthogonal rather than orthonormal set for the outputs of --files when there are no prompts")
+
+    parse.add_argument('--engine', default = None, help = "The engine used for the orthogonalisation, see vector_operations.backends. \ Defaults to numpy-gs for the files given with --files and to loop otherwise")
+
+    parse.add_argument('--algorithm', choices = vecop.algorithms, default = "classical", help = "The variant of the Gram-Schmidt process used for the orthogonalisation. \ Defaults to classical")
+
+    parse.add_argument('--workers', type = int, default = None, help = "The number of processes the files given with --files are split between. \ Defaults to the number of CPU cores")
+
+    parse.add_argument('--out-of-core', action = 'store_true', help = "Orthogonalise the .npy files given with --files with both the input and the orthogonal set memory-mapped, for sets larger than memory. \ Each output is saved as a .npy file")
+
+    parse.add_argument('--memory-budget', type = float, default = None, metavar = 'MB', help = "The number of megabytes of vectors held in memory at once by --out-of-core. \ Defaults to 1024")
+
+    parse.add_argument('--stream', action = 'store_true', help = "Read the CSV file a chunk at a time and write each output vector as soon as it is found, for sets too large to fit in memory. \ Needs input_type_of_set 0 and save_output 1")
+
+    parse.add_argument('--cache-dir', default = None, help = "A directory that orthogonalised sets are saved in, so a set that has been orthogonalised before with the same settings is not worked out again. \ Defaults to no cache")
+
+    parse.add_argument('--precision', choices = vecop.precisions, default = "double", help = "The floating point precision of the orthogonalisation. \ single halves the memory used, mixed works in single precision then refines the result so it is orthogonal to double precision. \ Defaults to double")
+
+    parse.add_argument('--serve', action = 'store_true', help = "Keep running and answer orthogonalisation requests given as one JSON object per line on stdin, writing one JSON response per line to stdout. \ See vector_operations.handle_request for the form of the requests")
+
+    parse.add_argument('--socket', default = None, metavar = 'PATH', help = "Keep running and answer requests sent to a Unix socket at PATH, using the same line protocol as --serve")
+
+    parse.add_argument('--profile', nargs = '?', const = '', default = None, metavar = 'PSTATS_FILE', help = "Print the time, calls, file sizes and peak memory of each stage of the run when it ends. \ If a filename is given the cProfile statistics are also saved to it for the pstats module")
     
     return parse
 
 
+def get_settings(settings):
+    """
+    Retrieves the normalisation and rounding settings depending on the option specified in the CLI by the user.
+
+    Parameters
+    ------------
+    settings : int
+        0 for the default settings, 1 for custom settings that are inputted manually.
+
+    Returns
+    ---------
+    user_normalisation : bool
+        Value of True if an orthonormal set is desired. False if only an orthogonal set is required.
+    user_accuracy : bool, int
+        Value of False if the user does not want rounded entries. Integer value if user requires rounding. The integer is the number of decimal places required.
+    """
+
+    correct_inputs = [0,1,'0','1']
+
+    # obtain the correct settings needed depending on user requirements 
+    if settings == 0:
+        # using default settings
+        user_normalisation = default_normalisation
+        user_accuracy = default_accuracy
+        
+    elif settings == 1:
+        # obtain settings by user input 
+        user_normalisation = input("""Should the resulting orthogonal set be normalised to provide an orthogonal set?
+                                   Type 0 for NO (orthogonal set)
+                                   Type 1 for YES (orthonormal set) """)
+        
+        if user_normalisation not in correct_inputs:
+            print("Error: A value other than 0 or 1 was provided")
+            exit()
+        
+        user_normalisation = int(user_normalisation)
+        user_normalisation = bool(user_normalisation)
+
+        user_accuracy = input("""Should the output vectors be rounded
+                              Type 0 for NO
+                              Type 1 for YES """)
+        if user_accuracy not in correct_inputs:
+            print("Error: A value other than 0 or 1 was provided")
+            exit()
+        
+        user_accuracy = int(user_accuracy)
+        
+        if user_accuracy == 0:
+            user_accuracy = False
+        
+        elif user_accuracy == 1:
+            accuracy_amount = input("Type in the desired extent of rounding in decimal places: ")
+            try:
+                accuracy_amount = int(accuracy_amount)
+            except:
+                print("Error: The input given is not an integer")
+                exit()
+            accuracy_amount = int(accuracy_amount)
+            user_accuracy = accuracy_amount
+        
+    else:
+        print("Error: The settings attribute should only take values of 0 or 1. An incorrect value of {0} has been inputted".format(settings))
+        exit()
+
+    return user_normalisation,user_accuracy
+
+
 def get_input(arguments):
     """ 
     Retrieves the vector set depending on the options specified in the CLI by the user.
@@ -37,8 +140,8 @@ def get_input(arguments):
 
     Returns
     ---------
-    user_vector_set : list
-        The vector set provided by the user.
+    user_vector_set : Vector_Set, Sparse_Vector_Set
+        The vector set provided by the user. A set read from a sparse .coo file is kept sparse.
     user_normalisation : bool
         Value of True if an orthonormal set is desired. False if only an orthogonal set is required.
     user_accuracy : bool, int  
@@ -53,8 +156,6 @@ def get_input(arguments):
     settings = arguments.settings
     save_output = arguments.save_output
 
-    correct_inputs = [0,1,'0','1']
-
     # get the vector set depending on the users requirements
     if input_type == 0:
 
@@ -69,15 +170,18 @@ def get_input(arguments):
             print("Error: The chosen file does not exist in the current directory. Check the filename.")
             exit()
 
-        user_vector_set =  vecop.file_parser(filename = filename)
+        # .npy files are memory-mapped so large sets are not read into memory before they are used
+        user_vector_set =  vecop.load_vector_set(filename = filename)
 
-        # check that the inputted vector set contains the correct dimensions
-        try:
-            vecop.Vector_Set.set_dimensions(user_vector_set)
-        except:
-            print("""Error: There is an error in the dimensions of the inputted set.
-                  Likelihood is that not all vectors have the same number of entries""")
-            exit()
+        # the Vector_Set checks that the inputted vector set contains the correct dimensions when it is made
+        # a sparse set already has its dimensions, and is not made dense so that its memory depends on its nonzero entries only
+        if not isinstance(user_vector_set,vecop.Sparse_Vector_Set):
+            try:
+                user_vector_set = vecop.Vector_Set(user_vector_set)
+            except ValueError:
+                print("""Error: There is an error in the dimensions of the inputted set.
+                      Likelihood is that not all vectors have the same number of entries""")
+                exit()
    
     # obtain the vector set by user input
     elif input_type == 1:
@@ -112,10 +216,10 @@ def get_input(arguments):
         # convert the vector set from a sting into a list
         user_vector_set = eval(user_input)
 
-        # check that the inputted vector set contains the correct dimensions
+        # the Vector_Set checks that the inputted vector set contains the correct dimensions when it is made
         try:
-            vecop.Vector_Set.set_dimensions(user_vector_set)
-        except:
+            user_vector_set = vecop.Vector_Set(user_vector_set)
+        except ValueError:
             print("""Error: There is an error in the dimensions of the inputted set.
                   Likelihood is that not all vectors have the same number of entries""")
             exit()
@@ -124,56 +228,13 @@ def get_input(arguments):
         print("Error: The input_type_of_set attribute should only take values of 0 or 1. An incorrect value of {0} has been inputted".format(input_type))
         exit()
     
-    # obtain the correct settings needed depending on user requirements 
-    if settings == 0:
-        # using default settings
-        user_normalisation = default_normalisation
-        user_accuracy = default_accuracy
-        
-    elif settings == 1:
-        # obtain settings by user input 
-        user_normalisation = input("""Should the resulting orthogonal set be normalised to provide an orthogonal set?
-                                   Type 0 for NO (orthogonal set)
-                                   Type 1 for YES (orthonormal set) """)
-        
-        if user_normalisation not in correct_inputs:
-            print("Error: A value other than 0 or 1 was provided")
-            exit()
-        
-        user_normalisation = int(user_normalisation)
-        user_normalisation = bool(user_normalisation)
-
-        user_accuracy = input("""Should the output vectors be rounded
-                              Type 0 for NO
-                              Type 1 for YES """)
-        if user_accuracy not in correct_inputs:
-            print("Error: A value other than 0 or 1 was provided")
-            exit()
-        
-        user_accuracy = int(user_accuracy)
-        
-        if user_accuracy == 0:
-            user_accuracy = False
-        
-        elif user_accuracy == 1:
-            accuracy_amount = input("Type in the desired extent of rounding in decimal places: ")
-            try:
-                accuracy_amount = int(accuracy_amount)
-            except:
-                print("Error: The input given is not an integer")
-                exit()
-            accuracy_amount = int(accuracy_amount)
-            user_accuracy = accuracy_amount
-        
-    else:
-        print("Error: The settings attribute should only take values of 0 or 1. An incorrect value of {0} has been inputted".format(settings))
-        exit()
+    user_normalisation,user_accuracy = get_settings(settings)
 
     save_output = int(save_output)
 
     if save_output == 1:
         save_output = bool(save_output)
-        user_new_filename = input("Type in the name of the new file. Include .csv file extension at the end: ")
+        user_new_filename = input("Type in the name of the new file. Include the .csv, .npy, .npz or sparse .coo file extension at the end: ")
     elif save_output == 0:
         user_new_filename = False
         save_output = bool(save_output)
@@ -184,17 +245,276 @@ def get_input(arguments):
     return user_vector_set,user_normalisation,user_accuracy,save_output,user_new_filename
 
 
+def expand_filenames(patterns):
+    """
+    Finds the files given with --files, where each can be a filename or a glob pattern.
+
+    Parameters
+    ------------
+    patterns : list
+        The filenames and glob patterns.
+
+    Returns
+    ---------
+    filenames : list
+        The names of the matching files in the order the patterns were given, each pattern sorted by name, without repeats.
+    """
+
+    filenames = []
+    for pattern in patterns:
+        matches = sorted(match for match in glob.glob(pattern) if os.path.isfile(match))
+        if not matches:
+            print("Error: No files match {0}. Check the filename.".format(pattern))
+            exit()
+        filenames += [match for match in matches if match not in filenames]
+
+    return filenames
+
+
+def output_filename(filename,output_directory = None,output_format = None):
+    """
+    Names the output of an input file, for example set.csv is saved as set_orthogonal.csv.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the input file.
+    output_directory : str
+        The directory the output is saved in. Value of None saves it next to the input.
+    output_format : str
+        The file type of the output, "csv", "npy", "npz" or "coo". Value of None uses the file type of the input.
+
+    Returns
+    ---------
+    new_filename : str
+        The name of the output file.
+    """
+
+    stem, extension = os.path.splitext(filename)
+    if output_format:
+        extension = "." + output_format
+    if output_directory is not None:
+        stem = os.path.join(output_directory,os.path.basename(stem))
+
+    return stem + "_orthogonal" + extension
+
+
+def format_set(vector_set):
+    """
+    Gives a vector set as text for printing. A sparse set is given as the nonzero entries of each vector by column, so it is never made dense.
+
+    Parameters
+    ------------
+    vector_set : list, array, Sparse_Vector_Set
+        The vector set to be printed.
+
+    Returns
+    ---------
+    text : str
+        The vector set as text.
+    """
+    if isinstance(vector_set,vecop.Sparse_Vector_Set):
+        return str([dict(zip(*(part.tolist() for part in vector_set.row(index)))) for index in range(len(vector_set))])
+    return str(vector_set)
+
+
+def run_files(arguments):
+    """
+    Orthogonalises every file given with --files, splitting the files between a pool of processes, then prints the time taken for each file.
+    When input_type_of_set, settings and save_output are left out the settings are taken from the options rather than prompts,
+    so many files can be processed in one run from a script.
+
+    Parameters
+    ------------
+    arguments : argparse.Namespace
+        The arguments from the CLI input.
+    """
+
+    if arguments.input_type_of_set is None:
+        # no prompts are used, so the settings come from the options and every output is saved
+        user_normalisation = not arguments.not_normalised
+        user_accuracy = arguments.accuracy if arguments.accuracy > 0 else False
+        save_output = 1
+    elif arguments.input_type_of_set == 0:
+        user_normalisation,user_accuracy = get_settings(arguments.settings)
+        save_output = arguments.save_output
+    else:
+        print("Error: The --files option can only be used with file input, input_type_of_set should be 0")
+        exit()
+
+    engine = vecop.engine_aliases.get(arguments.engine or "numpy-gs",arguments.engine or "numpy-gs")
+    if engine not in vecop.backends:
+        print("Error: The engine should be one of {0}. An incorrect value of {1} has been inputted".format(list(vecop.backends),arguments.engine))
+        exit()
+
+    filenames = expand_filenames(arguments.files)
+
+    if save_output == 1:
+        if arguments.output_dir is not None:
+            os.makedirs(arguments.output_dir,exist_ok = True)
+        output_filenames = [output_filename(filename,arguments.output_dir,arguments.output_format) for filename in filenames]
+        if len(set(output_filenames)) != len(output_filenames):
+            print("Error: Some of the files have the same name, so their outputs would be saved over each other in {0}".format(arguments.output_dir))
+            exit()
+    elif save_output == 0:
+        output_filenames = None
+    else:
+        print("Error: The save_output attribute should only take values of 0 or 1. An incorrect value of {0} has been inputted".format(save_output))
+        exit()
+
+    # NumPy is imported before any timer starts, so the time of the first file does not include the import
+    vecop._import_numpy()
+    if arguments.out_of_core:
+        run_out_of_core(filenames,output_filenames,user_normalisation,user_accuracy,arguments)
+        return
+
+    start = time.perf_counter()
+    orthogonal_sets, file_reports = vecop.orthogonalise_files(filenames,output_filenames = output_filenames,normalised = user_normalisation,accuracy = user_accuracy,
+                                                              engine = engine,algorithm = arguments.algorithm,workers = arguments.workers,precision = arguments.precision,report = True)
+    total_seconds = time.perf_counter() - start
+
+    for position, filename in enumerate(filenames):
+        if output_filenames:
+            print("{0} has been saved to {1}".format(filename,output_filenames[position]))
+        else:
+            print("The orthogonal/orthonormal set of {0} is: ".format(filename))
+            print(format_set(orthogonal_sets[position]))
+
+    # the time of each file is measured inside its worker process
+    print("\n{0:<40} {1:>10} {2:>10} {3:>10}".format("file","vectors","dimension","seconds"))
+    for filename, file_report in zip(filenames,file_reports):
+        print("{0:<40} {1:>10} {2:>10} {3:>10.4f}".format(filename,file_report["vectors"],file_report["dimension"],file_report["seconds"]))
+    print("{0} files were orthogonalised in {1:.4f} seconds".format(len(filenames),total_seconds))
+
+
+def run_out_of_core(filenames,output_filenames,user_normalisation,user_accuracy,arguments):
+    """
+    Orthogonalises each .npy file given with --files in turn with vecop.out_of_core_orthogonalisation, then prints the I/O volume of each file.
+    The files are not split between processes, as each one already uses the whole memory budget.
+
+    Parameters
+    ------------
+    filenames : list
+        The names of the .npy files containing the vector sets.
+    output_filenames : list
+        The names of the .npy files the orthogonal sets are saved to.
+    user_normalisation : bool
+        Value of True if orthonormal sets are desired.
+    user_accuracy : bool, int
+        The number of decimal places the outputs are rounded to, or False for no rounding.
+    arguments : argparse.Namespace
+        The arguments from the CLI input.
+    """
+
+    if output_filenames is None or not all(filename.lower().endswith(".npy") for filename in filenames + output_filenames):
+        print("Error: The --out-of-core option reads and saves .npy files only, so every file should be a .npy file and save_output should be 1")
+        exit()
+    memory_budget = None if arguments.memory_budget is None else int(arguments.memory_budget * 1024 * 1024)
+
+    print("{0:<40} {1:>10} {2:>10} {3:>10} {4:>12} {5:>12}".format("file","vectors","dimension","seconds","MB read","MB written"))
+    for filename, new_filename in zip(filenames,output_filenames):
+        start = time.perf_counter()
+        summary = vecop.out_of_core_orthogonalisation(filename,new_filename,normalised = user_normalisation,accuracy = user_accuracy,
+                                                      algorithm = arguments.algorithm,memory_budget = memory_budget)
+        print("{0:<40} {1:>10} {2:>10} {3:>10.4f} {4:>12.1f} {5:>12.1f}".format(filename,summary["vectors"],summary["dimension"],time.perf_counter() - start,
+                                                                              summary["bytes_read"] / 1024 / 1024,summary["bytes_written"] / 1024 / 1024))
+    for filename, new_filename in zip(filenames,output_filenames):
+        print("{0} has been saved to {1}".format(filename,new_filename))
+
+
+def run_stream(arguments):
+    """
+    Orthogonalises a CSV file with vecop.stream_orthogonalisation, so that the whole vector set is never held in memory.
+
+    Parameters
+    ------------
+    arguments : argparse.Namespace
+        The arguments from the CLI input.
+    """
+
+    if arguments.input_type_of_set != 0 or arguments.save_output != 1:
+        print("Error: The --stream option reads the vector set from a file and writes the output to a file, so input_type_of_set should be 0 and save_output should be 1")
+        exit()
+
+    filename = input("Give the name of the file which contains the vector set: ")
+    if not os.path.isfile(filename):
+        print("Error: The chosen file does not exist in the current directory. Check the filename.")
+        exit()
+
+    user_normalisation,user_accuracy = get_settings(arguments.settings)
+    user_new_filename = input("Type in the name of the new file. Include .csv file extension at the end: ")
+
+    summary = vecop.stream_orthogonalisation(filename,user_new_filename,normalised = user_normalisation,accuracy = user_accuracy,algorithm = arguments.algorithm)
+
+    print("{0} vectors were read and {1} orthogonal/orthonormal vectors have been saved to {2}".format(summary["vectors"],summary["rank"],user_new_filename))
+    if summary["rank"] < summary["vectors"]:
+        print("{0} vectors were left out as they are linearly dependent on the vectors before them".format(summary["vectors"] - summary["rank"]))
+
+
 # run the program 
 if __name__ == "__main__":
     parsed = parser()
     given_args = parsed.parse_args()
-    user_vector_set,user_normalisation,user_accuracy,save_output,user_new_filename = get_input(given_args)
+    if (given_args.out_of_core or given_args.memory_budget is not None) and not given_args.files:
+        parsed.error("--out-of-core and --memory-budget can only be used with --files")
+    if given_args.workers is not None and not given_args.files:
+        parsed.error("--workers can only be used with --files, as a single set is orthogonalised in one process")
+    if given_args.engine is not None and given_args.stream:
+        parsed.error("--engine cannot be used with --stream, which builds the basis one vector at a time")
+
+    # the summary is printed when the program ends, so runs that finish with exit() are also profiled
+    if given_args.profile is not None:
+        vecop.enable_profiling(cprofile = bool(given_args.profile))
+        atexit.register(vecop.report_profile,given_args.profile or None)
+
+    if given_args.serve or given_args.socket:
+        # results are only kept between requests when a cache directory is given
+        cache = vecop.Orthogonalisation_Cache(directory = given_args.cache_dir) if given_args.cache_dir else None
+        if given_args.socket:
+            vecop.serve_socket(given_args.socket,cache = cache)
+        else:
+            vecop.serve_stream(cache = cache)
+        exit()
+    if given_args.files:
+        run_files(given_args)
+        exit()
+    if given_args.input_type_of_set is None:
+        print("Error: Give input_type_of_set, settings and save_output, or give --files to orthogonalise files without any prompts")
+        exit()
+    if given_args.stream:
+        run_stream(given_args)
+        exit()
+
+    with vecop.profile_block("input"):
+        user_vector_set,user_normalisation,user_accuracy,save_output,user_new_filename = get_input(given_args)
+
+    # results are only kept between runs when a cache directory is given
+    if given_args.cache_dir:
+        cache = vecop.Orthogonalisation_Cache(directory = given_args.cache_dir)
+    else:
+        cache = None
+
+    # a set saved to a .npy or .npz file is kept as an array, so its entries are never turned into Python numbers
+    as_array = bool(user_new_filename) and user_new_filename.lower().endswith(vecop.binary_extensions)
+
+    # the orthogonality error is only found when it will be shown, as it takes a product of the whole set with itself
+    report = given_args.precision != "double"
+    orthogonal_set = vecop.Vector_Set.orthogonalisation(input_set=user_vector_set, normalised = user_normalisation, accuracy = user_accuracy, engine = given_args.engine or "loop",
+                                                        algorithm = given_args.algorithm, report = report, cache = cache, precision = given_args.precision, as_array = as_array)
+    if report:
+        orthogonal_set, orthogonalisation_report = orthogonal_set
+
+    if cache is not None and cache.hits:
+        print("The result was found in the cache at {0}".format(given_args.cache_dir))
 
-    orthogonal_set = vecop.Vector_Set.orthogonalisation(input_set=user_vector_set, normalised = user_normalisation, accuracy = user_accuracy)
+    with vecop.profile_block("printing"):
+        print("The orthogonal/orthonormal set is: ")
+        print(format_set(orthogonal_set))
 
-    print("The orthogonal/orthonormal set is: ")
-    print(orthogonal_set)
+    # the orthogonality reached is only shown when it is not double precision by default
+    if report:
+        print("The orthogonality error of the set in {0} precision is {1:.3e}".format(given_args.precision,orthogonalisation_report["orthogonality_error"]))
 
     if user_new_filename:
-        vecop.csv_file_creater(vector_set = orthogonal_set,new_filename = user_new_filename)
+        vecop.save_vector_set(vector_set = orthogonal_set,filename = user_new_filename)
 
@@ -1,3 +1,13 @@
+import io
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import contextlib
+import tracemalloc
+import subprocess
+import numpy as np
 import vector_operations as vecop
 
 def norm_squared_testing():
@@ -66,6 +76,59 @@ def projection_testing():
         proj_count += 1
     return proj_count
 
+def vector_class_testing():
+    """
+    Tests the array-backed Vector class within the vector_operations python script.
+
+    Returns:
+    ---------
+    vector_count : int
+        The number of passed tests.
+    """
+    vector_count = 0
+
+    real_array = np.array([6.0,5.0,8.0])
+    complex_vector = vecop.Vector([1+1j, 2-1j])
+
+    # an existing Vector or float array is wrapped without copying its entries
+    vector = vecop.Vector(real_array)
+    if np.shares_memory(vecop.Vector(vector).data,real_array) and not hasattr(vector,"__dict__"):
+        vector_count += 1
+    # the operations can be called on a Vector as methods
+    if vector.norm_squared() == 125.0 and vector.projection([1.6,5.2,3.1]) == [2.8992,2.416,3.8656]:
+        vector_count += 1
+    if complex_vector.iscomplex and not vecop.Vector([1,2]).iscomplex and complex_vector.dot_product([3-2j, 1+1j]) == 2-2j:
+        vector_count += 1
+
+    return vector_count
+
+def vector_set_class_testing():
+    """
+    Tests the array-backed Vector_Set class within the vector_operations python script.
+
+    Returns:
+    ---------
+    vector_set_count : int
+        The number of passed tests.
+    """
+    vector_set_count = 0
+
+    vector_array = np.array([[1.0,2.0,0.0],[8.0,1.0,6.0],[0.0,0.0,1.0]])
+
+    # an array is used without copying, and slices and rows are views of it
+    vector_set = vecop.Vector_Set(vector_array)
+    if vector_set.all_vectors is vector_array and np.shares_memory(vector_set[1:].all_vectors,vector_array) and np.shares_memory(vector_set[2].data,vector_array):
+        vector_set_count += 1
+    if vector_set.dimensions == (3,3) and not vector_set.contains_complex and vecop.Vector_Set([[1,2],[3,4j]]).contains_complex:
+        vector_set_count += 1
+    # a set with vectors of different lengths is rejected when it is made
+    try:
+        vecop.Vector_Set([[1,2],[3]])
+    except ValueError:
+        vector_set_count += 1
+
+    return vector_set_count
+
 def orthogonalisation_testing():
     """
     Tests the orthogonalisation function within the vector_operations python script.
@@ -96,6 +159,241 @@ def orthogonalisation_testing():
 
     return orth_count
 
+def numpy_engine_testing():
+    """
+    Tests the numpy engine of the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    engine_count : int
+        The number of passed tests.
+    """
+    engine_count = 0
+
+    real_vector_set = [[1,2,0],[8,1,6],[0,0,1]]
+    complex_vector_set = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]]
+
+    # the numpy engine should give the same output as the loop engine
+    if vecop.Vector_Set.orthogonalisation(real_vector_set,normalised=True,accuracy = 3,engine = "numpy") == vecop.Vector_Set.orthogonalisation(real_vector_set,normalised=True,accuracy = 3):
+        engine_count += 1
+    if vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=True,accuracy = 6,engine = "numpy") == vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=True,accuracy = 6):
+        engine_count += 1
+    if vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=False,accuracy = 6,engine = "numpy") == vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=False,accuracy = 6):
+        engine_count += 1
+
+    return engine_count
+
+def blocked_engine_testing():
+    """
+    Tests the blocked engine of the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    blocked_count : int
+        The number of passed tests.
+    """
+    blocked_count = 0
+
+    vector_set1 , set1_ans = [[1,2,0],[8,1,6],[0,0,1]]  , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    ugly_complex_vector_set,set2_ans = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]] , [[(0.838949+0j), (0.083357+0j), 0.537788j], [(-0.090224+0.010522j), (0.706009+0.690705j), (0.123474+0.031319j)], [(-0.529543+0.08659j), (0.003855-0.132343j), (0.114567+0.825489j)]]
+    # a set spread over several panels, with vectors that are not far from each other
+    larger_vector_set = [[1 + ((row*37 + column*101 + row*column*13) % 97)/970 for column in range(60)] for row in range(40)]
+
+    # a block size of 2 means the last vector is projected against a finished panel
+    if vecop.Vector_Set.orthogonalisation(vector_set1,normalised=True,accuracy = 3,engine = "blocked",block_size = 2) == set1_ans:
+        blocked_count += 1
+    if vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,normalised=True,accuracy = 6,engine = "blocked",block_size = 2) == set2_ans:
+        blocked_count += 1
+    if vecop.Vector_Set.orthogonalisation(larger_vector_set,accuracy = False,engine = "blocked",algorithm = "cgs2",report = True,block_size = 8)[1]["orthogonality_error"] < 1e-12:
+        blocked_count += 1
+
+    return blocked_count
+
+def backend_testing():
+    """
+    Tests the householder backend and the backend registry used by the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    backend_count : int
+        The number of passed tests.
+    """
+    backend_count = 0
+
+    vector_set1 , set1_ans = [[1,2,0],[8,1,6],[0,0,1]]  , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    complex_vector_set,set2_ans = [[1,0,1j],[-1,1j,1],[0,-1,1j+1]] , [[0.707,0,0.707j],[-0.354 + 0.354j, 0.707j, 0.354+0.354j],[0.5j, -0.5-0.5j, 0.5]]
+
+    if vecop.Vector_Set.orthogonalisation(vector_set1,normalised=True,accuracy = 3,engine = "householder") == set1_ans:
+        backend_count += 1
+    # the phases of the householder vectors are fixed so the orthogonal (not normalised) set matches the Gram-Schmidt one
+    if vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=True,accuracy = 3,engine = "householder") == set2_ans and vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=False,accuracy = 3,engine = "householder") == vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=False,accuracy = 3):
+        backend_count += 1
+    if vecop.choose_backend(complex = True) == "householder" and vecop.choose_backend(streaming = True) == "numpy-gs":
+        backend_count += 1
+
+    # a set with more vectors than entries should keep every vector with the auto engine, as householder only gives as many vectors as entries,
+    # and a vector that is dependent up to rounding should be marked with nan by householder in the same way as by Gram-Schmidt
+    wide_set = [[(row*7 + column*3) % 5 + row/10 for column in range(3)] for row in range(6)]
+    dependent_set = [[1,2,3],[2,4,6],[0,0,1]]
+    with np.errstate(divide = "ignore",invalid = "ignore"):
+        auto_set = vecop.Vector_Set.orthogonalisation(wide_set,engine = "auto",as_array = True)
+        numpy_set = vecop.Vector_Set.orthogonalisation(wide_set,engine = "numpy-gs",as_array = True)
+        householder_dependent_set = vecop.Vector_Set.orthogonalisation(dependent_set,engine = "householder",as_array = True)
+        numpy_dependent_set = vecop.Vector_Set.orthogonalisation(dependent_set,engine = "numpy-gs",as_array = True)
+    if (vecop.choose_backend(wide = True) == "blocked-gs" and auto_set.shape == (6,3)
+            and np.array_equal(auto_set,numpy_set,equal_nan = True) and np.array_equal(householder_dependent_set,numpy_dependent_set,equal_nan = True)):
+        backend_count += 1
+
+    return backend_count
+
+def rank_revealing_testing():
+    """
+    Tests the rank-revealing mode of the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    rank_count : int
+        The number of passed tests.
+    """
+    rank_count = 0
+
+    # the second vector is a multiple of the first and the fourth is a zero vector
+    dependent_vector_set, set1_ans = [[1,2,0],[2,4,0],[8,1,6],[0,0,0],[0,0,1],[1,1,1]] , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    dependent_complex_vector_set = [[1,1j],[1j,-1],[1,0]]
+
+    orthonormal_set, report = vecop.Vector_Set.orthogonalisation(dependent_vector_set,normalised=True,accuracy = 3,engine = "numpy",tolerance = 1e-10,report = True)
+    if orthonormal_set == set1_ans and report["rank"] == 3 and report["kept_indices"] == [0,2,4]:
+        rank_count += 1
+    # with pivoting the vector with the largest residual is processed first
+    orthonormal_set, report = vecop.Vector_Set.orthogonalisation(dependent_vector_set,normalised=True,accuracy = 3,engine = "numpy",tolerance = 1e-10,pivoting = True,report = True)
+    if report["rank"] == 3 and report["kept_indices"] == [2,1,4] and report["orthogonality_error"] < 1e-12:
+        rank_count += 1
+    orthonormal_set, report = vecop.Vector_Set.orthogonalisation(dependent_complex_vector_set,normalised=True,accuracy = 3,engine = "auto",algorithm = "modified",tolerance = 1e-10,report = True)
+    if orthonormal_set == [[0.707, 0.707j], [0.707, -0.707j]] and report["kept_indices"] == [0,2]:
+        rank_count += 1
+
+    return rank_count
+
+def incremental_basis_testing():
+    """
+    Tests the Incremental_Basis class within the vector_operations python script.
+
+    Returns:
+    ---------
+    incremental_count : int
+        The number of passed tests.
+    """
+    incremental_count = 0
+
+    vector_set1 , set1_ans = [[1,2,0],[8,1,6],[0,0,1]]  , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    complex_vector_set = [[1,0,1j],[-1,1j,1],[0,-1,1j+1]]
+
+    # a capacity of 1 makes the storage grow while the vectors are added
+    basis = vecop.Incremental_Basis(capacity = 1)
+    for vector in vector_set1:
+        basis.add(vector)
+    if [vecop.Vector.vector_round(vector,3) for vector in basis.basis] == set1_ans:
+        incremental_count += 1
+
+    # the coefficients returned rebuild each vector from the basis, and dependent vectors are not added
+    basis = vecop.Incremental_Basis()
+    rebuilt = True
+    for vector in complex_vector_set:
+        coefficients = basis.add(vector)
+        if abs(coefficients @ basis.basis - vector).max() > 1e-12:
+            rebuilt = False
+    if rebuilt and len(basis.add([2,0,2j])) == 3 and basis.rank == 3:
+        incremental_count += 1
+
+    basis = vecop.Incremental_Basis()
+    basis.add([1,0,0])
+    basis.add([1,1,0])
+    if list(basis.project([3,4,5])) == [3,4,0] and list(basis.residual([3,4,5])) == [0,0,5]:
+        incremental_count += 1
+
+    return incremental_count
+
+def batch_testing():
+    """
+    Tests the orthogonalise_batch function within the vector_operations python script.
+
+    Returns:
+    ---------
+    batch_count : int
+        The number of passed tests.
+    """
+    batch_count = 0
+
+    vector_set1 , set1_ans = [[1,2,0],[8,1,6],[0,0,1]]  , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    vector_set2 , set2_ans = [[1,-1,1],[1,0,1],[1,1,2]] , [[0.577, -0.577, 0.577], [0.408, 0.816, 0.408], [-0.707, 0.0, 0.707]]
+    dependent_vector_set = [[1,2,0],[2,4,0],[0,0,1]]
+    complex_vector_set,set4_ans = [[1,0,1j],[-1,1j,1],[0,-1,1j+1]] , [[0.707,0,0.707j],[-0.354 + 0.354j, 0.707j, 0.354+0.354j],[0.5j, -0.5-0.5j, 0.5]]
+
+    orthonormal_sets, ranks = vecop.orthogonalise_batch([vector_set1,vector_set2,dependent_vector_set],normalised = True,accuracy = 3)
+    if orthonormal_sets[:2].tolist() == [set1_ans,set2_ans] and ranks.tolist() == [3,3,2]:
+        batch_count += 1
+    # the linearly dependent vector is given as a zero vector
+    if orthonormal_sets[2].tolist() == [[0.447, 0.894, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 1.0]]:
+        batch_count += 1
+    # a ragged batch gives a list of sets in the input order
+    orthonormal_sets, ranks = vecop.orthogonalise_batch([vector_set1,[[3,4]],complex_vector_set],normalised = True,accuracy = 3)
+    if orthonormal_sets[0].tolist() == set1_ans and orthonormal_sets[1].tolist() == [[0.6,0.8]] and orthonormal_sets[2].tolist() == set4_ans and ranks.tolist() == [3,1,3]:
+        batch_count += 1
+
+    return batch_count
+
+def parallel_testing():
+    """
+    Tests the process pool used by the orthogonalise_batch and orthogonalise_files functions within the vector_operations python script.
+
+    Returns:
+    ---------
+    parallel_count : int
+        The number of passed tests.
+    """
+    parallel_count = 0
+
+    vector_sets = [[[1 + ((batch*7 + row*37 + column*101) % 97)/97 for column in range(6)] for row in range(4)] for batch in range(50)]
+    example_file_ans = [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+
+    # the sets should be returned in the input order, the same as when a single process is used
+    serial_sets, serial_ranks = vecop.orthogonalise_batch(vector_sets,accuracy = 6)
+    parallel_sets, parallel_ranks = vecop.orthogonalise_batch(vector_sets,accuracy = 6,workers = 2)
+    if parallel_sets.tolist() == serial_sets.tolist() and parallel_ranks.tolist() == serial_ranks.tolist():
+        parallel_count += 1
+    if vecop.orthogonalise_files(["example_set.csv","example_set.csv"],workers = 2) == [example_file_ans,example_file_ans]:
+        parallel_count += 1
+
+    return parallel_count
+
+def algorithm_testing():
+    """
+    Tests the modified and cgs2 algorithms and the orthogonality report of the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    algorithm_count : int
+        The number of passed tests.
+    """
+    algorithm_count = 0
+
+    vector_set1 , set1_ans = [[1,2,0],[8,1,6],[0,0,1]]  , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    complex_vector_set,set2_ans = [[1,0,1j],[-1,1j,1],[0,-1,1j+1]] , [[0.707,0,0.707j],[-0.354 + 0.354j, 0.707j, 0.354+0.354j],[0.5j, -0.5-0.5j, 0.5]]
+    # the monomials sampled on a grid are a badly conditioned set which classical Gram-Schmidt fails to orthogonalise
+    ill_conditioned_set = [[(x/40)**power for x in range(41)] for power in range(20)]
+
+    if vecop.Vector_Set.orthogonalisation(vector_set1,normalised=True,accuracy = 3,algorithm = "modified") == set1_ans:
+        algorithm_count += 1
+    if vecop.Vector_Set.orthogonalisation(complex_vector_set,normalised=True,accuracy = 3,engine = "numpy",algorithm = "cgs2") == set2_ans:
+        algorithm_count += 1
+
+    classical_report = vecop.Vector_Set.orthogonalisation(ill_conditioned_set,accuracy = False,engine = "numpy",report = True)[1]
+    cgs2_report = vecop.Vector_Set.orthogonalisation(ill_conditioned_set,accuracy = False,engine = "numpy",algorithm = "cgs2",report = True)[1]
+    if cgs2_report["orthogonality_error"] < 1e-12 and classical_report["orthogonality_error"] > 1e-6:
+        algorithm_count += 1
+
+    return algorithm_count
+
 def file_parser_testing():
     """
     Tests the file_parser function within the vector_operations python script.
@@ -117,15 +415,663 @@ def file_parser_testing():
 
     return file_count
 
+def array_file_parser_testing():
+    """
+    Tests the array_file_parser function within the vector_operations python script.
+
+    Returns:
+    ---------
+    array_file_count : int
+        The number of passed tests.
+    """
+    array_file_count = 0
+
+    example_file_1_output = [[1.0, 2.0, 0.0], [8.0, 1.0, 6.0], [0.0, 0.0, 1.0]]
+    complex_vector_set = np.array([[1+2j, 1e-3, -2.5], [0.5j, 3, 4e5-1j]])
+
+    if vecop.array_file_parser(filename = "example_set.csv").tolist() == example_file_1_output:
+        array_file_count += 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        # a header line is skipped and scientific notation is accepted
+        filename = os.path.join(directory,"scientific_set.csv")
+        with open(filename,"w") as file:
+            file.write("x,y,z\n1e-3,2.5E2,-3\n+4,5,.5\n")
+        if vecop.array_file_parser(filename = filename).tolist() == [[0.001, 250.0, -3.0], [4.0, 5.0, 0.5]]:
+            array_file_count += 1
+
+        # complex files written by NumPy have a leading space and brackets around each entry
+        filename = os.path.join(directory,"numpy_complex_set.csv")
+        np.savetxt(filename,complex_vector_set,delimiter = ",")
+        if np.array_equal(vecop.array_file_parser(filename = filename,chunk_size = 10),complex_vector_set):
+            array_file_count += 1
+
+    return array_file_count
+
+def binary_file_testing():
+    """
+    Tests the load_vector_set and save_vector_set functions within the vector_operations python script.
+
+    Returns:
+    ---------
+    binary_file_count : int
+        The number of passed tests.
+    """
+    binary_file_count = 0
+
+    vector_set1 , set1_ans = [[1,2,0],[8,1,6],[0,0,1]]  , [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+    complex_vector_set = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # a .npy file is memory-mapped and can be orthogonalised directly
+        filename = os.path.join(directory,"vector_set.npy")
+        vecop.save_vector_set(vector_set1,filename)
+        mapped_set = vecop.load_vector_set(filename)
+        if isinstance(mapped_set,np.memmap) and vecop.Vector_Set.orthogonalisation(mapped_set,normalised=True,accuracy = 3,engine = "numpy") == set1_ans:
+            binary_file_count += 1
+
+        # binary files keep every digit of the entries
+        filename = os.path.join(directory,"vector_set.npz")
+        orthonormal_set = vecop.Vector_Set.orthogonalisation(complex_vector_set,accuracy = False,engine = "numpy")
+        vecop.save_vector_set(orthonormal_set,filename)
+        if vecop.load_vector_set(filename).tolist() == orthonormal_set:
+            binary_file_count += 1
+
+        filename = os.path.join(directory,"vector_set.csv")
+        vecop.save_vector_set(set1_ans,filename)
+        with open(filename) as file:
+            if file.read() == "0.447,0.894,0.0\n0.667,-0.333,0.667\n-0.596,0.298,0.745\n":
+                binary_file_count += 1
+
+    return binary_file_count
+
+def stream_testing():
+    """
+    Tests the stream_orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    stream_count : int
+        The number of passed tests.
+    """
+    stream_count = 0
+
+    ugly_complex_vector_set = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_filename = os.path.join(directory,"orthonormal_set.csv")
+        # a chunk size of 1 byte means every line is read as its own chunk
+        summary = vecop.stream_orthogonalisation("example_set.csv",output_filename,chunk_size = 1)
+        if summary == {"vectors": 3, "rank": 3} and vecop.file_parser(output_filename) == [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]:
+            stream_count += 1
+
+        # the output should be the same as orthogonalising the whole set at once
+        filename = os.path.join(directory,"complex_set.csv")
+        vecop.csv_file_creater(ugly_complex_vector_set,filename)
+        vecop.stream_orthogonalisation(filename,output_filename,normalised = False,accuracy = 6)
+        if vecop.file_parser(output_filename) == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,normalised = False,accuracy = 6):
+            stream_count += 1
+
+    return stream_count
+
+def cache_testing():
+    """
+    Tests the Orthogonalisation_Cache class within the vector_operations python script.
+
+    Returns:
+    ---------
+    cache_count : int
+        The number of passed tests.
+    """
+    cache_count = 0
+
+    ugly_complex_vector_set = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]]
+
+    # a repeated set should be taken from the cache and match the uncached output
+    cache = vecop.Orthogonalisation_Cache()
+    first_set = vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = cache)
+    second_set = vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = cache)
+    if first_set == second_set == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set) and cache.hits == 1 and cache.misses == 1:
+        cache_count += 1
+
+    # a cache that only has room for one result should remove the least recently used result,
+    # where each set adds both its rounded result and its unrounded basis
+    small_cache = vecop.Orthogonalisation_Cache(max_bytes = 40)
+    vecop.Vector_Set.orthogonalisation([[1,0],[1,1]],cache = small_cache)
+    vecop.Vector_Set.orthogonalisation([[1,2],[0,1]],cache = small_cache)
+    vecop.Vector_Set.orthogonalisation([[1,0],[1,1]],cache = small_cache)
+    statistics = small_cache.statistics()
+    if statistics["hits"] == 0 and statistics["misses"] == 3 and statistics["evictions"] == 5 and statistics["entries"] == 1:
+        cache_count += 1
+
+    # results saved in a directory should be found by a new cache
+    with tempfile.TemporaryDirectory() as directory:
+        vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,accuracy = 6,cache = vecop.Orthogonalisation_Cache(directory = directory))
+        disk_cache = vecop.Orthogonalisation_Cache(directory = directory)
+        disk_set, disk_report = vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,accuracy = 6,report = True,cache = disk_cache)
+        if disk_set == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,accuracy = 6) and disk_cache.disk_hits == 1 and "orthogonality_error" in disk_report:
+            cache_count += 1
+
+    # a result whose report is missing or whose array is cut short should be a miss, and the directory should be kept under max_disk_bytes
+    # by removing the least recently used files, with no temporary files left behind
+    with tempfile.TemporaryDirectory() as directory:
+        vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = vecop.Orthogonalisation_Cache(directory = directory))
+        for filename in os.listdir(directory):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(directory,filename))
+            elif filename.endswith(".npz"):
+                with open(os.path.join(directory,filename),"r+b") as file:
+                    file.truncate(20)
+        broken_cache = vecop.Orthogonalisation_Cache(directory = directory)
+        broken_set = vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = broken_cache)
+
+    with tempfile.TemporaryDirectory() as directory:
+        limited_cache = vecop.Orthogonalisation_Cache(directory = directory,max_disk_bytes = 3000)
+        for row in range(8):
+            vecop.Vector_Set.orthogonalisation([[row + 1,0,1],[0,1,row],[1,1,1]],cache = limited_cache)
+        directory_bytes = sum(os.path.getsize(os.path.join(directory,filename)) for filename in os.listdir(directory))
+        if (broken_set == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set) and broken_cache.misses == 1 and broken_cache.prefix_hits == 0
+                and directory_bytes <= 3000 and limited_cache.disk_evictions > 0 and not any(filename.endswith(".tmp") for filename in os.listdir(directory))):
+            cache_count += 1
+
+    return cache_count
+
+def prefix_cache_testing():
+    """
+    Tests that the Orthogonalisation_Cache class carries on a set from the cached basis of its first vectors.
+
+    Returns:
+    ---------
+    prefix_count : int
+        The number of passed tests.
+    """
+    prefix_count = 0
+
+    first_set = [[1 + ((row*37 + column*101 + row*column*13) % 97)/970 for column in range(12)] for row in range(8)]
+    longer_set = first_set + [[((row*53 + column*29) % 31)/31 for column in range(12)] for row in range(8,11)]
+
+    # appending vectors to a cached set should only orthogonalise the new vectors, giving the same output as without the cache
+    cache = vecop.Orthogonalisation_Cache()
+    vecop.Vector_Set.orthogonalisation(first_set,accuracy = 8,engine = "numpy-gs",cache = cache)
+    cached_set = vecop.Vector_Set.orthogonalisation(longer_set,accuracy = 8,engine = "numpy-gs",cache = cache)
+    if cached_set == vecop.Vector_Set.orthogonalisation(longer_set,accuracy = 8,engine = "numpy-gs") and cache.prefix_hits == 1 and cache.reused_vectors == 8:
+        prefix_count += 1
+
+    # a set that shares only some of the first vectors of a cached set should reuse the basis of those vectors
+    cache = vecop.Orthogonalisation_Cache()
+    vecop.Vector_Set.orthogonalisation(longer_set,algorithm = "modified",engine = "blocked-gs",block_size = 4,cache = cache)
+    shorter_set = first_set[:5] + longer_set[9:]
+    cached_set = vecop.Vector_Set.orthogonalisation(shorter_set,accuracy = 8,algorithm = "modified",engine = "blocked-gs",block_size = 4,cache = cache)
+    if cached_set == vecop.Vector_Set.orthogonalisation(shorter_set,accuracy = 8,algorithm = "modified",engine = "blocked-gs",block_size = 4) and cache.reused_vectors == 5:
+        prefix_count += 1
+
+    # the unrounded bases saved in a directory should be found by a new cache, also when the loop engine is used
+    with tempfile.TemporaryDirectory() as directory:
+        vecop.Vector_Set.orthogonalisation(first_set,normalised = False,cache = vecop.Orthogonalisation_Cache(directory = directory))
+        disk_cache = vecop.Orthogonalisation_Cache(directory = directory)
+        cached_set = vecop.Vector_Set.orthogonalisation(longer_set,normalised = False,cache = disk_cache)
+        if cached_set == vecop.Vector_Set.orthogonalisation(longer_set,normalised = False) and disk_cache.reused_vectors == 8:
+            prefix_count += 1
+
+    # a set that shares only some of the first vectors of a basis saved by an earlier run should reuse the basis of those vectors
+    with tempfile.TemporaryDirectory() as directory:
+        vecop.Vector_Set.orthogonalisation(longer_set,engine = "numpy-gs",cache = vecop.Orthogonalisation_Cache(directory = directory))
+        disk_cache = vecop.Orthogonalisation_Cache(directory = directory)
+        cached_set = vecop.Vector_Set.orthogonalisation(shorter_set,accuracy = 8,engine = "numpy-gs",cache = disk_cache)
+        if cached_set == vecop.Vector_Set.orthogonalisation(shorter_set,accuracy = 8,engine = "numpy-gs") and disk_cache.prefix_hits == 1 and disk_cache.reused_vectors == 5:
+            prefix_count += 1
+
+    # changing an unrounded array given back by the cache should not change the basis later sets carry on from
+    cache = vecop.Orthogonalisation_Cache()
+    first_array = vecop.Vector_Set.orthogonalisation(first_set,accuracy = False,engine = "numpy-gs",cache = cache,as_array = True)
+    first_array[:] = 0
+    cached_array = vecop.Vector_Set.orthogonalisation(longer_set,accuracy = False,engine = "numpy-gs",cache = cache,as_array = True)
+    fresh_array = vecop.Vector_Set.orthogonalisation(longer_set,accuracy = False,engine = "numpy-gs",as_array = True)
+    if cache.reused_vectors == 8 and np.allclose(cached_array,fresh_array):
+        prefix_count += 1
+
+    return prefix_count
+
+def precision_testing():
+    """
+    Tests the single and mixed precision modes of the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    precision_count : int
+        The number of passed tests.
+    """
+    precision_count = 0
+
+    ugly_complex_vector_set = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]]
+    larger_vector_set = [[1 + ((row*37 + column*101 + row*column*13) % 97)/970 for column in range(60)] for row in range(40)]
+
+    # single precision should give the same rounded set as double precision
+    if vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,precision = "single") == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set):
+        precision_count += 1
+
+    # single precision only reaches single precision orthogonality, the refinement of mixed precision reaches double precision
+    single_report = vecop.Vector_Set.orthogonalisation(larger_vector_set,accuracy = False,engine = "numpy",algorithm = "cgs2",report = True,precision = "single")[1]
+    mixed_set, mixed_report = vecop.Vector_Set.orthogonalisation(larger_vector_set,accuracy = False,engine = "numpy",algorithm = "cgs2",report = True,precision = "mixed")
+    if single_report["orthogonality_error"] > 1e-10 and mixed_report["orthogonality_error"] < 1e-12 and isinstance(mixed_set[0][0],float):
+        precision_count += 1
+
+    # mixed precision should work with every engine and with unnormalised complex sets
+    mixed_sets = [vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,normalised = False,accuracy = 4,engine = engine,precision = "mixed") for engine in ["loop","numpy","blocked","householder"]]
+    if all(mixed_set == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,normalised = False,accuracy = 4) for mixed_set in mixed_sets):
+        precision_count += 1
+
+    # an array in single precision should stay in single precision, halving the memory of the output as well
+    single_arrays = [vecop.Vector_Set.orthogonalisation(vector_set,normalised = False,engine = "numpy",precision = "single",as_array = True)
+                     for vector_set in (larger_vector_set,ugly_complex_vector_set)]
+    if single_arrays[0].dtype == np.float32 and single_arrays[1].dtype == np.complex64:
+        precision_count += 1
+
+    return precision_count
+
+def as_array_testing():
+    """
+    Tests the whole-set rounding and the as_array option of the orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    as_array_count : int
+        The number of passed tests.
+    """
+    as_array_count = 0
+
+    ugly_complex_vector_set = [[3.12,0.31,2j],[-1.21,6.1+6j,1.1329],[3.2342+8.75j,-1.1231,4.3211+75.32j]]
+
+    # the array output should hold the same entries as the list output for every engine
+    if all(np.array_equal(vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,engine = engine,as_array = True),vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,engine = engine))
+           for engine in ["loop","numpy","householder"]):
+        as_array_count += 1
+
+    # an unrounded and unnormalised set from the loop engine should only hold Python numbers
+    orthogonal_set = vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,normalised = False,accuracy = False)
+    if all(isinstance(vector,list) and all(isinstance(entry,complex) for entry in vector) for vector in orthogonal_set):
+        as_array_count += 1
+
+    # changing an array taken from the cache should not change the cached result
+    cache = vecop.Orthogonalisation_Cache()
+    vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = cache,as_array = True)
+    cached_array = vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = cache,as_array = True)
+    cached_array[0,0] = 10
+    if vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set,cache = cache) == vecop.Vector_Set.orthogonalisation(ugly_complex_vector_set) and cache.hits == 2:
+        as_array_count += 1
+
+    return as_array_count
+
+def profiling_testing():
+    """
+    Tests the profiling functions within the vector_operations python script.
+
+    Returns:
+    ---------
+    profiling_count : int
+        The number of passed tests.
+    """
+    profiling_count = 0
+
+    original_file_parser = vecop.file_parser
+    original_projection = vecop.Vector.projection
+
+    # turning on profiling should count the calls, time and bytes read of each stage without changing the output
+    vecop.reset_profiling()
+    vecop.enable_profiling()
+    try:
+        profiled_set = vecop.Vector_Set.orthogonalisation(vecop.file_parser("example_set.csv"))
+        with vecop.profile_block("test block"):
+            pass
+    finally:
+        vecop.disable_profiling()
+    statistics = vecop.profile_statistics()
+    if (profiled_set == [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]] and statistics["file_parser"]["calls"] == 1
+            and statistics["file_parser"]["bytes_read"] == os.path.getsize("example_set.csv") and statistics["projection"]["calls"] == 3
+            and statistics["test block"]["calls"] == 1 and statistics["orthogonalisation"]["peak_bytes"] > 0):
+        profiling_count += 1
+
+    # turning off profiling should put back the original functions and leave nothing running
+    if vecop.file_parser is original_file_parser and vecop.Vector.projection is original_projection and not vecop.profiling_enabled():
+        profiling_count += 1
+
+    # the summary table should have a line for every stage
+    summary = vecop.profile_summary()
+    if all(stage in summary for stage in ["file_parser","projection","orthogonalisation","rounding"]):
+        profiling_count += 1
+    vecop.reset_profiling()
+
+    # the stages run in the worker processes of orthogonalise_files should be added to the totals, without turning on tracemalloc in the workers
+    vecop.enable_profiling()
+    try:
+        vecop.orthogonalise_files(["example_set.csv","example_complex_set.csv"],workers = 2)
+    finally:
+        vecop.disable_profiling()
+    statistics = vecop.profile_statistics()
+    if (statistics["orthogonalise_files"]["calls"] == 1 and statistics["load_vector_set"]["calls"] == 2 and statistics["orthogonalisation"]["calls"] == 2
+            and statistics["load_vector_set"]["peak_bytes"] == 0):
+        profiling_count += 1
+    vecop.reset_profiling()
+
+    return profiling_count
+
+def file_report_testing():
+    """
+    Tests the reports of the orthogonalise_files function within the vector_operations python script.
+
+    Returns:
+    ---------
+    file_report_count : int
+        The number of passed tests.
+    """
+    file_report_count = 0
+
+    # each file should be given its size and the time taken, in the same order as the files
+    orthogonal_sets, file_reports = vecop.orthogonalise_files(["example_set.csv","example_set.csv"],workers = 1,report = True)
+    if (orthogonal_sets[0] == [[0.447, 0.894, 0.0], [0.667, -0.333, 0.667], [-0.596, 0.298, 0.745]]
+            and all(file_report["vectors"] == 3 and file_report["dimension"] == 3 and file_report["seconds"] > 0 for file_report in file_reports)):
+        file_report_count += 1
+
+    # the reports of saved files should be the same when the files are split between processes
+    with tempfile.TemporaryDirectory() as directory:
+        output_filenames = [os.path.join(directory,"orthonormal_set_{0}.npy".format(position)) for position in range(2)]
+        orthogonal_sets, file_reports = vecop.orthogonalise_files(["example_set.csv","example_complex_set.csv"],output_filenames = output_filenames,workers = 2,report = True)
+        if orthogonal_sets == [None,None] and [file_report["vectors"] for file_report in file_reports] == [3,3] and all(os.path.isfile(filename) for filename in output_filenames):
+            file_report_count += 1
+
+    return file_report_count
+
+def server_testing():
+    """
+    Tests the lazy import of NumPy and the server functions within the vector_operations python script.
+
+    Returns:
+    ---------
+    server_count : int
+        The number of passed tests.
+    """
+    server_count = 0
+
+    # importing vector_operations alone should not import NumPy
+    lazy_import = subprocess.run([sys.executable,"-c","import sys, vector_operations; print('numpy' in sys.modules)"],capture_output = True,text = True)
+    if lazy_import.stdout.strip() == "False":
+        server_count += 1
+
+    # a complex set should be given back as its real and imaginary parts, and a bad setting should give an error without ending the server
+    complex_response = vecop.handle_request({"id": 1, "vectors": [[1,0],[0,1]], "imaginary": [[0,1],[0,0]], "accuracy": 4})
+    error_response = vecop.handle_request({"id": 2, "vectors": [[1,0],[0,1]], "engine": "bad"})
+    if (complex_response["vectors"] == [[0.7071, 0.0], [0.0, 0.7071]] and complex_response["imaginary"] == [[0.0, 0.7071], [0.7071, 0.0]]
+            and error_response["id"] == 2 and error_response["error"].startswith("Error: The engine") and not sys.stdin.closed):
+        server_count += 1
+
+    # every line of the stream should be answered in order, including lines that are not valid JSON
+    # and the report should only be worked out and given back when it is asked for
+    requests = io.StringIO('{"id": "a", "vectors": [[1,1,0],[1,0,1],[0,1,1]]}\n\nnot json\n{"id": "b", "vectors": [[3,4]], "accuracy": 1, "report": true}\n')
+    responses = io.StringIO()
+    answered = vecop.serve_stream(requests,responses)
+    responses = [json.loads(line) for line in responses.getvalue().splitlines()]
+    if (answered == 3 and responses[0]["vectors"] == [[0.707, 0.707, 0.0], [0.408, -0.408, 0.816], [-0.577, 0.577, 0.577]] and "report" not in responses[0]
+            and "error" in responses[1] and responses[2] == {"id": "b", "vectors": [[0.6, 0.8]], "report": {"orthogonality_error": 0.0}}):
+        server_count += 1
+
+    return server_count
+
+def async_testing():
+    """
+    Tests the asyncio functions within the vector_operations python script.
+
+    Returns:
+    ---------
+    async_count : int
+        The number of passed tests.
+    """
+    async_count = 0
+
+    generator = np.random.default_rng(4)
+    vector_sets = [generator.standard_normal((3,5)).round(2).tolist() for _ in range(30)]
+    # a linearly dependent set is coalesced, then orthogonalised on its own as the blocking call would be
+    vector_sets.append([[1,2,3],[2,4,6],[0,1,0]])
+
+    async def burst(orthogonaliser):
+        async with orthogonaliser:
+            return await asyncio.gather(*[orthogonaliser.orthogonalise(vector_set,engine = "numpy-gs") for vector_set in vector_sets],
+                                        orthogonaliser.orthogonalise(vector_sets[0],engine = "householder",report = True))
+
+    # small sets arriving together should be coalesced, giving the same sets as the blocking call
+    orthogonaliser = vecop.Async_Orthogonaliser(workers = 2)
+    results = asyncio.run(burst(orthogonaliser))
+    expected = [vecop.Vector_Set.orthogonalisation(vector_set,engine = "numpy-gs") for vector_set in vector_sets]
+    if (all(np.allclose(result,expected_set,atol = 1e-3,equal_nan = True) for result, expected_set in zip(results,expected))
+            and orthogonaliser.coalesced >= 31 and orthogonaliser.batches < 31 and orthogonaliser.requests == 32):
+        async_count += 1
+
+    # a set that is not coalesced should be given exactly as the blocking call gives it, along with its report
+    if results[31] == vecop.Vector_Set.orthogonalisation(vector_sets[0],engine = "householder",report = True):
+        async_count += 1
+
+    # a queue of a single set should still answer every request, and orthogonalise_async should use the default orthogonaliser
+    async def bounded():
+        async with vecop.Async_Orthogonaliser(workers = 1,max_pending = 1,coalesce_size = 0) as orthogonaliser:
+            answers = await asyncio.gather(*[orthogonaliser.orthogonalise(vector_set,as_array = True) for vector_set in vector_sets[:10]])
+        return answers, await vecop.orthogonalise_async([[3,4],[1,0]],normalised = False)
+
+    answers, default_answer = asyncio.run(bounded())
+    if (all(np.array_equal(answer,vecop.Vector_Set.orthogonalisation(vector_set,as_array = True)) for answer, vector_set in zip(answers,vector_sets))
+            and default_answer == [[0.6, 0.8], [0.64, -0.48]]):
+        async_count += 1
+
+    # an incorrect setting should raise a ValueError in the caller without closing stdin, and the orthogonaliser should carry on
+    async def incorrect():
+        errors = 0
+        async with vecop.Async_Orthogonaliser(workers = 2) as orthogonaliser:
+            for settings in ({"engine": "unknown"},{"precision": "quadruple"},{"engine": "householder","tolerance": 1e-10}):
+                try:
+                    await orthogonaliser.orthogonalise(vector_sets[0],**settings)
+                except ValueError:
+                    errors += 1
+            return errors, await orthogonaliser.orthogonalise([[3,4],[1,0]])
+
+    standard_input = sys.stdin
+    errors, answer = asyncio.run(incorrect())
+    if errors == 3 and answer == [[0.6, 0.8], [0.8, -0.6]] and sys.stdin is standard_input and not sys.stdin.closed:
+        async_count += 1
+
+    return async_count
+
+def out_of_core_testing():
+    """
+    Tests the out_of_core_orthogonalisation function within the vector_operations python script.
+
+    Returns:
+    ---------
+    out_of_core_count : int
+        The number of passed tests.
+    """
+    out_of_core_count = 0
+
+    generator = np.random.default_rng(5)
+    real_set = generator.standard_normal((60,80))
+    complex_set = generator.standard_normal((25,30)) + 1j * generator.standard_normal((25,30))
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_filename = os.path.join(directory,"vector_set.npy")
+        output_filename = os.path.join(directory,"orthogonal_set.npy")
+
+        # the memory-mapped basis should match the blocked engine for every algorithm, using many small panels
+        matches = True
+        for algorithm in vecop.algorithms:
+            for vector_set in (real_set,complex_set):
+                np.save(input_filename,vector_set)
+                vecop.out_of_core_orthogonalisation(input_filename,output_filename,normalised = False,accuracy = False,algorithm = algorithm,panel_size = 7)
+                expected = vecop.Vector_Set.orthogonalisation(vector_set,normalised = False,accuracy = False,engine = "blocked-gs",algorithm = algorithm,as_array = True)
+                matches = matches and np.allclose(np.load(output_filename),expected,atol = 1e-12)
+        if matches:
+            out_of_core_count += 1
+
+        # the newest panel and the last tile read are used again, so 6 panels read 7 tiles rather than 15, and the I/O volume adds up
+        np.save(input_filename,real_set)
+        summary = vecop.out_of_core_orthogonalisation(input_filename,output_filename,panel_size = 10)
+        if (summary["panels"] == 6 and summary["tile_reads"] == 7 and summary["bytes_read"] == real_set.nbytes * 2 + 7 * 10 * 80 * 8
+                and summary["bytes_written"] == real_set.nbytes * 2 and np.array_equal(np.load(output_filename),vecop.Vector_Set.orthogonalisation(real_set,engine = "blocked-gs",as_array = True))):
+            out_of_core_count += 1
+
+    return out_of_core_count
+
+def workspace_testing():
+    """
+    Tests the out argument of the orthogonalisation function and the in place numpy engine within the vector_operations python script.
+
+    Returns:
+    ---------
+    workspace_count : int
+        The number of passed tests.
+    """
+    workspace_count = 0
+
+    generator = np.random.default_rng(6)
+    real_set = generator.standard_normal((30,40))
+    complex_set = generator.standard_normal((12,15)) + 1j * generator.standard_normal((12,15))
+
+    # the set written into out should be the set that is otherwise returned, including when out is the input array itself
+    matches = True
+    for vector_set in (real_set,complex_set):
+        for engine in ("numpy-gs","blocked-gs","householder"):
+            out = np.empty_like(vector_set)
+            given = vecop.Vector_Set.orthogonalisation(vector_set,normalised = False,engine = engine,algorithm = "classical",out = out)
+            expected = vecop.Vector_Set.orthogonalisation(vector_set,normalised = False,engine = engine,algorithm = "classical",as_array = True)
+            matches = matches and given is out and np.array_equal(out,expected)
+        overwritten = vector_set.copy()
+        vecop.Vector_Set.orthogonalisation(overwritten,engine = "numpy-gs",algorithm = "modified",out = overwritten)
+        matches = matches and np.array_equal(overwritten,vecop.Vector_Set.orthogonalisation(vector_set,engine = "numpy-gs",algorithm = "modified",as_array = True))
+    if matches:
+        workspace_count += 1
+
+    # the engine should not allocate anything for each vector, so the peak memory should be the workspace of a scratch vector,
+    # the coefficients and norms and, for the modified algorithm, the block of rows, with far less than a vector to spare
+    within_workspace = True
+    for vector_set in (generator.standard_normal((100,5000)),generator.standard_normal((100,5000)) + 1j * generator.standard_normal((100,5000))):
+        vectors, dimension = vector_set.shape
+        for algorithm in vecop.algorithms:
+            workspace = dimension * vector_set.itemsize + vectors * vector_set.itemsize + vectors * 8
+            if algorithm == "modified":
+                workspace += min(vecop.default_block_size,vecop.default_chunk_size // (dimension * vector_set.itemsize)) * dimension * vector_set.itemsize
+            out = np.empty_like(vector_set)
+            tracemalloc.start()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            vecop.Vector_Set.orthogonalisation(vector_set,normalised = False,engine = "numpy-gs",algorithm = algorithm,out = out)
+            peak = tracemalloc.get_traced_memory()[1] - start_memory
+            tracemalloc.stop()
+            within_workspace = within_workspace and peak < workspace + vector_set[0].nbytes // 8
+    if within_workspace:
+        workspace_count += 1
+
+    # an out array of the wrong shape, a real array for a complex set, or an out array in rank-revealing mode should be reported.
+    # exit() closes stdin, so it is given a stand-in
+    errors = 0
+    standard_input = sys.stdin
+    for out, tolerance in ((np.empty((3,3)),None),(np.empty((12,15)),None),(np.empty((12,15),dtype = complex),1e-10)):
+        sys.stdin = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                vecop.Vector_Set.orthogonalisation(complex_set,engine = "numpy-gs",tolerance = tolerance,out = out)
+        except SystemExit:
+            errors += 1
+    sys.stdin = standard_input
+    if errors == 3:
+        workspace_count += 1
+
+    return workspace_count
+
+def sparse_testing():
+    """
+    Tests the Sparse_Vector_Set class and the sparse functions within the vector_operations python script.
+
+    Returns:
+    ---------
+    sparse_count : int
+        The number of passed tests.
+    """
+    sparse_count = 0
+
+    # a COO set with a repeated entry should add the entries together, and the dense set should give the same sparse set
+    coo_set = vecop.Sparse_Vector_Set(([0,2,0,1,0],[3,1,0,4,3],[1.0,2.0,5.0,-1.0,1.0]),dimensions = (3,6))
+    dense_set = [[5,0,0,2,0,0],[0,0,0,0,-1,0],[0,2,0,0,0,0]]
+    from_dense = vecop.Sparse_Vector_Set(dense_set)
+    if (coo_set.toarray().tolist() == dense_set and coo_set.nnz == 4 and from_dense.indptr.tolist() == coo_set.indptr.tolist()
+            and from_dense.indices.tolist() == coo_set.indices.tolist() and vecop.Vector_Set.set_dimensions(coo_set) == (3,6)):
+        sparse_count += 1
+
+    # indicator vectors keep the basis sparse, random entries fill it in and switch to dense arrays, and both should match the dense path
+    generator = np.random.default_rng(7)
+    indicator_set = vecop.Sparse_Vector_Set((np.repeat(np.arange(40),3),generator.integers(0,2000,120),np.ones(120)),dimensions = (40,2000))
+    filled_set = vecop.Sparse_Vector_Set((np.repeat(np.arange(30),4),generator.integers(0,50,120),generator.standard_normal(120) + 1j * generator.standard_normal(120)),dimensions = (30,50))
+    matches = True
+    for vector_set, stays_sparse in ((indicator_set,True),(filled_set,False)):
+        for algorithm in vecop.algorithms:
+            sparse_output, sparse_report = vecop.sparse_orthogonalisation(vector_set,normalised = False,accuracy = False,algorithm = algorithm,report = True)
+            dense_output = vecop.Vector_Set.orthogonalisation(vector_set.toarray(),normalised = False,accuracy = False,engine = "numpy-gs",algorithm = algorithm,as_array = True)
+            matches = (matches and np.allclose(sparse_output.toarray(),dense_output,atol = 1e-12)
+                       and sparse_report["sparse"] == (stays_sparse and algorithm != "modified") and sparse_report["orthogonality_error"] < 1e-12)
+        matches = matches and vecop.Vector_Set.orthogonalisation(vector_set,engine = "numpy-gs").toarray().tolist() == vecop.Vector_Set.orthogonalisation(vector_set.toarray(),engine = "numpy-gs")
+    if matches:
+        sparse_count += 1
+
+    # a sparse CSV file should keep its dimensions, and a sparse file should be orthogonalised into another sparse file
+    with tempfile.TemporaryDirectory() as directory:
+        input_filename = os.path.join(directory,"vector_set.coo")
+        output_filename = os.path.join(directory,"orthogonal_set.coo")
+        vecop.save_vector_set(coo_set,input_filename)
+        loaded_set = vecop.load_vector_set(input_filename)
+        vecop.orthogonalise_files([input_filename],[output_filename],workers = 1)
+        orthogonal_set = vecop.load_vector_set(output_filename)
+        if (loaded_set.dimensions == (3,6) and loaded_set.toarray().tolist() == dense_set and isinstance(orthogonal_set,vecop.Sparse_Vector_Set)
+                and orthogonal_set.toarray().tolist() == vecop.Vector_Set.orthogonalisation(dense_set,engine = "numpy-gs")):
+            sparse_count += 1
+
+    # a sparse set with a million entries per vector should stay sparse through Vector_Set.orthogonalisation, using memory for its nonzero entries only
+    large_set = vecop.Sparse_Vector_Set((np.repeat(np.arange(200),3),generator.integers(0,10**6,600),np.ones(600)),dimensions = (200,10**6))
+    tracemalloc.start()
+    orthogonal_set = vecop.Vector_Set.orthogonalisation(large_set,as_array = True)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if isinstance(orthogonal_set,vecop.Sparse_Vector_Set) and orthogonal_set.dimensions == (200,10**6) and peak < 10**6:
+        sparse_count += 1
+
+    return sparse_count
+
 if __name__ == "__main__":
-    total_tests = 15
+    total_tests = 91
     norm_tests = norm_squared_testing()
     dot_tests = dot_product_testing()
     proj_tests = projection_testing()
+    vector_tests = vector_class_testing()
+    vector_set_tests = vector_set_class_testing()
     orth_tests = orthogonalisation_testing()
+    engine_tests = numpy_engine_testing()
+    blocked_tests = blocked_engine_testing()
+    backend_tests = backend_testing()
+    rank_tests = rank_revealing_testing()
+    incremental_tests = incremental_basis_testing()
+    batch_tests = batch_testing()
+    parallel_tests = parallel_testing()
+    algorithm_tests = algorithm_testing()
     file_tests = file_parser_testing()
+    array_file_tests = array_file_parser_testing()
+    binary_file_tests = binary_file_testing()
+    stream_tests = stream_testing()
+    cache_tests = cache_testing()
+    prefix_tests = prefix_cache_testing()
+    precision_tests = precision_testing()
+    as_array_tests = as_array_testing()
+    profiling_tests = profiling_testing()
+    file_report_tests = file_report_testing()
+    server_tests = server_testing()
+    async_tests = async_testing()
+    out_of_core_tests = out_of_core_testing()
+    workspace_tests = workspace_testing()
+    sparse_tests = sparse_testing()
 
-    total_passed = norm_tests + dot_tests + proj_tests + orth_tests + file_tests
+    total_passed = norm_tests + dot_tests + proj_tests + vector_tests + vector_set_tests + orth_tests + engine_tests + blocked_tests + backend_tests + rank_tests + incremental_tests + batch_tests + parallel_tests + algorithm_tests + file_tests + array_file_tests + binary_file_tests + stream_tests + cache_tests + prefix_tests + precision_tests + as_array_tests + profiling_tests + file_report_tests + server_tests + async_tests + out_of_core_tests + workspace_tests + sparse_tests
     if total_passed == total_tests:
         print("All {0} tests have passed successfully.".format(total_tests))
     else:
@@ -136,8 +1082,56 @@ if __name__ == "__main__":
             print("Error: The dot_product function failed to pass all it's tests.")
         if proj_tests != 2:
             print("Error: The projection function failed to pass all it's tests.")
+        if vector_tests != 3:
+            print("Error: The Vector class failed to pass all it's tests.")
+        if vector_set_tests != 3:
+            print("Error: The Vector_Set class failed to pass all it's tests.")
         if orth_tests != 5: 
             print("Error: The orthogonalisation function failed to pass all it's tests.")
+        if engine_tests != 3:
+            print("Error: The numpy engine failed to pass all it's tests.")
+        if blocked_tests != 3:
+            print("Error: The blocked engine failed to pass all it's tests.")
+        if backend_tests != 4:
+            print("Error: The orthogonalisation backends failed to pass all it's tests.")
+        if rank_tests != 3:
+            print("Error: The rank-revealing mode failed to pass all it's tests.")
+        if incremental_tests != 3:
+            print("Error: The Incremental_Basis class failed to pass all it's tests.")
+        if batch_tests != 3:
+            print("Error: The orthogonalise_batch function failed to pass all it's tests.")
+        if parallel_tests != 2:
+            print("Error: The parallel batch and file functions failed to pass all it's tests.")
+        if algorithm_tests != 3:
+            print("Error: The orthogonalisation algorithms failed to pass all it's tests.")
         if file_tests != 2:
             print("Error: The file_parser function failed to pass all it's tests.")
+        if array_file_tests != 3:
+            print("Error: The array_file_parser function failed to pass all it's tests.")
+        if binary_file_tests != 3:
+            print("Error: The load_vector_set and save_vector_set functions failed to pass all it's tests.")
+        if stream_tests != 2:
+            print("Error: The stream_orthogonalisation function failed to pass all it's tests.")
+        if cache_tests != 4:
+            print("Error: The Orthogonalisation_Cache class failed to pass all it's tests.")
+        if prefix_tests != 5:
+            print("Error: The prefix reuse of the Orthogonalisation_Cache class failed to pass all it's tests.")
+        if precision_tests != 4:
+            print("Error: The single and mixed precision modes failed to pass all it's tests.")
+        if as_array_tests != 3:
+            print("Error: The as_array option of the orthogonalisation function failed to pass all it's tests.")
+        if profiling_tests != 4:
+            print("Error: The profiling functions failed to pass all it's tests.")
+        if file_report_tests != 2:
+            print("Error: The reports of the orthogonalise_files function failed to pass all it's tests.")
+        if server_tests != 3:
+            print("Error: The lazy import and the server functions failed to pass all it's tests.")
+        if async_tests != 4:
+            print("Error: The asyncio functions failed to pass all it's tests.")
+        if out_of_core_tests != 2:
+            print("Error: The out_of_core_orthogonalisation function failed to pass all it's tests.")
+        if workspace_tests != 3:
+            print("Error: The out argument and the in place numpy engine failed to pass all it's tests.")
+        if sparse_tests != 4:
+            print("Error: The sparse vector set functions failed to pass all it's tests.")
     
\ No newline at end of file
@@ -1,26 +1,470 @@
 
 
-import numpy as np 
+import io
 import math
+import os
+import sys
+import json
+import base64
+import time
+import atexit
+import hashlib
+import zipfile
+import tempfile
+import importlib
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager, redirect_stdout
+from functools import cached_property, wraps
+
+
+class _Lazy_Module:
+    """
+    A stand-in for a module that is only imported the first time one of its attributes is used.
+    Importing NumPy takes far longer than anything else the command line interface does before it is needed,
+    so "--help" and checking the arguments do not wait for it.
+    Once the module has been imported the stand-in replaces itself with the module, so later uses cost nothing extra.
+
+    Attributes
+    --------------
+    module_name : str
+        The name the module is imported by, for example "numpy".
+    alias : str
+        The name the module is given in this file, for example "np".
+    """
+
+    def __init__(self,module_name,alias):
+        self.module_name = module_name
+        self.alias = alias
+
+    def __getattr__(self,attribute):
+        module = importlib.import_module(self.module_name)
+        globals()[self.alias] = module
+        return getattr(module,attribute)
+
+
+np = _Lazy_Module("numpy","np")
+concurrent_futures = _Lazy_Module("concurrent.futures","concurrent_futures")
+shared_memory = _Lazy_Module("multiprocessing.shared_memory","shared_memory")
+asyncio = _Lazy_Module("asyncio","asyncio")
+
+
+def _import_numpy():
+    '''
+    Imports NumPy straight away rather than at its first use, for a long-running process where the first request should not wait for it,
+    or before a timer starts so that the import is not counted in the time of whichever stage first uses NumPy.
+
+    Outputs
+    --------
+    version : str
+        The version of NumPy.
+    '''
+    return np.__version__
+
+
+# the variants of the Gram-Schmidt process that can be used
+algorithms = ("classical","modified","cgs2")
+# the floating point precisions that the orthogonalisation can be carried out in
+# single uses float32/complex64, double uses float64/complex128
+# mixed carries out the projections in single precision then refines the basis once in double precision
+precisions = ("single","double","mixed")
+# the number of vectors in each panel of the blocked engine, large enough for the matrix-matrix products to run near peak speed
+# while a panel of a few thousand entries per vector still sits in cache during the projections inside the panel
+default_block_size = 64
+
+
+# the environment variable that turns on profiling when set. A value of 1 prints the profile summary when the program ends,
+# any other value is taken as the name of a file that the cProfile statistics are also saved to
+profile_variable = "VECOP_PROFILE"
+
+# the functions that are timed when profiling is turned on, as (qualified name, stage, name of the argument of a file read, name of the argument of a file written)
+_profiled_functions = []
+# the totals of each stage, see profile_statistics
+_profile_totals = {}
+# the stages that are running, innermost last, each with the memory in use when it started and the highest peak of the stages inside it
+_profile_frames = []
+# the state of the profiler while it is turned on
+_profiler = {"enabled": False, "memory": False, "started_tracemalloc": False, "cprofile": None, "originals": []}
+
+
+def _profile_stage(stage,reads = None,writes = None):
+    '''
+    Marks a function as a stage of the profile. The function itself is returned unchanged,
+    so a marked function costs nothing until enable_profiling swaps in a timed version of it.
+
+    Parameters
+    ------------
+    stage : str
+        The name the function is given in the profile.
+    reads : str
+        The name of the argument holding the file the function reads, whose size is counted as bytes read.
+    writes : str
+        The name of the argument holding the file the function writes, whose size is counted as bytes written.
+    '''
+    def mark(function):
+        _profiled_functions.append((function.__qualname__,stage,reads,writes))
+        return function
+    return mark
+
+
+def _file_size(filename):
+    '''
+    Gives the size of a file in bytes, or 0 if the argument is not the name of a file.
+    '''
+    if isinstance(filename,(str,os.PathLike)) and os.path.isfile(filename):
+        return os.path.getsize(filename)
+    return 0
+
+
+def _start_stage():
+    '''
+    Records the memory in use as a stage starts, keeping the peak reached so far for the stage it is inside.
+    '''
+    if _profiler["memory"]:
+        current, peak = tracemalloc.get_traced_memory()
+        if _profile_frames:
+            _profile_frames[-1][1] = max(_profile_frames[-1][1],peak)
+        tracemalloc.reset_peak()
+        _profile_frames.append([current,current])
+
+
+def _end_stage(stage,seconds,bytes_read,bytes_written):
+    '''
+    Adds the time, files and peak memory of a finished call to the totals of its stage.
+    '''
+    totals = _profile_totals.setdefault(stage,{"calls": 0, "seconds": 0.0, "bytes_read": 0, "bytes_written": 0, "peak_bytes": 0})
+    totals["calls"] += 1
+    totals["seconds"] += seconds
+    totals["bytes_read"] += bytes_read
+    totals["bytes_written"] += bytes_written
+
+    if _profiler["memory"] and _profile_frames:
+        start, inner_peak = _profile_frames.pop()
+        peak = max(inner_peak,tracemalloc.get_traced_memory()[1])
+        totals["peak_bytes"] = max(totals["peak_bytes"],peak - start)
+        if _profile_frames:
+            _profile_frames[-1][1] = max(_profile_frames[-1][1],peak)
+
+
+def _timed(function,stage,reads = None,writes = None):
+    '''
+    Gives a version of a function that adds each of its calls to the profile.
+    '''
+    import inspect
+    signature = inspect.signature(function) if reads or writes else None
+
+    @wraps(function)
+    def timed_function(*args,**kwargs):
+        filenames = signature.bind(*args,**kwargs).arguments if signature is not None else {}
+        bytes_read = _file_size(filenames.get(reads))
+        _start_stage()
+        start = time.perf_counter()
+        try:
+            return function(*args,**kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _end_stage(stage,seconds,bytes_read,_file_size(filenames.get(writes)))
+
+    return timed_function
+
+
+def enable_profiling(memory = True,cprofile = False):
+    '''
+    Turns on profiling, swapping every marked function and every backend for a timed version of it.
+    Each stage records its number of calls, wall time, the bytes of the files it reads and writes and the peak memory it allocates.
+    The time of a stage includes the stages called inside it.
+    The stages run in the worker processes of orthogonalise_files and orthogonalise_batch are timed in each worker and added to the totals,
+    without their peak memory, as tracemalloc would slow down every worker.
+
+    Parameters
+    ------------
+    memory : bool
+        Set to True as default. If value is True then the peak memory of each stage is found with tracemalloc, which slows down every allocation.
+    cprofile : bool
+        Set to False as default. If value is True then cProfile is also run, so that its statistics can be saved with dump_profile.
+    '''
+    if _profiler["enabled"]:
+        return
+    _import_numpy()
+
+    module = sys.modules[__name__]
+    for qualified_name, stage, reads, writes in _profiled_functions:
+        owner = module
+        *owner_names, name = qualified_name.split(".")
+        for owner_name in owner_names:
+            owner = getattr(owner,owner_name)
+        function = getattr(owner,name)
+        _profiler["originals"].append((owner,name,function))
+        setattr(owner,name,_timed(function,stage,reads = reads,writes = writes))
+
+    for name, capabilities in backends.items():
+        for kind in ("function","rank_function"):
+            if capabilities[kind] is not None:
+                _profiler["originals"].append((capabilities,kind,capabilities[kind]))
+                capabilities[kind] = _timed(capabilities[kind],"engine " + name)
+
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _profiler["started_tracemalloc"] = True
+    _profiler["memory"] = memory and tracemalloc.is_tracing()
+
+    if cprofile:
+        import cProfile
+        _profiler["cprofile"] = cProfile.Profile()
+        _profiler["cprofile"].enable()
+
+    _profiler["enabled"] = True
+
+
+def disable_profiling():
+    '''
+    Turns off profiling, putting back the original functions. The totals recorded so far are kept.
+    '''
+    if not _profiler["enabled"]:
+        return
+
+    for owner, name, function in reversed(_profiler["originals"]):
+        if isinstance(owner,dict):
+            owner[name] = function
+        else:
+            setattr(owner,name,function)
+    _profiler["originals"] = []
+
+    if _profiler["cprofile"] is not None:
+        _profiler["cprofile"].disable()
+    if _profiler["started_tracemalloc"]:
+        tracemalloc.stop()
+        _profiler["started_tracemalloc"] = False
+
+    _profile_frames.clear()
+    _profiler["memory"] = False
+    _profiler["enabled"] = False
+
+
+def profiling_enabled():
+    '''
+    Gives True if profiling is turned on.
+    '''
+    return _profiler["enabled"]
+
+
+def reset_profiling():
+    '''
+    Clears the totals recorded so far.
+    '''
+    _profile_totals.clear()
+
+
+@contextmanager
+def profile_block(stage):
+    '''
+    Adds a block of code to the profile as a stage, for example profile_block("input").
+    Does nothing when profiling is turned off.
+
+    Parameters
+    ------------
+    stage : str
+        The name the block is given in the profile.
+    '''
+    if not _profiler["enabled"]:
+        yield
+        return
+
+    _start_stage()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _end_stage(stage,time.perf_counter() - start,0,0)
+
+
+def _start_worker_profiling(enabled):
+    '''
+    Sets up profiling in a worker process of a pool. A forked worker starts with the profiling of the parent process turned on,
+    tracemalloc included, so it is turned off and then turned back on without memory tracing if the parent process is profiling.
+    '''
+    # a worker that is not forked imports this module again, so NumPy is imported before the first file is timed
+    _import_numpy()
+    disable_profiling()
+    reset_profiling()
+    if enabled:
+        enable_profiling(memory = False)
+
+
+def _profiled_call(function,*args):
+    '''
+    Calls a function in a worker process, giving back its result along with the totals of every stage of the call, which are then cleared.
+    '''
+    result = function(*args)
+    statistics = profile_statistics()
+    reset_profiling()
+    return result, statistics
+
+
+def _merge_worker_profile(result,statistics):
+    '''
+    Adds the totals of every stage run in a worker process to the totals of this process, giving back the result of the worker.
+    '''
+    for stage, worker_totals in statistics.items():
+        totals = _profile_totals.setdefault(stage,{"calls": 0, "seconds": 0.0, "bytes_read": 0, "bytes_written": 0, "peak_bytes": 0})
+        for key in ("calls","seconds","bytes_read","bytes_written"):
+            totals[key] += worker_totals[key]
+        totals["peak_bytes"] = max(totals["peak_bytes"],worker_totals["peak_bytes"])
+    return result
+
+
+def profile_statistics():
+    '''
+    Gives the totals of every stage recorded so far.
+
+    Outputs
+    --------
+    statistics : dict
+        For each stage a dictionary of its calls, seconds, bytes_read, bytes_written and peak_bytes.
+    '''
+    return {stage: dict(totals) for stage, totals in _profile_totals.items()}
+
+
+def profile_summary():
+    '''
+    Gives a table of the totals of every stage, slowest first.
+
+    Outputs
+    --------
+    summary : str
+        The table as text.
+    '''
+    lines = ["{0:<32} {1:>9} {2:>11} {3:>14} {4:>14} {5:>14}".format("stage","calls","seconds","bytes read","bytes written","peak bytes")]
+    for stage, totals in sorted(_profile_totals.items(),key = lambda item: item[1]["seconds"],reverse = True):
+        lines.append("{0:<32} {1:>9} {2:>11.4f} {3:>14} {4:>14} {5:>14}".format(stage,totals["calls"],totals["seconds"],totals["bytes_read"],
+                                                                              totals["bytes_written"],totals["peak_bytes"]))
+    return "\n".join(lines)
+
+
+def dump_profile(filename):
+    '''
+    Saves the cProfile statistics to a file that can be read with the pstats module or a viewer such as snakeviz.
+    Profiling must have been turned on with cprofile set to True.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file the statistics are saved to.
+    '''
+    if _profiler["cprofile"] is None:
+        print("Error: cProfile statistics can only be saved when profiling was turned on with cprofile = True")
+        exit()
+    _profiler["cprofile"].dump_stats(filename)
+
+
+def report_profile(filename = None):
+    '''
+    Prints the profile summary to stderr, and saves the cProfile statistics if a filename is given. Used when the program ends.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file the cProfile statistics are saved to. Value of None does not save them.
+    '''
+    print(profile_summary(),file = sys.stderr)
+    if filename:
+        dump_profile(filename)
+
+
+def _is_sparse(vector_set):
+    '''
+    Checks whether a vector set is a Sparse_Vector_Set or a scipy.sparse matrix. A COO tuple is only taken as sparse by Sparse_Vector_Set itself,
+    as it cannot be told apart from a dense set of three vectors.
+    '''
+    return isinstance(vector_set,Sparse_Vector_Set) or hasattr(vector_set,"tocsr")
+
+
+def _settings_error(engine,algorithm,precision,tolerance = None,dimensions = None):
+    '''
+    Checks the settings of Vector_Set.orthogonalisation, which prints the message and exits, while Async_Orthogonaliser raises it instead.
+
+    Parameters
+    ------------
+    engine : str
+        The engine, with any alias already replaced by the name it stands for.
+    algorithm : str
+        The variant of the Gram-Schmidt process.
+    precision : str
+        The floating point precision.
+    tolerance : float
+        The tolerance of rank-revealing mode, or None.
+    dimensions : tuple
+        The number of vectors and entries per vector of the set. Value of None, or an engine of "auto", skips the checks of what the engine supports.
+
+    Outputs
+    --------
+    error : str
+        The message describing the first incorrect setting, or None if every setting is correct.
+    '''
+    if engine != "auto" and engine not in backends:
+        return "Error: The engine should be one of {0}. An incorrect value of {1} has been inputted".format(list(backends),engine)
+    if algorithm not in algorithms:
+        return "Error: The algorithm should be one of {0}. An incorrect value of {1} has been inputted".format(algorithms,algorithm)
+    if precision not in precisions:
+        return "Error: The precision should be one of {0}. An incorrect value of {1} has been inputted".format(precisions,precision)
+    if dimensions is None or engine == "auto":
+        return None
+
+    if dimensions[0] > dimensions[1] and not backends[engine]["wide"]:
+        return "Error: The {0} engine does not support sets with more vectors than entries. Use one of {1}".format(engine,[name for name in backends if backends[name]["wide"]])
+    if tolerance is not None and not backends[engine]["rank_revealing"]:
+        return "Error: The {0} engine does not support rank-revealing mode. Use one of {1}".format(engine,[name for name in backends if backends[name]["rank_revealing"]])
+    return None
+
+
+def _float_or_complex_array(values):
+    '''
+    Converts values to an array of floats or complex numbers. Arrays that are already of one of these types are not copied.
+
+    Parameters
+    ------------
+    values : list, array
+        The values to be converted.
+
+    Outputs
+    --------
+    array : array
+        The values as an array. Integers are converted to floats, and values of mixed types are converted to complex numbers if any value is complex.
+    '''
+    array = np.asarray(values)
+    if array.dtype.kind in "biu":
+        return array.astype(float)
+    if array.dtype.kind not in "fc":
+        try:
+            return array.astype(float)
+        except TypeError:
+            return array.astype(complex)
+    return array
 
 
 class Vector():
     """
     A class used to represent and handle Vectors.
+    The entries are held in a single real or complex NumPy array, and the type is only worked out once when the Vector is made.
+    The methods can also be called on a plain list or array, for example Vector.norm_squared([1,2,3]).
 
     Attributes
     --------------
+    data : array
+        The entries of the vector, as a 1-D array of floats or complex numbers.
     vector_shape : tuple
         The dimensions of the given vector.
-    is_complex : bool
+    iscomplex : bool
         True or False depending on if the vector contains complex numbers or not.
-    real_part : list
-        List of all the real components of each entry in the vector.
-    imaginary_part : list
-        List of all the imaginary components of each entry in the vector.
+    real_part : array
+        The real components of each entry in the vector.
+    imaginary_part : array
+        The imaginary components of each entry in the vector.
     
     """
 
+    __slots__ = ("data",)
+
     def __init__(self,vector):
         """
         Constructs all necessary attributes for the Vector object.
@@ -28,48 +472,45 @@ class Vector():
         Parameters
         -----------
 
-        vector : list
-            The vector that will be passed into the Vector class.
+        vector : list, array, Vector
+            The vector that will be passed into the Vector class. The entries of an existing Vector or of a float or complex array are not copied.
         
         """
 
-        # save the dimensions of the vector as an attribute of the Vector object
-        self.vector_shape = np.shape(vector)
+        if isinstance(vector,Vector):
+            self.data = vector.data
+            return
 
-        # check if the vector has any imaginary components
-        imaginary_component_present = False
-        for entry in vector:
-            if isinstance(entry,complex):
-                imaginary_component_present = True
-        
-        # split the real and imaginary components into seperate lists and make them attributes of the Vector object
-        if imaginary_component_present:
-            real_component = []
-            imaginary_component = []
-            for entry in vector:
-                if not isinstance(entry,complex):
-                    entry = complex(entry)  # as not all entries in the vector may be complex, they should first be converted to the complex type
-
-                real_component.append(entry.real)
-                imaginary_component.append(entry.imag)
-
-            self.real_part = np.array(real_component)
-            self.imaginary_part = np.array(imaginary_component)
-            self.iscomplex = imaginary_component_present
-
-        # if there is no imaginary components then add the real components and make the imaginary component 0 for all entries 
-        else:
-            self.real_part = np.array(vector)
-            self.imaginary_part = np.zeros(self.vector_shape)
-            self.iscomplex = imaginary_component_present
+        self.data = _float_or_complex_array(vector)
+
+    @property
+    def vector_shape(self):
+        return self.data.shape
 
-    def norm_squared(vector):
+    @property
+    def iscomplex(self):
+        return self.data.dtype.kind == "c"
+
+    @property
+    def real_part(self):
+        return self.data.real
+
+    @property
+    def imaginary_part(self):
+        return self.data.imag
+
+    def __array__(self,dtype = None,copy = None):
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype,copy = False)
+
+    def norm_squared(self):
         '''
         Calculates the norm squared of a given vector. 
 
         Parameters
         -------------
-        vector : array 
+        self : Vector, array 
             The vector that the norm squared will be calculated for.
 
         Outputs
@@ -78,20 +519,14 @@ class Vector():
             The norm squared of the vector given. 
         '''
 
-        vector = Vector(vector)
-
-        dimensions = vector.vector_shape
-        sum = 0.0
+        vector = Vector(self)
 
         # if statement checks if the entry is a vector, then adds the square of all entries 
-        if len(dimensions) == 1:
-            for entry_number in range(dimensions[0]):
-                sum += vector.real_part[entry_number]**2
-                sum += vector.imaginary_part[entry_number]**2
-            return sum 
+        if len(vector.vector_shape) == 1:
+            return float(np.vdot(vector.data,vector.data).real)
         
 
-    def dot_product(vector_a,vector_b):
+    def dot_product(self,vector_b):
         '''
         Performs the dot product operation on two vectors.
         Note that if vector inputs are complex then the exact procedure used is the inner product,
@@ -99,9 +534,9 @@ class Vector():
 
         Parameters
         -----------
-        vector_a : array
-            The first vector to be dotted.
-        vector_b : array
+        self : Vector, array
+            The first vector to be dotted. This vector is complex conjugated.
+        vector_b : Vector, array
             The second vector to be dotted.
 
         Outputs
@@ -110,15 +545,12 @@ class Vector():
             The dot product of the two vectors,
         '''
         
-        vector_a1 = Vector(vector_a)
+        vector_a1 = Vector(self)
         vector_b1 = Vector(vector_b)
 
         dimension_a = vector_a1.vector_shape
         dimension_b = vector_b1.vector_shape
 
-        complex_conjugate_a = []
-        
-        
         if len(dimension_a) > 1 or len(dimension_b) > 1:
             print("Error: Unable to dot matrices")
             exit()
@@ -126,57 +558,42 @@ class Vector():
             print("Error: Unable to perform dot operation as vectors are different size") 
             exit()
 
-        # this calculates the dot product of vectors
-        if vector_a1.iscomplex == False and vector_b1.iscomplex == False:
-            sum = 0.0
-            for i in range(dimension_a[0]):
-                sum += (vector_a1.real_part[i] * vector_b1.real_part[i])
-            return sum
-
-        # this will calculate the inner product of vectors as the set involves a complex vector
-        else:
-            if dimension_a == dimension_b:
-                sum = 0.0
-                for i in range(dimension_a[0]):
-                    entry_a = complex(vector_a1.real_part[i],-vector_a1.imaginary_part[i])
-                    entry_b = complex(vector_b1.real_part[i],vector_b1.imaginary_part[i])
-
-                    sum += (entry_a * entry_b)
-                return sum
+        # vdot conjugates the first vector, which gives the inner product of complex vectors and the dot product of real vectors
+        return np.vdot(vector_a1.data,vector_b1.data)
                         
 
-    def projection(projection_vector,vector_affected):  
+    @_profile_stage("projection")
+    def projection(self,vector_affected):  
         '''
         Performs vector projection.
 
         Parameters
         ------------
-        projection_vector : array
+        self : Vector, array
             The vector that the projection will be based from.
 
-        vector_affected : array 
+        vector_affected : Vector, array 
             The vector that will have the projection applied to it.
 
         Returns
         ---------
-        projection : array
+        projection : list
             The vector that is the outcome of the projection.
         '''
 
-        top_line = (Vector.dot_product(projection_vector,vector_affected))/Vector.norm_squared(projection_vector)
-        projection = []
-        for entry in projection_vector:
-            projection.append(top_line * entry)
+        projection_vector = Vector(self)
+        top_line = Vector.dot_product(projection_vector,vector_affected)/Vector.norm_squared(projection_vector)
 
-        return projection  
+        return (top_line * projection_vector.data).tolist()
     
-    def vector_round(vector_to_round,accuracy):
+    @_profile_stage("vector_round")
+    def vector_round(self,accuracy):
         '''
         Rounds all entries in a vector to a given accuracy.
 
         Parameters
         -----------
-        vector_to_round : list
+        self : Vector, list
             The vector that will be rounded.
         accuracy : int
             The number of decimal places that each entry in the vector will be rounded to.
@@ -186,33 +603,18 @@ class Vector():
         vector_to_round : list
             The rounded vector.
         '''
-        vector_to_round = Vector(vector_to_round)
-        dimensions = vector_to_round.vector_shape
-        rounded_vector = []
-
-        # iterate though the real and imaginary components of each vector and round them
-        for val in range(dimensions[0]):
-            vector_to_round.real_part[val] = round(vector_to_round.real_part[val], accuracy)
-            vector_to_round.imaginary_part[val] = round(vector_to_round.imaginary_part[val], accuracy)
-
-        # check if the original vector is complex or not and add the rounded entry to a new list 
-        if vector_to_round.iscomplex == False:
-            for entry in range(dimensions[0]):
-                rounded_vector.append(float(vector_to_round.real_part[entry]))
-        else:
-            for entry in range(dimensions[0]):
-                rounded_vector.append(complex(vector_to_round.real_part[entry],vector_to_round.imaginary_part[entry]))
-
-        return rounded_vector
+        # the real and imaginary components of every entry are rounded together
+        return np.round(Vector(self).data,accuracy).tolist()
 
     
-    def vector_alteration(vector,normalised,accuracy_amount):
+    @_profile_stage("vector_alteration")
+    def vector_alteration(self,normalised,accuracy_amount):
         '''
         Performs the optional alterations of normalisation and rounding to vectors before adding them to the orthogonal/orthonormal set.
 
         Parameters
         -------------
-        vector : array
+        self : Vector, array
             The vector to which the alterations will be made.
         normalised: bool
             Passing True into this argument will normalise the vector. 
@@ -225,12 +627,11 @@ class Vector():
         vector : array
             The now altered vector. The original vector object is altered.
         ''' 
+        vector = self
         if normalised:
+            vector = Vector(self)
             norm = math.sqrt(Vector.norm_squared(vector)) 
-            normalised_vector = []
-            for entry in vector:
-                normalised_vector.append(entry/norm)
-            vector = normalised_vector
+            vector = (vector.data / norm).tolist()
 
         if accuracy_amount:     # if a certain accuracy number is given it will be applied here 
             vector = Vector.vector_round(vector,accuracy = accuracy_amount)
@@ -242,13 +643,17 @@ class Vector():
 class Vector_Set:
     """
     A class used to represent and handle Vectors.
+    The vectors are held as the rows of a single 2-D NumPy array. Indexing a Vector_Set with an integer gives a Vector
+    and with a slice gives a Vector_Set, both of which are views of the same array.
 
     Attributes
     --------------
-    all_vectors : list
-        The original vector set.
+    all_vectors : array
+        The original vector set, one vector per row.
     contains_complex  : bool
-        True or False depending on if any Vectors in the Vector Set contain any complex values.
+        True or False depending on if any Vectors in the Vector Set contain any complex values. Found the first time it is used.
+    dimensions : tuple
+        The dimensions of the vector set. Found the first time it is used.
     """
 
     def __init__(self,vector_set):
@@ -257,20 +662,54 @@ class Vector_Set:
 
         Parameters
         -----------
-        vector_set : list
-            The list of lists which contains all Vectors in the Vector Set.
+        vector_set : list, array, Vector_Set, Sparse_Vector_Set
+            The list of lists which contains all Vectors in the Vector Set. Float and complex arrays and existing Vector_Sets are not copied.
+            A Sparse_Vector_Set or scipy.sparse matrix is made dense.
+
+        Raises
+        --------
+        ValueError
+            If not all vectors in the set have the same number of entries.
         """
 
-        self.all_vectors = vector_set
+        if isinstance(vector_set,Vector_Set):
+            self.all_vectors = vector_set.all_vectors
+            return
+        if _is_sparse(vector_set):
+            vector_set = Sparse_Vector_Set(vector_set).toarray()
 
-        # check if the vector set contains any complex values 
-        contains_complex = False
-        for vector in vector_set:
-            vector = Vector(vector)
-            if vector.iscomplex == True:
-                contains_complex = True
+        # NumPy refuses to make an array from vectors of different lengths, so the check costs nothing extra
+        try:
+            vectors = _float_or_complex_array(vector_set)
+        except ValueError:
+            raise ValueError("Not all vectors in the vector set have the same number of entries")
+
+        if vectors.ndim == 1 and vectors.size == 0:
+            vectors = vectors.reshape(0,0)
+        if vectors.ndim != 2:
+            raise ValueError("The vector set should be a list of vectors, but has dimensions {0}".format(vectors.shape))
+
+        self.all_vectors = vectors
+
+    @cached_property
+    def contains_complex(self):
+        return np.iscomplexobj(self.all_vectors)
+
+    @cached_property
+    def dimensions(self):
+        return self.all_vectors.shape
+
+    def __len__(self):
+        return self.all_vectors.shape[0]
+
+    def __getitem__(self,index):
+        if isinstance(index,slice):
+            return Vector_Set(self.all_vectors[index])
+        return Vector(self.all_vectors[index])
 
-        self.contains_complex = contains_complex
+    def __iter__(self):
+        for row in self.all_vectors:
+            yield Vector(row)
 
     def set_dimensions(input_set):
         """
@@ -278,7 +717,7 @@ class Vector_Set:
 
         Parameters
         -------------
-        input_set : list
+        input_set : list, Vector_Set
             The vector set for which the dimensions will be found.
 
         Outputs
@@ -287,12 +726,12 @@ class Vector_Set:
             The dimensions of the given vector set.
 
         """
-        input_set = Vector_Set(input_set)
-        dimensions = np.shape(input_set.all_vectors)
+        if _is_sparse(input_set):
+            return Sparse_Vector_Set(input_set).dimensions
+        return Vector_Set(input_set).dimensions
 
-        return dimensions
-
-    def orthogonalisation(input_set,normalised = True,accuracy = 3):
+    @_profile_stage("orthogonalisation")
+    def orthogonalisation(input_set,normalised = True,accuracy = 3,engine = "loop",algorithm = "classical",report = False,block_size = None,tolerance = None,pivoting = False,cache = None,precision = "double",as_array = False,out = None):
         """
         Takes in a vector set and outputs the orthogonal set. The orthogonal set can be normalised and all vectors can be rounded to a specific accuracy.
 
@@ -300,17 +739,125 @@ class Vector_Set:
         ------------
         vector_set : list
             A nested list of all vectors present in the vector set.
+            A Sparse_Vector_Set or scipy.sparse matrix can also be given. With the loop, numpy-gs or auto engine
+            in double precision it is orthogonalised by sparse_orthogonalisation, which works on the nonzero entries only for as long as the basis stays sparse,
+            and the orthogonal set is given as a Sparse_Vector_Set whatever the value of as_array, which its toarray method makes dense.
+            Any other settings make the set dense first and give the same dense output as for the dense input.
         normalised : bool
             Set to True as default. If value is True then the orthogonal set will be normalised. If value is False then no final normalisation will occur.
         accuracy : int
-            The number of decimal places to which each entry in the output set will be rounded to. 
-        
+            The number of decimal places to which each entry in the output set will be rounded to.
+        engine : str
+            The backend used to carry out the process, any name in the backends registry can be given.
+            Set to "loop" as default, which uses the Vector projection functions entry by entry.
+            A value of "numpy-gs" (or "numpy") instead works on the whole set as a single 2-D array, which is much faster for large sets.
+            A value of "blocked-gs" (or "blocked") works on panels of block_size vectors at a time using matrix-matrix products, which is fastest for sets of thousands of vectors.
+            A value of "householder" uses the Householder QR factorisation of NumPy, giving the same vectors as Gram-Schmidt without its recurrence.
+            It only works on sets with no more vectors than entries.
+            A value of "auto" uses the backend given by choose_backend for the set.
+        algorithm : str
+            Set to "classical" as default, which projects every vector against the original input vector.
+            A value of "modified" projects against the running residual instead, which keeps more orthogonality on ill-conditioned sets.
+            A value of "cgs2" repeats the classical projections a second time, giving the orthogonality of "modified" at the cost of twice the projections.
+        report : bool
+            Set to False as default. If value is True then a dictionary describing the run is returned alongside the set.
+            The "orthogonality_error" key gives the loss of orthogonality of the unrounded set, see orthogonality_error.
+        block_size : int
+            The number of vectors in each panel of the blocked engine. Defaults to default_block_size when None.
+        tolerance : float
+            Set to None as default. If a value is given then the set is orthogonalised in rank-revealing mode, which needs a rank-revealing engine.
+            A vector is dropped from the set when the norm of what is left after its projections is below tolerance times its original norm.
+            The "rank" and "kept_indices" keys of the report give the number of vectors kept and their positions in the input set.
+        pivoting : bool
+            Set to False as default. Only used in rank-revealing mode. If value is True then the remaining vector with the largest residual is processed next,
+            so the output vectors are in the order given by "kept_indices" rather than the input order.
+        cache : Orthogonalisation_Cache
+            Set to None as default. If a cache is given then a set that has been orthogonalised before with the same settings is taken from the cache,
+            and a new result is added to it. A set that starts with the vectors of a cached set is carried on from the cached basis,
+            so only the vectors after the longest cached prefix are orthogonalised.
+        precision : str
+            Set to "double" as default, which carries out the process with float64 or complex128 entries.
+            A value of "single" uses float32 or complex64 entries, halving the memory used at the cost of orthogonality.
+            A value of "mixed" carries out the projections in single precision then refines the basis once in double precision,
+            so the set is orthogonal to double precision. The "orthogonality_error" key of the report gives the orthogonality that was reached.
+            In rank-revealing mode with single or mixed precision the tolerance should be above the single precision rounding of about 1e-6.
+        as_array : bool
+            Set to False as default. If value is True then the orthogonal set is returned as a 2-D NumPy array instead of a nested list,
+            which saves turning every entry into a Python float or complex number for large sets.
+            Only the loop engine needs double precision, so the numpy engine is used in its place for the other precisions.
+        out : array
+            Set to None as default. A float or complex 2-D array of the same shape as the set that the orthogonal set is written into and returned,
+            in place of a new list or array. It can be the input array itself, which is then overwritten.
+            With the numpy-gs and blocked-gs engines in double precision the basis is built in it directly, working on each vector in place,
+            so no arrays are allocated for each vector. The numpy engine is used in place of the loop engine.
+            It cannot be used in rank-revealing mode, where the number of output vectors is only known once the set is orthogonalised.
+
         Outputs
         --------
-        orthogonal_set : list
-            The final orthogonal or orthonormal set. 
+        orthogonal_set : list, array, Sparse_Vector_Set
+            The final orthogonal or orthonormal set.
+        orthogonalisation_report : dict
+            Only returned when report is True.
         """
+        engine = engine_aliases.get(engine,engine)
+        error = _settings_error(engine,algorithm,precision)
+        if error is not None:
+            print(error)
+            exit()
+
+        if _is_sparse(input_set) and engine in ("loop","numpy-gs","auto") and tolerance is None and precision == "double" and cache is None and out is None:
+            # the set is kept sparse, as a dense copy of a set with many entries per vector may not fit in memory
+            if report:
+                orthogonal_set, orthogonalisation_report = sparse_orthogonalisation(input_set,normalised = normalised,accuracy = accuracy,algorithm = algorithm,report = True)
+                return orthogonal_set, {"orthogonality_error": orthogonalisation_report["orthogonality_error"]}
+            return sparse_orthogonalisation(input_set,normalised = normalised,accuracy = accuracy,algorithm = algorithm)
+
         vector_set = Vector_Set(input_set)
+        if out is not None and (out.shape != vector_set.dimensions or out.dtype.kind not in "fc" or (vector_set.contains_complex and out.dtype.kind != "c")):
+            print("Error: The out array should be a float or complex array of shape {0}, complex if the set is complex. An array of shape {1} and type {2} has been inputted".format(
+                vector_set.dimensions,out.shape,out.dtype))
+            exit()
+        if out is not None and tolerance is not None:
+            print("Error: The out argument cannot be used in rank-revealing mode, as the set may have fewer independent vectors than the {0} rows of out".format(len(out)))
+            exit()
+
+        wide = vector_set.dimensions[0] > vector_set.dimensions[1]
+        if engine == "auto":
+            engine = choose_backend(complex = vector_set.contains_complex,rank_revealing = tolerance is not None,wide = wide)
+        error = _settings_error(engine,algorithm,precision,tolerance = tolerance,dimensions = vector_set.dimensions)
+        if error is not None:
+            print(error)
+            exit()
+        # the numpy engine gives the same vectors as the loop engine and works in any precision and in place
+        if engine == "loop" and (precision != "double" or out is not None):
+            engine = "numpy-gs"
+
+        if cache is not None:
+            return _cached_orthogonalisation(vector_set,cache,normalised = normalised,accuracy = accuracy,engine = engine,algorithm = algorithm,
+                                             report = report,block_size = block_size,tolerance = tolerance,pivoting = pivoting,precision = precision,as_array = as_array,out = out)
+
+        if engine != "loop":
+            vectors = _vector_set_array(vector_set,precision = precision)
+            if tolerance is None and out is not None and backends[engine]["in_place"] and out.dtype == vectors.dtype and out.flags.c_contiguous:
+                basis, norms = backends[engine]["function"](vectors,algorithm = algorithm,block_size = block_size,out = out)
+            elif tolerance is None:
+                basis, norms = backends[engine]["function"](vectors,algorithm = algorithm,block_size = block_size)
+            else:
+                basis, norms, kept_indices = backends[engine]["rank_function"](vectors,algorithm = algorithm,tolerance = tolerance,pivoting = pivoting)
+            if precision == "mixed":
+                basis, norms = _refine_basis(basis,norms)
+
+            if report:
+                orthogonalisation_report = {"orthogonality_error": orthogonality_error(basis)}
+                if tolerance is not None:
+                    orthogonalisation_report["rank"] = len(kept_indices)
+                    orthogonalisation_report["kept_indices"] = kept_indices.tolist()
+
+            orthogonal_set = _finish_orthogonalisation(basis,norms,normalised = normalised,accuracy = accuracy,as_array = as_array,out = out)
+
+            if report:
+                return orthogonal_set, orthogonalisation_report
+            return orthogonal_set
 
         orthogonal_set = []
         for i in list(enumerate(vector_set.all_vectors)):   # enumerate all vectors in the set to give a number to all the vectors (useful when perfoming all required projections)
@@ -321,7 +868,7 @@ class Vector_Set:
                 else:
                     vector1 = np.array(i[1],dtype = complex)
 
-                orthogonal_set.append(Vector.vector_alteration(vector1,normalised=True,accuracy_amount=False))
+                orthogonal_set.append(vector1 / math.sqrt(Vector.norm_squared(vector1)))
 
             else:
                 # this will produce a list of the sum of all projections that have to be applied (called vector_to_subtract)
@@ -334,86 +881,2847 @@ class Vector_Set:
                     vector_to_subtract = np.zeros(dimensions,dtype=complex)
                     original_vector = np.array(i[1],dtype=complex)
 
-                for x in range(i[0]):
-                    vector_to_subtract += Vector.projection(orthogonal_set[x],original_vector)
+                if algorithm == "modified":
+                    # each projection is taken from the running residual rather than the original vector
+                    new_vector = original_vector
+                    for x in range(i[0]):
+                        new_vector = new_vector - Vector.projection(orthogonal_set[x],new_vector)
+                else:
+                    for x in range(i[0]):
+                        vector_to_subtract += Vector.projection(orthogonal_set[x],original_vector)
+
+                    new_vector = original_vector - vector_to_subtract
 
-                new_vector = original_vector - vector_to_subtract
-                orthogonal_set.append(Vector.vector_alteration(new_vector,normalised=False,accuracy_amount=False))
+                    # cgs2 repeats the classical projections on the residual to remove what the first pass missed
+                    if algorithm == "cgs2":
+                        vector_to_subtract = np.zeros(dimensions,dtype=new_vector.dtype)
+                        for x in range(i[0]):
+                            vector_to_subtract += Vector.projection(orthogonal_set[x],new_vector)
+                        new_vector = new_vector - vector_to_subtract
 
-        # normalise the vector set if required and also round the entire set if an accuracy argument is given
-        if normalised or accuracy:
-            for index in range(len(orthogonal_set)):
-                orthogonal_set[index] = Vector.vector_alteration(orthogonal_set[index],normalised = normalised,accuracy_amount=accuracy)
-                
+                orthogonal_set.append(new_vector)
+
+        orthogonal_array = np.array(orthogonal_set,dtype = complex if vector_set.contains_complex else float).reshape(vector_set.dimensions)
+        if report:
+            orthogonalisation_report = {"orthogonality_error": orthogonality_error(orthogonal_array)}
+
+        # normalise the vector set if required, dividing every vector by its norm at once
+        if normalised and len(orthogonal_array) > 0:
+            orthogonal_array = orthogonal_array / np.sqrt(np.einsum("ij,ij->i",orthogonal_array.conj(),orthogonal_array).real)[:,np.newaxis]
+
+        orthogonal_set = _round_set(orthogonal_array,accuracy = accuracy,as_array = as_array)
+
+        if report:
+            return orthogonal_set, orthogonalisation_report
         return orthogonal_set
 
 
-def file_parser(filename,delimiter = ","):
+@_profile_stage("rounding")
+def _round_set(vectors,accuracy = 3,as_array = False):
     '''
-    Parses a CSV file and converts the vector set within the file to a nested list.
-    Compatible with vector set files output by NumPy. 
+    Rounds every entry of a vector set at once and gives it in the form asked for by Vector_Set.orthogonalisation.
+    The real and imaginary parts of complex entries are rounded together by np.round.
 
     Parameters
     ------------
-    filename : str
-        The name of the file to be parsed. The file extension should be included within this string.
-    delimiter : str
-        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
-    
+    vectors : array
+        A 2-D array where each row is a vector of the set.
+    accuracy : int
+        The number of decimal places to which each entry is rounded, or False for no rounding.
+    as_array : bool
+        If value is True then the set is given as an array, otherwise as a nested list.
+
     Outputs
     --------
-    vector_set : list
-        The vector set contained within the file.
+    orthogonal_set : list, array
+        The rounded set.
     '''
-    with open(filename) as file:
-        vector_set = []
-        for line in file:
-            add = False
-            # check if the first character of the line is a number or symbol
-            if line[0].isnumeric() or line[0] == "-" or line[0] == "+" or line[0] == "(":
-                add = True
-            if add:
-                line = line.replace('\n','')
-                split_line = line.split(delimiter)
-                for x in range(len(split_line)):
-                    # check if the entry consists of only real numbers
-                    if split_line[x].translate({ord(x): None for x in '+-'}).isnumeric():
-                        split_line[x] = float(split_line[x])
-                    # if above is not true then check if the entry instead consists of only real and imaginary numbers
-                    elif split_line[x].translate({ord(x): None for x in '()+-j.'}).isnumeric():
-                        split_line[x] = complex(split_line[x])
-                    # if the above two are not satisfied then the entry contains letters or other characters and cannot be parsed into a vector set
-                    else:
-                        print("Unable to parse letters into a vector")
-                        exit()
-                vector_set.append(split_line)
-    return vector_set
+    if accuracy:
+        vectors = np.round(vectors,accuracy)
+    if as_array:
+        return vectors
+    return vectors.tolist()
 
 
-def csv_file_creater(vector_set, new_filename, delimiter = "," ):
+def _finish_orthogonalisation(basis,norms,normalised = True,accuracy = 3,as_array = False,out = None):
     '''
-    Takes a vector set and converts it into a CSV file. 
+    Turns the orthonormal basis found by a backend into the output set of Vector_Set.orthogonalisation.
 
     Parameters
     ------------
-    vector_set : list
-        The vector set that will be converted to a CSV file.
-    new_filename : str
-        The name of the file that will be created. The file extension should be included within this string.
-    delimiter : str
-        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
-    
+    basis : array
+        A 2-D array of the orthonormal vectors.
+    norms : array
+        The norm of each orthogonal vector before it was normalised. Not changed, so it can be held in a cache.
+    normalised : bool
+        If value is False then each vector is given back its length.
+    accuracy : int
+        The number of decimal places to which each entry is rounded, or False for no rounding.
+    as_array : bool
+        If value is True then the set is given as an array, otherwise as a nested list.
+    out : array
+        Set to None as default. An array the set is written into and given back, scaled and rounded in place. It may be the basis itself.
+
     Outputs
     --------
-    CSV file
+    orthogonal_set : list, array
+        The final orthogonal or orthonormal set.
     '''
-    # create the new file
-    with open(new_filename,"w") as file:
-        #create the file contents
-        for vector in vector_set:
-            new_line = ""
-            for entry in vector:
-                entry = str(entry)
-                new_line = new_line + entry + delimiter
-            new_line = new_line[:-1]  # remove the final excess delimiter 
-            file.write(new_line + "\n")
+    if out is not None:
+        if basis is not out:
+            np.copyto(out,basis)
+        if not normalised and len(norms) > 1:
+            np.multiply(out[1:],norms[1:,np.newaxis],out = out[1:])
+        if accuracy:
+            # the real and imaginary parts are rounded separately, as rounding a complex array in place makes a copy of it
+            for part in ((out.real,out.imag) if np.iscomplexobj(out) else (out,)):
+                np.round(part,accuracy,out = part)
+        return out
+
+    # the entries of a list are Python floats, so a single precision basis is rounded in double precision for a list,
+    # while an array keeps the precision of the basis
+    if not as_array:
+        basis = basis.astype(np.result_type(basis,np.float64),copy = False)
+
+    # the loop engine always normalises the first vector, so only the later vectors keep their length
+    if not normalised and len(norms) > 0:
+        lengths = norms.astype(basis.real.dtype)
+        lengths[0] = 1.0
+        basis = basis * lengths[:,np.newaxis]
+
+    return _round_set(basis,accuracy = accuracy,as_array = as_array)
+
+
+def _cached_orthogonalisation(vector_set,cache,normalised,accuracy,engine,algorithm,report,block_size,tolerance,pivoting,precision,as_array,out = None):
+    '''
+    Carries out Vector_Set.orthogonalisation using an Orthogonalisation_Cache.
+    A set found in the cache is given back straight away. Otherwise, for a resumable engine, the longest cached prefix of the set
+    is looked up and the engine carries on from its basis, and the new basis is added to the cache for later sets to carry on from.
+
+    Parameters
+    ------------
+    vector_set : Vector_Set
+        The vector set to be orthogonalised.
+    cache : Orthogonalisation_Cache
+        The cache to use.
+    The other parameters are the same as for Vector_Set.orthogonalisation, with engine already chosen.
+
+    Outputs
+    --------
+    orthogonal_set : list, array
+        The final orthogonal or orthonormal set.
+    orthogonalisation_report : dict
+        Only returned when report is True.
+    '''
+    vectors = _vector_set_array(vector_set,precision = precision)
+    cache_key = cache.key(vectors,normalised = normalised,accuracy = accuracy,engine = engine,algorithm = algorithm,
+                          block_size = block_size,tolerance = tolerance,pivoting = pivoting,precision = precision)
+    cached_result = cache.get(cache_key)
+
+    # the report is only worked out when it is asked for, so a result saved without one cannot be used for a report
+    if cached_result is not None and (cached_result[1] is not None or not report):
+        orthogonal_array, orthogonalisation_report = cached_result
+        # a copy is given as an array so that changing it does not change the cached result
+        if out is not None:
+            np.copyto(out,orthogonal_array)
+            orthogonal_set = out
+        else:
+            orthogonal_set = orthogonal_array.copy() if as_array else orthogonal_array.tolist()
+    else:
+        # the loop engine gives the same vectors as the numpy engine, which can be carried on from a cached basis
+        resume_engine = "numpy-gs" if engine == "loop" else engine
+        if tolerance is None and backends[resume_engine]["resumable"]:
+            # the basis is cached before it is refined, as the refinement of a mixed precision basis depends on every vector of the set
+            prefix_keys = cache.prefix_keys(vectors,engine = resume_engine,algorithm = algorithm,block_size = block_size)
+            start_basis, start_norms = cache.get_prefix(prefix_keys)
+            basis, norms = backends[resume_engine]["function"](vectors,algorithm = algorithm,block_size = block_size,start_basis = start_basis,start_norms = start_norms)
+            cache.put_prefix(prefix_keys,basis,norms)
+            if precision == "mixed":
+                basis, norms = _refine_basis(basis,norms)
+
+            orthogonalisation_report = {"orthogonality_error": orthogonality_error(basis)} if report else None
+            orthogonal_set = _finish_orthogonalisation(basis,norms,normalised = normalised,accuracy = accuracy,as_array = as_array,out = out)
+            # an unrounded array may be the cached basis itself, so a copy is given so that changing it does not change the cache
+            if as_array and out is None and np.may_share_memory(orthogonal_set,basis):
+                orthogonal_set = orthogonal_set.copy()
+        else:
+            orthogonal_set = Vector_Set.orthogonalisation(vector_set,normalised = normalised,accuracy = accuracy,engine = engine,algorithm = algorithm,report = report,
+                                                          block_size = block_size,tolerance = tolerance,pivoting = pivoting,precision = precision,as_array = as_array,out = out)
+            orthogonal_set, orthogonalisation_report = orthogonal_set if report else (orthogonal_set,None)
+        cache.put(cache_key,np.array(orthogonal_set),orthogonalisation_report)
+
+    if report:
+        return orthogonal_set, orthogonalisation_report
+    return orthogonal_set
+
+
+def _vector_set_array(vector_set,precision = "double"):
+    '''
+    Converts the vectors in a Vector_Set into a single 2-D array of floats or complex numbers.
+
+    Parameters
+    ------------
+    vector_set : Vector_Set
+        The Vector_Set whose vectors will be converted.
+    precision : str
+        Set to "double" as default, giving float64 or complex128 entries. A value of "single" or "mixed" gives float32 or complex64 entries.
+
+    Outputs
+    --------
+    vectors : array
+        A 2-D array where each row is a vector of the set.
+    '''
+    if precision == "double":
+        dtypes = (np.float64,np.complex128)
+    else:
+        dtypes = (np.float32,np.complex64)
+
+    # asarray does not copy an array that is already of the right type, such as a memory-mapped file
+    return np.asarray(vector_set.all_vectors,dtype = dtypes[vector_set.contains_complex])
+
+
+@_profile_stage("mixed precision refinement")
+def _refine_basis(basis,norms):
+    '''
+    Orthogonalises a single precision basis once more in double precision, which is the final step of the mixed precision mode.
+    As the basis is already close to orthonormal, its Gram matrix is close to the identity and the Cholesky factor L of the Gram matrix
+    gives the refined basis as L^-1 Q with a single matrix-matrix product for the Gram matrix. L is lower triangular,
+    so each refined vector is only made from the vectors before it, just as in the Gram-Schmidt process, and is found by forward substitution.
+
+    Parameters
+    ------------
+    basis : array
+        A 2-D array of the orthonormal vectors found in single precision.
+    norms : array
+        The norm of each orthogonal vector before it was normalised.
+
+    Outputs
+    --------
+    basis : array
+        A 2-D array of the refined orthonormal vectors in double precision.
+    norms : array
+        The norms with the small change in length from the refinement included.
+    '''
+    basis = basis.astype(np.result_type(basis,np.float64))
+    if basis.shape[0] == 0:
+        return basis, norms
+
+    try:
+        lower = np.linalg.cholesky(basis @ basis.conj().T)
+    except np.linalg.LinAlgError:
+        # the single precision basis lost too much orthogonality for the Cholesky factor, so a full cgs2 pass is used instead
+        basis, refinement_norms = _numpy_gram_schmidt(basis,algorithm = "cgs2")
+        return basis, norms * refinement_norms
+
+    return _forward_substitution(lower,basis), norms * lower.diagonal().real
+
+
+def _forward_substitution(lower,right,block_size = None):
+    '''
+    Solves L X = B for X, where L is lower triangular, by forward substitution on blocks of rows.
+    The rows of each block are taken from the rows already solved with one matrix-matrix product, then solved one at a time within the block.
+
+    Parameters
+    ------------
+    lower : array
+        A square lower triangular 2-D array with no zeros on its diagonal.
+    right : array
+        A 2-D array B with as many rows as lower.
+    block_size : int
+        The number of rows solved together. Defaults to default_block_size when None.
+
+    Outputs
+    --------
+    solution : array
+        The 2-D array X.
+    '''
+    block_size = default_block_size if block_size is None else block_size
+    solution = np.empty(right.shape,dtype = np.result_type(lower,right))
+    for start in range(0,lower.shape[0],block_size):
+        end = min(start + block_size,lower.shape[0])
+        np.subtract(right[start:end],lower[start:end,:start] @ solution[:start],out = solution[start:end])
+        for row in range(start,end):
+            if row > start:
+                solution[row] -= lower[row,start:row] @ solution[start:row]
+            solution[row] /= lower[row,row]
+
+    return solution
+
+
+def _remove_projections(basis,vector,passes = 1):
+    '''
+    Removes the projections of a vector onto every vector of an orthonormal basis.
+    The inner products with all of the basis vectors are found with a single matrix-vector product, then all projections are removed at once.
+
+    Parameters
+    ------------
+    basis : array
+        A 2-D array where each row is an orthonormal basis vector.
+    vector : array
+        The vector that will have the projections removed from it.
+    passes : int
+        The number of times the projections are removed, 2 for the cgs2 algorithm.
+
+    Outputs
+    --------
+    residual : array
+        The part of the vector that is orthogonal to the basis.
+    coefficients : array
+        The component of the vector along each basis vector, summed over all passes.
+    '''
+    coefficients = np.zeros(basis.shape[0],dtype = np.result_type(basis,vector))
+    for _ in range(passes):
+        pass_coefficients = basis.conj() @ vector
+        vector = vector - pass_coefficients @ basis
+        coefficients += pass_coefficients
+
+    return vector, coefficients
+
+
+def _copy_start_basis(basis,norms,start_basis,start_norms):
+    '''
+    Copies the basis and norms found by an earlier run into the start of the arrays of a new run.
+
+    Parameters
+    ------------
+    basis : array
+        The basis array of the new run.
+    norms : array
+        The norms array of the new run.
+    start_basis : array
+        The basis of the first vectors of the set, or None.
+    start_norms : array
+        The norms that were returned along with start_basis.
+
+    Outputs
+    --------
+    start : int
+        The number of vectors that are already done.
+    '''
+    if start_basis is None:
+        return 0
+
+    start = start_basis.shape[0]
+    basis[:start] = start_basis
+    norms[:start] = start_norms
+    return start
+
+
+def _numpy_gram_schmidt(vectors,algorithm = "classical",block_size = None,start_basis = None,start_norms = None,out = None):
+    '''
+    Carries out the Gram-Schmidt process on the rows of a 2-D array.
+    For the classical and cgs2 algorithms all projections of a vector onto the earlier basis vectors are found with a single matrix-vector product.
+    For the modified algorithm each new basis vector is projected out of all the remaining vectors as soon as it is found.
+
+    The basis, the coefficients and the scratch space are allocated once before the first vector, and every residual is worked on in place
+    in its row of the basis using the out argument of the NumPy functions, so no arrays are allocated for each vector.
+
+    Parameters
+    ------------
+    vectors : array
+        A 2-D array where each row is a vector of the set.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+    block_size : int
+        The number of rows of the scratch space used to remove each new basis vector from the remaining vectors in the modified algorithm.
+        Defaults to default_block_size when None. Fewer rows are used if the scratch space would be larger than default_chunk_size bytes.
+    start_basis : array
+        Set to None as default. The orthonormal basis of the first vectors of the set, found by an earlier run.
+        The process then starts from the first vector after the start basis instead of from the beginning.
+    start_norms : array
+        The norms that were returned along with start_basis.
+    out : array
+        Set to None as default. A C-contiguous 2-D array of the same shape and type as vectors that the basis is written into, instead of a new array.
+
+    Outputs
+    --------
+    basis : array
+        A 2-D array of the orthonormal vectors, in the same order as the input vectors.
+    norms : array
+        The norm of each orthogonal vector before it was normalised.
+    '''
+    basis = np.empty_like(vectors) if out is None else out
+    norms = np.empty(vectors.shape[0])
+    start = _copy_start_basis(basis,norms,start_basis,start_norms)
+    if start >= vectors.shape[0]:
+        return basis, norms
+
+    # the workspace, the inner products of one vector with the basis and one vector's worth of scratch space
+    coefficients = np.empty(vectors.shape[0],dtype = basis.dtype)
+    scratch = np.empty(vectors.shape[1],dtype = basis.dtype)
+    complex_set = np.iscomplexobj(basis)
+
+    if algorithm == "modified":
+        # the rows of the basis hold the residuals of the vectors that are still to be processed
+        block_size = default_block_size if block_size is None else block_size
+        block_size = max(1,min(block_size,default_chunk_size // max(1,vectors.shape[1] * basis.itemsize)))
+        block = np.empty((block_size,vectors.shape[1]),dtype = basis.dtype)
+        np.copyto(basis[start:],vectors[start:])
+        for index in range(vectors.shape[0]):
+            new_vector = basis[index]
+            if index >= start:
+                norms[index] = math.sqrt(np.vdot(new_vector,new_vector).real)
+                np.divide(new_vector,norms[index],out = new_vector)
+
+            # remove the new basis vector from every vector that is still to be processed, a block of rows at a time
+            remaining = basis[max(index + 1,start):]
+            count = remaining.shape[0]
+            if complex_set:
+                np.conjugate(new_vector,out = scratch)
+                np.matmul(remaining,scratch,out = coefficients[:count])
+            else:
+                np.matmul(remaining,new_vector,out = coefficients[:count])
+            for block_start in range(0,count,block_size):
+                block_end = min(block_start + block_size,count)
+                rows = block[:block_end - block_start]
+                np.multiply(coefficients[block_start:block_end,np.newaxis],new_vector,out = rows)
+                np.subtract(remaining[block_start:block_end],rows,out = remaining[block_start:block_end])
+        return basis, norms
+
+    passes = 2 if algorithm == "cgs2" else 1
+    for index in range(start,vectors.shape[0]):
+        residual = basis[index]
+        np.copyto(residual,vectors[index])
+        earlier_basis = basis[:index]
+        index_coefficients = coefficients[:index]
+        for _ in range(passes if index > 0 else 0):
+            # the inner products with the conjugated basis are found as the conjugate of the products with the conjugated residual
+            if complex_set:
+                np.conjugate(residual,out = scratch)
+                np.matmul(earlier_basis,scratch,out = index_coefficients)
+                np.conjugate(index_coefficients,out = index_coefficients)
+            else:
+                np.matmul(earlier_basis,residual,out = index_coefficients)
+            np.matmul(index_coefficients,earlier_basis,out = scratch)
+            np.subtract(residual,scratch,out = residual)
+
+        norms[index] = math.sqrt(np.vdot(residual,residual).real)
+        np.divide(residual,norms[index],out = residual)
+
+    return basis, norms
+
+
+def _rank_revealing_gram_schmidt(vectors,algorithm = "classical",tolerance = 1e-10,pivoting = False):
+    '''
+    Carries out the Gram-Schmidt process on the rows of a 2-D array, dropping the vectors that are linearly dependent on the vectors before them.
+    Dropped vectors are not used in any later projections.
+
+    Parameters
+    ------------
+    vectors : array
+        A 2-D array where each row is a vector of the set.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+    tolerance : float
+        A vector is dropped when the norm of its residual is no more than tolerance times its original norm.
+    pivoting : bool
+        If value is True then the remaining vector with the largest residual is processed next.
+
+    Outputs
+    --------
+    basis : array
+        A 2-D array of the orthonormal vectors that were kept, in the order they were processed.
+    norms : array
+        The norm of each kept orthogonal vector before it was normalised.
+    kept_indices : array
+        The position in the input set of each kept vector.
+    '''
+    basis = np.empty_like(vectors)
+    norms = np.empty(vectors.shape[0])
+    kept_indices = []
+    original_norms = np.linalg.norm(vectors,axis = 1)
+    passes = 2 if algorithm == "cgs2" else 1
+    rank = 0
+
+    if pivoting or algorithm == "modified":
+        # the residuals of all remaining vectors are kept up to date so the largest can be found
+        residuals = vectors.copy()
+        remaining = np.ones(vectors.shape[0],dtype = bool)
+        while remaining.any():
+            remaining_indices = np.flatnonzero(remaining)
+            if pivoting:
+                index = remaining_indices[np.argmax(np.linalg.norm(residuals[remaining_indices],axis = 1))]
+            else:
+                index = remaining_indices[0]
+            remaining[index] = False
+
+            vector = residuals[index]
+            if algorithm == "cgs2" and rank > 0:
+                vector = vector - (basis[:rank].conj() @ vector) @ basis[:rank]
+            norm = np.linalg.norm(vector)
+            if norm <= tolerance * original_norms[index]:
+                continue
+
+            norms[rank] = norm
+            basis[rank] = vector / norm
+            kept_indices.append(index)
+
+            # remove the new basis vector from every vector that is still to be processed
+            remaining_indices = np.flatnonzero(remaining)
+            residuals[remaining_indices] -= np.outer(residuals[remaining_indices] @ basis[rank].conj(),basis[rank])
+            rank += 1
+
+    else:
+        for index in range(vectors.shape[0]):
+            vector = vectors[index]
+            if rank > 0:
+                vector = _remove_projections(basis[:rank],vector,passes = passes)[0]
+            norm = np.linalg.norm(vector)
+            if norm <= tolerance * original_norms[index]:
+                continue
+
+            norms[rank] = norm
+            basis[rank] = vector / norm
+            kept_indices.append(index)
+            rank += 1
+
+    return basis[:rank], norms[:rank], np.array(kept_indices,dtype = int)
+
+
+def _blocked_gram_schmidt(vectors,algorithm = "classical",block_size = None,start_basis = None,start_norms = None,out = None):
+    '''
+    Carries out the Gram-Schmidt process on the rows of a 2-D array one panel of vectors at a time.
+    Each panel is orthogonalised against all of the finished basis vectors with matrix-matrix products,
+    then the vectors inside the panel are orthogonalised against each other with _numpy_gram_schmidt.
+
+    Parameters
+    ------------
+    vectors : array
+        A 2-D array where each row is a vector of the set.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+        The modified algorithm projects each panel against the earlier panels one at a time,
+        the cgs2 algorithm projects each panel against the whole basis twice.
+    block_size : int
+        The number of vectors in each panel. Defaults to default_block_size when None.
+    start_basis : array
+        Set to None as default. The orthonormal basis of the first vectors of the set, found by an earlier run.
+        The panels then start from the first vector after the start basis.
+    start_norms : array
+        The norms that were returned along with start_basis.
+    out : array
+        Set to None as default. A C-contiguous 2-D array of the same shape and type as vectors that the basis is written into, instead of a new array.
+
+    Outputs
+    --------
+    basis : array
+        A 2-D array of the orthonormal vectors, in the same order as the input vectors.
+    norms : array
+        The norm of each orthogonal vector before it was normalised.
+    '''
+    if block_size is None:
+        block_size = default_block_size
+    if block_size < 1:
+        print("Error: The block size should be a positive integer. An incorrect value of {0} has been inputted".format(block_size))
+        exit()
+
+    basis = np.empty_like(vectors) if out is None else out
+    norms = np.empty(vectors.shape[0])
+    first_start = _copy_start_basis(basis,norms,start_basis,start_norms)
+
+    for start in range(first_start,vectors.shape[0],block_size):
+        end = min(start + block_size,vectors.shape[0])
+        panel = vectors[start:end]
+
+        if start > 0:
+            if algorithm == "modified":
+                # remove each earlier panel from the running residual in turn
+                for previous_start in range(0,start,block_size):
+                    previous_panel = basis[previous_start:min(previous_start + block_size,start)]
+                    panel = panel - (panel @ previous_panel.conj().T) @ previous_panel
+            else:
+                passes = 2 if algorithm == "cgs2" else 1
+                for _ in range(passes):
+                    panel = panel - (panel @ basis[:start].conj().T) @ basis[:start]
+
+        norms[start:end] = _numpy_gram_schmidt(panel,algorithm = algorithm,out = basis[start:end])[1]
+
+    return basis, norms
+
+
+def _householder_orthonormalisation(vectors,algorithm = "classical",block_size = None):
+    '''
+    Finds the orthonormal basis of the rows of a 2-D array from the Householder QR factorisation of NumPy.
+    The sign (or complex phase) of each basis vector is fixed so that the diagonal of R is real and positive,
+    which makes the basis the same as the one found by the Gram-Schmidt process.
+    The reduced factorisation only has as many vectors as entries, so the set should have no more vectors than entries.
+
+    Parameters
+    ------------
+    vectors : array
+        A 2-D array where each row is a vector of the set.
+    algorithm : str
+        Not used, as no Gram-Schmidt recurrence takes place.
+    block_size : int
+        Not used, only accepted so that every backend can be called in the same way.
+
+    Outputs
+    --------
+    basis : array
+        A 2-D array of the orthonormal vectors, in the same order as the input vectors.
+    norms : array
+        The norm of each orthogonal vector before it was normalised, the magnitude of the diagonal of R.
+    '''
+    # the vectors are the columns of the matrix being factorised
+    q_matrix, r_matrix = np.linalg.qr(vectors.T)
+    diagonal = r_matrix.diagonal()
+    norms = np.abs(diagonal)
+
+    # Q R = (Q D)(D^-1 R) where D holds the phase of each diagonal entry of R
+    phases = np.where(norms > 0,diagonal / np.where(norms > 0,norms,1),1)
+    basis = np.ascontiguousarray((q_matrix * phases).T)
+
+    # Q completes the basis for a linearly dependent vector, where Gram-Schmidt divides by a norm that is zero up to rounding,
+    # so that vector and every later one are marked with nan in the same way
+    rounding = max(vectors.shape) * np.finfo(vectors.dtype).eps
+    dependent = np.flatnonzero(norms <= rounding * np.linalg.norm(vectors,axis = 1))
+    if len(dependent) > 0:
+        basis[dependent[0]:] = np.nan
+        norms[dependent[0] + 1:] = np.nan
+
+    return basis, norms
+
+
+@_profile_stage("orthogonality_error")
+def orthogonality_error(vector_set):
+    '''
+    Measures how far a set of vectors is from being orthonormal.
+    The vectors are normalised and the Frobenius norm of the difference between their Gram matrix and the identity is returned, i.e. ||Q^H Q - I||.
+
+    Parameters
+    ------------
+    vector_set : list, array
+        The vector set to be checked, each vector being one row.
+
+    Outputs
+    --------
+    error : float
+        The loss of orthogonality of the set. A value of 0 means the set is exactly orthogonal.
+    '''
+    # measured in double precision so that the rounding of a single precision set is counted in the error
+    vectors = np.array(vector_set)
+    vectors = vectors.astype(np.result_type(vectors,np.float64))
+    vectors = vectors / np.linalg.norm(vectors,axis = 1,keepdims = True)
+    gram_matrix = vectors.conj() @ vectors.T
+
+    return float(np.linalg.norm(gram_matrix - np.eye(vectors.shape[0])))
+
+
+# the fraction of the entries of the basis that can be nonzero before sparse_orthogonalisation switches to dense arrays.
+# Past this the matrix-vector products of the dense engine are faster than finding and combining the nonzero entries one by one
+sparse_density_limit = 0.05
+
+
+class Sparse_Vector_Set:
+    """
+    A class used to represent a vector set with few nonzero entries, holding only those entries.
+    The vectors are kept in compressed sparse row (CSR) form, the same form as scipy.sparse.csr_matrix,
+    so memory depends on the number of nonzero entries rather than the number of entries per vector.
+
+    Attributes
+    --------------
+    indptr : array
+        The position in indices and data where each vector starts, with one more position for the end of the last vector.
+    indices : array
+        The column of each nonzero entry, in increasing order within each vector.
+    data : array
+        The value of each nonzero entry.
+    dimensions : tuple
+        The dimensions of the vector set, as (number of vectors, number of entries per vector).
+    """
+
+    def __init__(self,vector_set,dimensions = None):
+        """
+        Constructs all necessary attributes for the Sparse_Vector_Set object.
+
+        Parameters
+        -----------
+        vector_set : Sparse_Vector_Set, scipy.sparse matrix, tuple, list, array
+            The vector set. A tuple of three sequences is taken as the (rows, columns, values) of the nonzero entries in COO form,
+            with the values of repeated entries added together. A scipy.sparse matrix or array is read through its tocsr method,
+            so SciPy is not needed to use this class. A dense list or array keeps only its nonzero entries.
+        dimensions : tuple
+            The dimensions of the set. For a COO tuple it defaults to one more than the largest row and column given,
+            otherwise it is taken from the vector set.
+
+        Raises
+        --------
+        ValueError
+            If a row or column of a COO tuple is outside the dimensions of the set.
+        """
+        if isinstance(vector_set,Sparse_Vector_Set):
+            self.indptr, self.indices, self.data, self.dimensions = vector_set.indptr, vector_set.indices, vector_set.data, vector_set.dimensions
+            return
+
+        if hasattr(vector_set,"tocsr"):
+            matrix = vector_set.tocsr(copy = True)
+            matrix.sum_duplicates()
+            self.indptr = np.asarray(matrix.indptr,dtype = np.int64)
+            self.indices = np.asarray(matrix.indices,dtype = np.int64)
+            self.data = _float_or_complex_array(matrix.data)
+            self.dimensions = tuple(matrix.shape)
+            return
+
+        if isinstance(vector_set,tuple) and len(vector_set) == 3:
+            rows, columns, values = vector_set
+        else:
+            array = _float_or_complex_array(vector_set)
+            if array.ndim != 2:
+                raise ValueError("The vector set should be a list of vectors, but has dimensions {0}".format(array.shape))
+            rows, columns = np.nonzero(array)
+            values = array[rows,columns]
+            dimensions = array.shape
+
+        rows = np.asarray(rows,dtype = np.int64).ravel()
+        columns = np.asarray(columns,dtype = np.int64).ravel()
+        values = _float_or_complex_array(values).ravel()
+        if not rows.size == columns.size == values.size:
+            raise ValueError("The rows, columns and values of the COO vector set should all have the same length")
+        if dimensions is None:
+            dimensions = (int(rows.max()) + 1,int(columns.max()) + 1) if rows.size else (0,0)
+        if rows.size and (rows.min() < 0 or columns.min() < 0 or rows.max() >= dimensions[0] or columns.max() >= dimensions[1]):
+            raise ValueError("The rows and columns of the COO vector set should be within its dimensions {0}".format(tuple(dimensions)))
+
+        # sort the entries by row then column and add together any entries given more than once
+        order = np.lexsort((columns,rows))
+        rows, columns, values = rows[order], columns[order], values[order]
+        if rows.size:
+            starts = np.flatnonzero(np.concatenate(([True],(rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1]))))
+            rows, columns, values = rows[starts], columns[starts], np.add.reduceat(values,starts)
+
+        self.indptr = np.zeros(dimensions[0] + 1,dtype = np.int64)
+        np.cumsum(np.bincount(rows,minlength = dimensions[0]),out = self.indptr[1:])
+        self.indices = columns
+        self.data = values
+        self.dimensions = (int(dimensions[0]),int(dimensions[1]))
+
+    @property
+    def contains_complex(self):
+        return np.iscomplexobj(self.data)
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    @property
+    def density(self):
+        """
+        The fraction of the entries of the set that are held, from 0 to 1.
+        """
+        return self.nnz / max(1,self.dimensions[0] * self.dimensions[1])
+
+    def __len__(self):
+        return self.dimensions[0]
+
+    def row(self,index):
+        """
+        Gives the columns and values of the nonzero entries of a single vector of the set.
+        """
+        return self.indices[self.indptr[index]:self.indptr[index + 1]], self.data[self.indptr[index]:self.indptr[index + 1]]
+
+    def toarray(self):
+        """
+        Gives the vector set as a dense 2-D array, one vector per row.
+        """
+        array = np.zeros(self.dimensions,dtype = self.data.dtype)
+        array[np.repeat(np.arange(self.dimensions[0]),np.diff(self.indptr)),self.indices] = self.data
+        return array
+
+    @staticmethod
+    def _from_csr(indptr,indices,data,dimensions):
+        """
+        Makes a Sparse_Vector_Set from arrays that are already in CSR form with the columns of each vector in order, without checking or copying them.
+        """
+        vector_set = Sparse_Vector_Set.__new__(Sparse_Vector_Set)
+        vector_set.indptr, vector_set.indices, vector_set.data, vector_set.dimensions = indptr, indices, data, dimensions
+        return vector_set
+
+    def __array__(self,dtype = None,copy = None):
+        array = self.toarray()
+        return array if dtype is None else array.astype(dtype)
+
+
+def _sparse_coefficients(columns,values,column_entries,indptr,data,count):
+    '''
+    Finds the inner products of the first count basis vectors with a sparse vector, i.e. conj(Q) @ v.
+    Only the basis entries in the columns of the vector are looked at, found from column_entries, so the cost depends on how many entries
+    the basis has in those columns rather than on the size of the basis.
+    '''
+    positions = []
+    repeats = []
+    for column in columns.tolist():
+        entries = column_entries.get(column,())
+        positions.extend(entries)
+        repeats.append(len(entries))
+
+    coefficients = np.zeros(count,dtype = np.result_type(data,values))
+    if positions:
+        positions = np.array(positions,dtype = np.int64)
+        rows = np.searchsorted(indptr[:count + 1],positions,side = "right") - 1
+        np.add.at(coefficients,rows,data[positions].conj() * np.repeat(values,repeats))
+    return coefficients
+
+
+def _sparse_gram_schmidt(vector_set,algorithm = "classical",density_limit = None):
+    '''
+    Carries out the Gram-Schmidt process on a Sparse_Vector_Set, keeping the basis sparse for as long as it stays sparse.
+    For each vector the inner products with the basis are found from only the basis entries in the same columns,
+    and only the basis vectors it is not already orthogonal to are subtracted, so disjoint vectors such as indicator vectors cost almost nothing.
+    Once the fraction of nonzero entries in the basis passes density_limit, or a vector is linearly dependent, the basis found so far
+    is made dense and the numpy engine carries on from it, as finding the nonzero entries one by one is then slower than dense products.
+
+    Parameters
+    ------------
+    vector_set : Sparse_Vector_Set
+        The vector set to be orthogonalised.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+        The modified algorithm updates every remaining vector with each new basis vector, which fills them in straight away,
+        so it is carried out by the numpy engine from the start.
+    density_limit : float
+        The fraction of nonzero entries of the basis at which it is made dense. Defaults to sparse_density_limit when None.
+
+    Outputs
+    --------
+    basis : Sparse_Vector_Set, array
+        The orthonormal vectors, as a Sparse_Vector_Set if the basis stayed sparse, otherwise as a 2-D array.
+    norms : array
+        The norm of each orthogonal vector before it was normalised.
+    '''
+    density_limit = sparse_density_limit if density_limit is None else density_limit
+    vectors, dimension = vector_set.dimensions
+    dtype = np.result_type(vector_set.data,np.float64)
+
+    indptr = np.zeros(vectors + 1,dtype = np.int64)
+    indices = np.empty(max(1,vector_set.nnz),dtype = np.int64)
+    data = np.empty(max(1,vector_set.nnz),dtype = dtype)
+    norms = np.empty(vectors)
+    # the positions in indices and data of the basis entries in each column
+    column_entries = {}
+    passes = 2 if algorithm == "cgs2" else 1
+
+    index = 0
+    while index < vectors and algorithm != "modified":
+        columns, values = vector_set.row(index)
+        values = values.astype(dtype)
+        stored = indptr[index]
+        for _ in range(passes if index > 0 else 0):
+            coefficients = _sparse_coefficients(columns,values,column_entries,indptr,data,index)
+            used = np.flatnonzero(coefficients)
+            if not used.size:
+                break
+
+            # gather the entries of the basis vectors that are used and combine them with the entries of the vector
+            starts = indptr[used]
+            counts = indptr[used + 1] - starts
+            positions = np.repeat(starts - np.cumsum(counts) + counts,counts) + np.arange(counts.sum())
+            all_columns = np.concatenate((columns,indices[positions]))
+            all_values = np.concatenate((values,-np.repeat(coefficients[used],counts) * data[positions]))
+            columns, inverse = np.unique(all_columns,return_inverse = True)
+            values = np.zeros(columns.size,dtype = dtype)
+            np.add.at(values,inverse,all_values)
+
+        kept = values != 0
+        columns, values = columns[kept], values[kept]
+        norm = math.sqrt(np.vdot(values,values).real)
+        if norm == 0 or stored + columns.size > density_limit * (index + 1) * dimension:
+            break
+
+        if stored + columns.size > indices.size:
+            size = max(2 * indices.size,stored + columns.size)
+            indices = np.resize(indices,size)
+            data = np.resize(data,size)
+        indices[stored:stored + columns.size] = columns
+        data[stored:stored + columns.size] = values / norm
+        indptr[index + 1] = stored + columns.size
+        norms[index] = norm
+        for position, column in enumerate(columns.tolist(),start = stored):
+            column_entries.setdefault(column,[]).append(position)
+        index += 1
+
+    basis = Sparse_Vector_Set._from_csr(indptr[:index + 1],indices[:indptr[index]],data[:indptr[index]],(index,dimension))
+    if index == vectors:
+        return basis, norms
+
+    # the rest of the set is carried on from the sparse basis found so far with dense arrays
+    return _numpy_gram_schmidt(vector_set.toarray().astype(dtype,copy = False),algorithm = algorithm,start_basis = basis.toarray(),start_norms = norms[:index])
+
+
+def _sparse_orthogonality_error(basis):
+    '''
+    Measures the loss of orthogonality of a sparse basis as orthogonality_error does, finding the Gram matrix from the nonzero entries only.
+    The Gram matrix is found a column at a time and only its sum of squares is kept, so a basis of many vectors does not need it all in memory.
+    '''
+    column_entries = {}
+    for position, column in enumerate(basis.indices.tolist()):
+        column_entries.setdefault(column,[]).append(position)
+    rows = np.repeat(np.arange(len(basis)),np.diff(basis.indptr))
+    lengths = np.sqrt(np.bincount(rows,weights = np.abs(basis.data) ** 2,minlength = len(basis)))
+
+    squares = 0.0
+    for index in range(len(basis)):
+        columns, values = basis.row(index)
+        gram_column = _sparse_coefficients(columns,values,column_entries,basis.indptr,basis.data,len(basis)) / (lengths * lengths[index])
+        gram_column[index] -= 1
+        squares += float(np.vdot(gram_column,gram_column).real)
+
+    return math.sqrt(squares)
+
+
+@_profile_stage("sparse_orthogonalisation")
+def sparse_orthogonalisation(vector_set,normalised = True,accuracy = 3,algorithm = "classical",report = False,density_limit = None):
+    '''
+    Orthogonalises a sparse vector set, giving the orthogonal set as a Sparse_Vector_Set.
+    The set is worked on with sparse kernels for as long as the basis stays sparse, see _sparse_gram_schmidt,
+    so the time and memory depend on the number of nonzero entries rather than the number of entries per vector.
+    The vectors are the same as those of Vector_Set.orthogonalisation with the numpy engine.
+
+    Parameters
+    ------------
+    vector_set : Sparse_Vector_Set, scipy.sparse matrix, tuple, list, array
+        The vector set to be orthogonalised, in any form accepted by Sparse_Vector_Set.
+    normalised : bool
+        Set to True as default. If value is True then the orthogonal set will be normalised.
+    accuracy : int
+        The number of decimal places to which each entry in the output set will be rounded to. Value of None or False leaves the set unrounded.
+        Entries that are rounded to zero are left out of the output.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+    report : bool
+        Set to False as default. If value is True then a dictionary describing the run is returned alongside the set.
+        The "orthogonality_error" key gives the loss of orthogonality of the unrounded set, see orthogonality_error,
+        and the "sparse" key is True if the basis stayed sparse throughout.
+    density_limit : float
+        The fraction of nonzero entries of the basis at which it is made dense. Defaults to sparse_density_limit when None.
+
+    Outputs
+    --------
+    orthogonal_set : Sparse_Vector_Set
+        The final orthogonal or orthonormal set.
+    orthogonalisation_report : dict
+        Only returned when report is True.
+    '''
+    if algorithm not in algorithms:
+        print("Error: The algorithm should be one of {0}. An incorrect value of {1} has been inputted".format(algorithms,algorithm))
+        exit()
+
+    basis, norms = _sparse_gram_schmidt(Sparse_Vector_Set(vector_set),algorithm = algorithm,density_limit = density_limit)
+    stayed_sparse = isinstance(basis,Sparse_Vector_Set)
+    if report:
+        orthogonalisation_report = {"orthogonality_error": _sparse_orthogonality_error(basis) if stayed_sparse else orthogonality_error(basis), "sparse": stayed_sparse}
+
+    if not stayed_sparse:
+        orthogonal_set = Sparse_Vector_Set(_finish_orthogonalisation(basis,norms,normalised = normalised,accuracy = accuracy,as_array = True))
+    else:
+        # as in Vector_Set.orthogonalisation, the first vector is always normalised
+        values = basis.data
+        if not normalised and len(norms) > 1:
+            lengths = norms.copy()
+            lengths[0] = 1.0
+            values = values * np.repeat(lengths,np.diff(basis.indptr))
+        if accuracy:
+            values = np.round(values,accuracy)
+        rows = np.repeat(np.arange(len(basis)),np.diff(basis.indptr))
+        kept = values != 0
+        orthogonal_set = Sparse_Vector_Set((rows[kept],basis.indices[kept],values[kept]),dimensions = basis.dimensions)
+
+    if report:
+        return orthogonal_set, orthogonalisation_report
+    return orthogonal_set
+
+
+# the other names that each backend can be given by
+engine_aliases = {"numpy": "numpy-gs", "blocked": "blocked-gs"}
+
+# the backends that Vector_Set.orthogonalisation can dispatch to along with what each of them supports
+# complex: works on complex vector sets
+# rank_revealing: can drop linearly dependent vectors and report the rank of the set, using its rank_function
+# resumable: its function takes start_basis and start_norms, so a set can be carried on from a basis found by an earlier run
+# in_place: its function takes out, an array the basis is written into instead of a new array
+# wide: works on sets with more vectors than entries, where the vectors after the first independent ones are dependent
+# streaming: builds the basis one vector at a time, so vectors can be added as they arrive
+backends = {
+    "loop": {"function": None, "rank_function": None, "complex": True, "rank_revealing": False, "streaming": True, "resumable": False, "in_place": False,
+             "wide": True},
+    "numpy-gs": {"function": _numpy_gram_schmidt, "rank_function": _rank_revealing_gram_schmidt, "complex": True, "rank_revealing": True, "streaming": True, "resumable": True,
+                 "in_place": True, "wide": True},
+    "blocked-gs": {"function": _blocked_gram_schmidt, "rank_function": None, "complex": True, "rank_revealing": False, "streaming": False, "resumable": True,
+                   "in_place": True, "wide": True},
+    "householder": {"function": _householder_orthonormalisation, "rank_function": None, "complex": True, "rank_revealing": False, "streaming": False, "resumable": False,
+                    "in_place": False, "wide": False},
+}
+
+# the order in which choose_backend tries the backends, fastest first
+backend_preference = ["householder","blocked-gs","numpy-gs","loop"]
+
+
+def register_backend(name,function,complex = True,streaming = False,rank_function = None,resumable = False,in_place = False,wide = True):
+    '''
+    Adds a backend to the registry so that it can be used by Vector_Set.orthogonalisation.
+
+    Parameters
+    ------------
+    name : str
+        The name that will be given as the engine argument to use the backend.
+    function : function
+        Takes a 2-D array of vectors along with the algorithm and block_size keyword arguments,
+        and returns the orthonormal basis and the norm of each orthogonal vector before normalisation.
+    complex : bool
+        True if the backend works on complex vector sets.
+    streaming : bool
+        True if the backend builds the basis one vector at a time.
+    rank_function : function
+        Set to None if the backend has no rank-revealing mode. Otherwise takes a 2-D array of vectors along with the algorithm,
+        tolerance and pivoting keyword arguments, and returns the basis and norms of the kept vectors along with their indices.
+    resumable : bool
+        True if the function also takes the start_basis and start_norms keyword arguments.
+    in_place : bool
+        True if the function also takes the out keyword argument, a C-contiguous array of the same shape and type as the vectors that the basis is written into.
+    wide : bool
+        True if the function works on sets with more vectors than entries, returning a row for every vector.
+    '''
+    backends[name] = {"function": function, "rank_function": rank_function, "complex": complex, "rank_revealing": rank_function is not None, "streaming": streaming,
+                      "resumable": resumable, "in_place": in_place, "wide": wide}
+    if name not in backend_preference:
+        backend_preference.append(name)
+
+
+def choose_backend(complex = False,rank_revealing = False,streaming = False,wide = False):
+    '''
+    Chooses the fastest backend that supports everything that is required.
+
+    Parameters
+    ------------
+    complex : bool
+        True if the vector set contains complex values.
+    rank_revealing : bool
+        True if linearly dependent vectors need to be dropped.
+    streaming : bool
+        True if the basis has to be built one vector at a time.
+    wide : bool
+        True if the set has more vectors than entries.
+
+    Outputs
+    --------
+    name : str
+        The name of the chosen backend.
+    '''
+    required = {"complex": complex, "rank_revealing": rank_revealing, "streaming": streaming, "wide": wide}
+    for name in backend_preference:
+        capabilities = backends[name]
+        if all(capabilities[capability] for capability in required if required[capability]):
+            return name
+
+    print("Error: No backend supports all of {0}".format([capability for capability in required if required[capability]]))
+    exit()
+
+
+class Incremental_Basis:
+    """
+    A class used to keep an orthonormal basis up to date as vectors arrive one at a time.
+    Each new vector is only orthogonalised against the stored basis, using the same projections as the numpy-gs engine.
+
+    Attributes
+    --------------
+    basis : array
+        A 2-D array view of the orthonormal basis vectors found so far.
+    rank : int
+        The number of vectors in the basis.
+    dimension : int
+        The number of entries in each vector, set by the first vector added if not given.
+    algorithm : str
+        The variant of the Gram-Schmidt process used, one of "classical", "modified" or "cgs2".
+    tolerance : float
+        A vector is not added when the norm of its residual is no more than tolerance times its original norm.
+    """
+
+    def __init__(self,dimension = None,algorithm = "cgs2",tolerance = 1e-12,capacity = 16,complex = False):
+        """
+        Constructs all necessary attributes for the Incremental_Basis object.
+
+        Parameters
+        -----------
+        dimension : int
+            The number of entries in each vector. Set by the first vector added when None.
+        algorithm : str
+            Set to "cgs2" as default, as the basis is reused many times and should stay orthogonal.
+        tolerance : float
+            Vectors that are linearly dependent on the basis within this tolerance are not added.
+        capacity : int
+            The number of basis vectors that space is first made for. The storage doubles each time it is filled.
+        complex : bool
+            True if complex vectors will be added. A real basis is converted automatically when a complex vector is added.
+        """
+        if algorithm not in algorithms:
+            print("Error: The algorithm should be one of {0}. An incorrect value of {1} has been inputted".format(algorithms,algorithm))
+            exit()
+
+        self.dimension = dimension
+        self.algorithm = algorithm
+        self.tolerance = tolerance
+        self.rank = 0
+        self._capacity = max(int(capacity),1)
+        self._dtype = np.dtype(np.complex128 if complex else np.float64)
+        self._vectors = None
+        if dimension is not None:
+            self._vectors = np.empty((self._capacity,dimension),dtype = self._dtype)
+
+    @property
+    def basis(self):
+        if self._vectors is None:
+            return np.empty((0,0),dtype = self._dtype)
+        return self._vectors[:self.rank]
+
+    def __len__(self):
+        return self.rank
+
+    def _prepare(self,vector):
+        """
+        Converts a vector to an array and makes sure the storage can hold it.
+        """
+        vector = np.asarray(vector)
+        if np.iscomplexobj(vector) and self._dtype.kind != "c":
+            self._dtype = np.dtype(np.complex128)
+            if self._vectors is not None:
+                self._vectors = self._vectors.astype(self._dtype)
+        vector = vector.astype(self._dtype,copy = False)
+
+        if self.dimension is None:
+            self.dimension = vector.shape[0]
+        if self._vectors is None:
+            self._vectors = np.empty((self._capacity,self.dimension),dtype = self._dtype)
+        if vector.shape != (self.dimension,):
+            print("Error: The vector has {0} entries but the basis vectors have {1} entries".format(vector.shape,self.dimension))
+            exit()
+        return vector
+
+    def _orthogonalise(self,vector):
+        """
+        Removes the projections of a vector onto the basis, giving the residual and the coefficients.
+        """
+        if self.algorithm == "modified":
+            coefficients = np.zeros(self.rank,dtype = self._dtype)
+            for index in range(self.rank):
+                coefficients[index] = self._vectors[index].conj() @ vector
+                vector = vector - coefficients[index] * self._vectors[index]
+            return vector, coefficients
+
+        passes = 2 if self.algorithm == "cgs2" else 1
+        return _remove_projections(self.basis,vector,passes = passes)
+
+    def add(self,vector):
+        """
+        Orthogonalises a new vector against the basis and adds it to the basis if it is not linearly dependent on it.
+
+        Parameters
+        -----------
+        vector : list, array
+            The vector to be added.
+
+        Outputs
+        --------
+        coefficients : array
+            The component of the vector along each basis vector. If the vector was added to the basis, its last entry is the norm of the residual,
+            so the vector equals coefficients @ basis. If the vector was not added it has one entry for each of the earlier basis vectors.
+        """
+        vector = self._prepare(vector)
+        residual, coefficients = self._orthogonalise(vector)
+        norm = np.linalg.norm(residual)
+        if norm <= self.tolerance * np.linalg.norm(vector):
+            return coefficients
+
+        # grow the storage geometrically so adding n vectors only copies the basis O(log n) times
+        if self.rank == self._vectors.shape[0]:
+            grown_vectors = np.empty((2 * self._vectors.shape[0],self.dimension),dtype = self._dtype)
+            grown_vectors[:self.rank] = self._vectors[:self.rank]
+            self._vectors = grown_vectors
+
+        self._vectors[self.rank] = residual / norm
+        self.rank += 1
+        return np.append(coefficients,norm)
+
+    def project(self,vector):
+        """
+        Projects a vector onto the space spanned by the basis.
+
+        Parameters
+        -----------
+        vector : list, array
+            The vector to be projected.
+
+        Outputs
+        --------
+        projection : array
+            The part of the vector that lies in the space spanned by the basis.
+        """
+        vector = self._prepare(vector)
+        return vector - self._orthogonalise(vector)[0]
+
+    def residual(self,vector):
+        """
+        Removes the part of a vector that lies in the space spanned by the basis.
+
+        Parameters
+        -----------
+        vector : list, array
+            The vector to be orthogonalised.
+
+        Outputs
+        --------
+        residual : array
+            The part of the vector that is orthogonal to every basis vector.
+        """
+        vector = self._prepare(vector)
+        return self._orthogonalise(vector)[0]
+
+
+def _batch_gram_schmidt(vectors,algorithm = "classical",tolerance = 1e-12):
+    '''
+    Carries out the Gram-Schmidt process on every set of a 3-D array at once, with each step broadcast across the whole batch.
+
+    Parameters
+    ------------
+    vectors : array
+        A 3-D array of shape (batch, n, d) where each vectors[i] is a vector set with a vector on each row.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+    tolerance : float
+        A vector is treated as linearly dependent when the norm of its residual is no more than tolerance times its original norm.
+
+    Outputs
+    --------
+    basis : array
+        A 3-D array of the orthonormal vectors of each set. Linearly dependent vectors are left as zero vectors.
+    norms : array
+        A 2-D array of the norm of each orthogonal vector before it was normalised, zero for linearly dependent vectors.
+    '''
+    basis = np.zeros_like(vectors)
+    norms = np.zeros(vectors.shape[:2])
+    original_norms = np.linalg.norm(vectors,axis = 2)
+    passes = 2 if algorithm == "cgs2" else 1
+    if algorithm == "modified":
+        residuals = vectors.copy()
+
+    for index in range(vectors.shape[1]):
+        if algorithm == "modified":
+            vector = residuals[:,index]
+        else:
+            vector = vectors[:,index]
+            if index > 0:
+                earlier_basis = basis[:,:index]
+                for _ in range(passes):
+                    # a batched matrix-vector product for the inner products, then one for the projections to remove
+                    coefficients = np.matmul(earlier_basis.conj(),vector[:,:,np.newaxis])
+                    vector = vector - np.matmul(coefficients.transpose(0,2,1),earlier_basis)[:,0]
+
+        norm = np.linalg.norm(vector,axis = 1)
+        independent = norm > tolerance * original_norms[:,index]
+        norms[:,index] = np.where(independent,norm,0.0)
+        basis[:,index] = np.where(independent[:,np.newaxis],vector,0.0) / np.where(independent,norm,1.0)[:,np.newaxis]
+
+        if algorithm == "modified" and index + 1 < vectors.shape[1]:
+            remaining = residuals[:,index + 1:]
+            coefficients = np.matmul(remaining,basis[:,index].conj()[:,:,np.newaxis])
+            remaining -= coefficients * basis[:,index][:,np.newaxis,:]
+
+    return basis, norms
+
+
+def _batch_gram_schmidt_worker(memory_names,shape,dtype,start,end,algorithm,tolerance):
+    '''
+    Runs _batch_gram_schmidt on the sets start to end of a batch held in shared memory, writing the results back into shared memory.
+    Used by orthogonalise_batch so that the arrays are never pickled between processes.
+
+    Parameters
+    ------------
+    memory_names : tuple
+        The names of the shared memory blocks holding the input vectors, the output basis and the output norms.
+    shape : tuple
+        The shape of the whole batch.
+    dtype : str
+        The type of the entries of the input vectors and output basis.
+    start : int
+        The position of the first set to be orthogonalised.
+    end : int
+        The position after the last set to be orthogonalised.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use.
+    tolerance : float
+        The tolerance below which vectors are treated as linearly dependent.
+    '''
+    memories = [shared_memory.SharedMemory(name = name) for name in memory_names]
+    try:
+        vectors = np.ndarray(shape,dtype = dtype,buffer = memories[0].buf)
+        basis = np.ndarray(shape,dtype = dtype,buffer = memories[1].buf)
+        norms = np.ndarray(shape[:2],dtype = float,buffer = memories[2].buf)
+        basis[start:end], norms[start:end] = _batch_gram_schmidt(vectors[start:end],algorithm = algorithm,tolerance = tolerance)
+        # the arrays have to be released before the shared memory can be closed
+        del vectors, basis, norms
+    finally:
+        for memory in memories:
+            memory.close()
+
+
+def _parallel_batch_gram_schmidt(vectors,workers,algorithm = "classical",tolerance = 1e-12):
+    '''
+    Splits a batch of vector sets between a pool of processes, which all read and write the arrays through shared memory.
+
+    Parameters
+    ------------
+    vectors : array
+        A 3-D array of shape (batch, n, d) where each vectors[i] is a vector set.
+    workers : int
+        The number of processes to use.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use.
+    tolerance : float
+        The tolerance below which vectors are treated as linearly dependent.
+
+    Outputs
+    --------
+    basis : array
+        A 3-D array of the orthonormal vectors of each set, in the input order.
+    norms : array
+        A 2-D array of the norm of each orthogonal vector before it was normalised.
+    '''
+    sizes = [vectors.nbytes,vectors.nbytes,vectors.shape[0] * vectors.shape[1] * np.dtype(float).itemsize]
+    memories = [shared_memory.SharedMemory(create = True,size = max(size,1)) for size in sizes]
+    try:
+        np.ndarray(vectors.shape,dtype = vectors.dtype,buffer = memories[0].buf)[...] = vectors
+
+        # a few chunks per worker so that a slow chunk does not hold up the whole batch
+        boundaries = np.linspace(0,vectors.shape[0],min(4 * workers,vectors.shape[0]) + 1).astype(int)
+        memory_names = tuple(memory.name for memory in memories)
+        with concurrent_futures.ProcessPoolExecutor(max_workers = workers,initializer = _start_worker_profiling,initargs = (profiling_enabled(),)) as executor:
+            futures = [executor.submit(_profiled_call,_batch_gram_schmidt_worker,memory_names,vectors.shape,vectors.dtype.str,start,end,algorithm,tolerance)
+                       for start, end in zip(boundaries[:-1],boundaries[1:]) if end > start]
+            for future in futures:
+                _merge_worker_profile(*future.result())
+
+        basis = np.ndarray(vectors.shape,dtype = vectors.dtype,buffer = memories[1].buf).copy()
+        norms = np.ndarray(vectors.shape[:2],dtype = float,buffer = memories[2].buf).copy()
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+
+    return basis, norms
+
+
+@_profile_stage("orthogonalise_batch")
+def orthogonalise_batch(sets,normalised = True,accuracy = 3,algorithm = "classical",tolerance = 1e-12,workers = None):
+    '''
+    Orthogonalises many independent vector sets in one call, avoiding the cost of handling each set separately.
+    Sets of the same shape are stacked and worked on together, so a ragged batch is grouped by shape automatically.
+
+    Parameters
+    ------------
+    sets : array, list
+        A 3-D array of shape (batch, n, d), or a list of 2-D vector sets that may have different shapes.
+    normalised : bool
+        Set to True as default. If value is True then the orthogonal sets will be normalised.
+    accuracy : int
+        The number of decimal places to which each entry in the output sets will be rounded to. Value of None or False leaves the sets unrounded.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+    tolerance : float
+        A vector is treated as linearly dependent when the norm of its residual is no more than tolerance times its original norm.
+        Linearly dependent vectors are given as zero vectors in the output.
+    workers : int
+        Set to None as default, which orthogonalises the batch in this process.
+        Otherwise the batch is split between this many processes, with the arrays shared between them rather than copied.
+
+    Outputs
+    --------
+    orthogonal_sets : array, list
+        A 3-D array of the orthogonal or orthonormal sets when all sets have the same shape, otherwise a list of 2-D arrays in the input order.
+    ranks : array
+        The number of linearly independent vectors in each set. A set is full rank when this equals its number of vectors.
+    '''
+    if algorithm not in algorithms:
+        print("Error: The algorithm should be one of {0}. An incorrect value of {1} has been inputted".format(algorithms,algorithm))
+        exit()
+
+    try:
+        stacked_sets = np.asarray(sets)
+        ragged = stacked_sets.ndim != 3 or stacked_sets.dtype == object
+    except ValueError:
+        ragged = True
+
+    if ragged:
+        # group the sets by shape and type, then orthogonalise each group as its own batch
+        sets = [np.asarray(vector_set) for vector_set in sets]
+        groups = {}
+        for position, vector_set in enumerate(sets):
+            if vector_set.ndim != 2:
+                print("Error: Every vector set should be 2-D. Set {0} has shape {1}".format(position,vector_set.shape))
+                exit()
+            groups.setdefault((vector_set.shape,np.iscomplexobj(vector_set)),[]).append(position)
+
+        orthogonal_sets = [None] * len(sets)
+        ranks = np.zeros(len(sets),dtype = int)
+        for positions in groups.values():
+            group_sets, group_ranks = orthogonalise_batch(np.stack([sets[position] for position in positions]),normalised = normalised,accuracy = accuracy,algorithm = algorithm,tolerance = tolerance,workers = workers)
+            for group_position, position in enumerate(positions):
+                orthogonal_sets[position] = group_sets[group_position]
+            ranks[positions] = group_ranks
+        return orthogonal_sets, ranks
+
+    if np.iscomplexobj(stacked_sets):
+        vectors = stacked_sets.astype(complex)
+    else:
+        vectors = stacked_sets.astype(float)
+    if workers is not None and workers > 1 and vectors.shape[0] > 1:
+        basis, norms = _parallel_batch_gram_schmidt(vectors,workers,algorithm = algorithm,tolerance = tolerance)
+    else:
+        basis, norms = _batch_gram_schmidt(vectors,algorithm = algorithm,tolerance = tolerance)
+    ranks = np.count_nonzero(norms,axis = 1)
+
+    # as in Vector_Set.orthogonalisation, the first vector of each set is always normalised
+    if not normalised and basis.shape[1] > 0:
+        norms[:,0] = np.where(norms[:,0] > 0,1.0,0.0)
+        basis = basis * norms[:,:,np.newaxis]
+    if accuracy:
+        basis = np.round(basis,accuracy)
+
+    return basis, ranks
+
+
+# the largest number of bytes of results that an Orthogonalisation_Cache holds in memory by default
+default_cache_size = 256 * 1024 * 1024
+# the largest number of bytes of files that an Orthogonalisation_Cache keeps in its directory by default
+default_disk_cache_size = 4 * 1024 * 1024 * 1024
+
+
+class Orthogonalisation_Cache:
+    """
+    A class used to keep the results of Vector_Set.orthogonalisation so that repeated sets are not orthogonalised again.
+    Results are found by a hash of the bytes of the input set along with every setting that changes the output.
+    The most recently used results are kept in memory up to a size limit, and can also be saved as .npy files in a directory
+    so that they are kept between runs, up to a second size limit. Each file is written under a temporary name and then renamed,
+    so a process reading the directory never sees half a file, and a result whose files are missing or unreadable is treated as a miss.
+
+    The unrounded basis of each set is also kept, found by a chain of hashes with one link per vector,
+    so that the basis of the first k vectors of a set can be found from the hash of those k vectors alone.
+    As the first k vectors of the Gram-Schmidt process only depend on the first k input vectors,
+    a set that starts with the vectors of a cached set only needs the vectors after them to be orthogonalised.
+    Each basis saved in the directory keeps its chain of hashes, so a later run can carry on from the first vectors of any saved basis.
+
+    Attributes
+    --------------
+    max_bytes : int
+        The largest number of bytes of results held in memory. The least recently used results are removed once this is passed.
+    directory : str
+        The directory the results are saved in, or None if results are only held in memory.
+    max_disk_bytes : int
+        The largest number of bytes of files kept in the directory. The least recently used files are removed once this is passed.
+    hits : int
+        The number of times a result was found in the cache.
+    disk_hits : int
+        The number of those hits that were found in the directory rather than in memory.
+    misses : int
+        The number of times a result was not found in the cache.
+    evictions : int
+        The number of results removed from memory to stay under max_bytes.
+    disk_evictions : int
+        The number of results and bases removed from the directory to stay under max_disk_bytes.
+    prefix_hits : int
+        The number of times a set was carried on from the cached basis of its first vectors.
+    reused_vectors : int
+        The total number of vectors that did not have to be orthogonalised again because of prefix hits.
+    """
+
+    def __init__(self,max_bytes = None,directory = None,max_disk_bytes = None):
+        """
+        Constructs all necessary attributes for the Orthogonalisation_Cache object.
+
+        Parameters
+        -----------
+        max_bytes : int
+            The largest number of bytes of results held in memory. Defaults to default_cache_size when None.
+        directory : str
+            The directory results are saved in. Value of None keeps results in memory only. The directory is made if it does not exist.
+        max_disk_bytes : int
+            The largest number of bytes of files kept in the directory. Defaults to default_disk_cache_size when None.
+        """
+        self.max_bytes = default_cache_size if max_bytes is None else max_bytes
+        self.directory = directory
+        self.max_disk_bytes = default_disk_cache_size if max_disk_bytes is None else max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.prefix_hits = 0
+        self.reused_vectors = 0
+        self.memory_bytes = 0
+        self._results = OrderedDict()
+        # maps the hash of the first k vectors of a cached basis to the key of that basis and k
+        self._prefix_index = {}
+        # maps the hash of the first k vectors of a basis saved in the directory to its file and k, read when first needed
+        self._disk_prefix_index = None
+        # the bytes of the files in the directory, found when first needed and then added to as files are written
+        self._disk_bytes = None
+
+        if directory is not None:
+            os.makedirs(directory,exist_ok = True)
+
+    def key(self,vectors,**settings):
+        """
+        Finds the key of a vector set and the settings used to orthogonalise it.
+
+        Parameters
+        -----------
+        vectors : array
+            The vector set as a 2-D array.
+        settings : 
+            Every setting that changes the output, given as keyword arguments.
+
+        Outputs
+        --------
+        key : str
+            The SHA-256 hash of the set and settings as a hexadecimal string.
+        """
+        vectors = np.ascontiguousarray(vectors)
+        hasher = hashlib.sha256()
+        hasher.update(repr((vectors.shape,vectors.dtype.str,sorted(settings.items()))).encode())
+        hasher.update(memoryview(vectors).cast("B"))
+        return hasher.hexdigest()
+
+    @_profile_stage("cache get")
+    def get(self,key):
+        """
+        Looks for a result in memory, then in the directory.
+
+        Parameters
+        -----------
+        key : str
+            The key of the result, from Orthogonalisation_Cache.key.
+
+        Outputs
+        --------
+        result : tuple
+            The orthogonal set as an array and its report, or None if the result is not in the cache.
+        """
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key]
+
+        if self.directory is not None:
+            filename = os.path.join(self.directory,key + ".npy")
+            try:
+                orthogonal_array = np.load(filename)
+                with open(os.path.join(self.directory,key + ".json")) as file:
+                    orthogonalisation_report = json.load(file)
+                # the time of a file is its last use, so the least recently used files are removed first
+                os.utime(filename)
+            except (OSError,ValueError,EOFError):
+                # the files may have been removed or not yet written by another process
+                orthogonal_array = None
+            if orthogonal_array is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._store(key,(orthogonal_array,orthogonalisation_report))
+                return orthogonal_array, orthogonalisation_report
+
+        self.misses += 1
+        return None
+
+    @_profile_stage("cache put")
+    def put(self,key,orthogonal_array,orthogonalisation_report):
+        """
+        Adds a result to the cache, and saves it in the directory if there is one.
+
+        Parameters
+        -----------
+        key : str
+            The key of the result, from Orthogonalisation_Cache.key.
+        orthogonal_array : array
+            The orthogonal set.
+        orthogonalisation_report : dict
+            The report of the orthogonalisation.
+        """
+        self._store(key,(orthogonal_array,orthogonalisation_report))
+        if self.directory is not None:
+            # the report is written first, so a process that finds the array also finds its report
+            self._write_file(key + ".json",lambda file: file.write(json.dumps(orthogonalisation_report).encode()))
+            self._write_file(key + ".npy",lambda file: np.save(file,orthogonal_array))
+            self._evict_files()
+
+    def prefix_keys(self,vectors,**settings):
+        """
+        Finds the chain of hashes of a vector set, where the hash of the first k vectors is found from the hash of the first k-1 vectors and the k-th vector.
+
+        Parameters
+        -----------
+        vectors : array
+            The vector set as a 2-D array.
+        settings : 
+            Every setting that changes the unrounded basis, given as keyword arguments.
+
+        Outputs
+        --------
+        keys : list
+            The hash of the first k vectors as a hexadecimal string at position k-1, for every k.
+        """
+        vectors = np.ascontiguousarray(vectors)
+        link = hashlib.sha256(repr((vectors.shape[1:],vectors.dtype.str,sorted(settings.items()))).encode()).digest()
+        keys = []
+        for row in vectors:
+            hasher = hashlib.sha256(link)
+            hasher.update(memoryview(row).cast("B"))
+            link = hasher.digest()
+            keys.append(hasher.hexdigest())
+        return keys
+
+    def get_prefix(self,keys):
+        """
+        Looks for the longest cached basis of the first vectors of a set, in memory and then in the directory.
+
+        Parameters
+        -----------
+        keys : list
+            The chain of hashes of the set, from Orthogonalisation_Cache.prefix_keys.
+
+        Outputs
+        --------
+        start_basis : array
+            The orthonormal basis of the first vectors of the set, or None if no prefix of the set is in the cache.
+        start_norms : array
+            The norm of each vector of start_basis before it was normalised, or None.
+        """
+        for length in range(len(keys),0,-1):
+            found = self._prefix_index.get(keys[length - 1])
+            if found is not None and found[0] in self._results:
+                self._results.move_to_end(found[0])
+                basis, norms = self._results[found[0]][:2]
+                self.prefix_hits += 1
+                self.reused_vectors += length
+                return basis[:length], norms[:length]
+
+            if self.directory is not None:
+                # a basis saved by another process since the directory was read can still be found by the hash of all its vectors
+                filename = self._disk_prefixes().get(keys[length - 1],(os.path.join(self.directory,keys[length - 1] + ".npz"),))[0]
+                try:
+                    with np.load(filename) as saved:
+                        basis, norms = saved["basis"][:length].copy(), saved["norms"][:length].copy()
+                    os.utime(filename)
+                except (OSError,ValueError,EOFError,KeyError,zipfile.BadZipFile):
+                    basis = None
+                if basis is not None:
+                    self._store_prefix(keys[:length],basis,norms)
+                    self.prefix_hits += 1
+                    self.reused_vectors += length
+                    return basis, norms
+
+        return None, None
+
+    def put_prefix(self,keys,basis,norms):
+        """
+        Adds the unrounded basis of a set to the cache, and saves it in the directory if there is one.
+
+        Parameters
+        -----------
+        keys : list
+            The chain of hashes of the set, from Orthogonalisation_Cache.prefix_keys.
+        basis : array
+            The orthonormal basis of the set.
+        norms : array
+            The norm of each basis vector before it was normalised.
+        """
+        if not keys:
+            return
+        self._store_prefix(keys,basis,norms)
+        if self.directory is not None:
+            filename = self._write_file(keys[-1] + ".npz",lambda file: np.savez(file,basis = basis,norms = norms,keys = np.array(keys)))
+            if self._disk_prefix_index is not None:
+                self._index_disk_prefix(filename,keys)
+            self._evict_files()
+
+    def _write_file(self,name,write):
+        """
+        Writes a file in the directory under a temporary name and then renames it, so that it is never seen half written.
+        """
+        filename = os.path.join(self.directory,name)
+        descriptor, temporary_filename = tempfile.mkstemp(dir = self.directory,suffix = ".tmp")
+        try:
+            with os.fdopen(descriptor,"wb") as file:
+                write(file)
+            if self._disk_bytes is not None:
+                self._disk_bytes += os.path.getsize(temporary_filename) - (os.path.getsize(filename) if os.path.isfile(filename) else 0)
+            os.replace(temporary_filename,filename)
+        except BaseException:
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+            raise
+        return filename
+
+    def _evict_files(self):
+        """
+        Removes the least recently used results and bases from the directory until its files are no larger than max_disk_bytes.
+        The directory is only read again once the bytes written since it was last read pass the limit, as other processes may also write to it.
+        """
+        if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+            return
+
+        # the .npy and .json files of a result are removed together, files still being written by other processes are left alone
+        groups = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith((".npy",".json",".npz")):
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                group = groups.setdefault(os.path.splitext(entry.name)[0],[0,0.0,[]])
+                group[0] += status.st_size
+                group[1] = max(group[1],status.st_mtime)
+                group[2].append(entry.path)
+
+        self._disk_bytes = sum(group[0] for group in groups.values())
+        removed = set()
+        for size, _, filenames in sorted(groups.values(),key = lambda group: group[1]):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            for filename in filenames:
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+                removed.add(filename)
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+
+        if removed and self._disk_prefix_index is not None:
+            self._disk_prefix_index = {key: found for key, found in self._disk_prefix_index.items() if found[0] not in removed}
+
+    def _disk_prefixes(self):
+        """
+        Gives the map from the hash of the first k vectors of each basis saved in the directory to its file and k,
+        reading the chain of hashes saved with every basis the first time it is needed.
+        """
+        if self._disk_prefix_index is None:
+            self._disk_prefix_index = {}
+            for name in sorted(os.listdir(self.directory)):
+                if name.endswith(".npz"):
+                    filename = os.path.join(self.directory,name)
+                    try:
+                        with np.load(filename) as saved:
+                            keys = saved["keys"].tolist() if "keys" in saved.files else []
+                    except (OSError,ValueError,EOFError,zipfile.BadZipFile):
+                        continue
+                    self._index_disk_prefix(filename,keys)
+        return self._disk_prefix_index
+
+    def _index_disk_prefix(self,filename,keys):
+        """
+        Points the hash of each prefix of a basis saved in the directory at its file.
+        """
+        for length, key in enumerate(keys,start = 1):
+            self._disk_prefix_index[key] = (filename,length)
+
+    def _store_prefix(self,keys,basis,norms):
+        """
+        Adds a basis to memory and points the hash of each of its prefixes at it.
+        """
+        entry_key = "prefix-" + keys[-1]
+        self._store(entry_key,(basis,norms,keys))
+        for length, key in enumerate(keys,start = 1):
+            self._prefix_index[key] = (entry_key,length)
+
+    def _store(self,key,entry):
+        """
+        Adds an entry to memory, removing the least recently used entries until the memory limit is met.
+        """
+        if key in self._results:
+            self.memory_bytes -= _entry_bytes(self._results.pop(key))
+        self._results[key] = entry
+        self.memory_bytes += _entry_bytes(entry)
+
+        while self.memory_bytes > self.max_bytes and len(self._results) > 1:
+            removed_key, removed_entry = self._results.popitem(last = False)
+            self.memory_bytes -= _entry_bytes(removed_entry)
+            self.evictions += 1
+
+            # a removed basis can no longer be found from the hashes of its prefixes
+            if removed_key.startswith("prefix-"):
+                for prefix_key in removed_entry[2]:
+                    if self._prefix_index.get(prefix_key,(None,))[0] == removed_key:
+                        del self._prefix_index[prefix_key]
+
+    def statistics(self):
+        """
+        Gives the counters of the cache, which can be used to choose its size.
+
+        Outputs
+        --------
+        statistics : dict
+            The hits, disk_hits, misses, evictions, disk_evictions, prefix_hits and reused_vectors so far, along with the number of entries and bytes held in memory.
+        """
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "evictions": self.evictions, "disk_evictions": self.disk_evictions,
+                "prefix_hits": self.prefix_hits, "reused_vectors": self.reused_vectors, "entries": len(self._results), "memory_bytes": self.memory_bytes}
+
+
+def _entry_bytes(entry):
+    '''
+    Gives the number of bytes held by the arrays of an Orthogonalisation_Cache entry.
+    '''
+    return sum(item.nbytes for item in entry if isinstance(item,np.ndarray))
+
+
+# the characters that a line holding a vector can start with, other lines such as headers are skipped
+vector_line_starts = set("0123456789+-(.")
+# the number of bytes of the file that are read and converted at once by array_file_parser
+default_chunk_size = 16 * 1024 * 1024
+
+
+@_profile_stage("array_file_parser",reads = "filename")
+def array_file_parser(filename,delimiter = ",",chunk_size = None):
+    '''
+    Parses a CSV file and converts the vector set within the file to a 2-D array.
+    The file is read in large chunks and each chunk is converted with a single call to NumPy, rather than entry by entry.
+    Compatible with vector set files output by NumPy, and with entries such as 1e-3, 2j, 6.1+6j and (1+2j).
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file to be parsed. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
+    chunk_size : int
+        The approximate number of bytes read and converted at once. Defaults to default_chunk_size when None.
+
+    Outputs
+    --------
+    vector_set : array
+        The vector set contained within the file, one vector per row. The array is complex if any entry of the file is complex.
+    '''
+    chunks = []
+    contains_complex = False
+    for chunk in iter_file_chunks(filename,delimiter = delimiter,chunk_size = chunk_size):
+        # the type is taken from the first chunk, and only changed if a later chunk contains complex entries
+        if np.iscomplexobj(chunk) and not contains_complex:
+            contains_complex = True
+            chunks = [earlier_chunk.astype(complex) for earlier_chunk in chunks]
+        elif contains_complex:
+            chunk = chunk.astype(complex)
+        chunks.append(chunk)
+
+    if not chunks:
+        return np.empty((0,0))
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks)
+
+
+def iter_file_chunks(filename,delimiter = ",",chunk_size = None):
+    '''
+    Reads a CSV file of vectors a chunk at a time, so that only one chunk of the file is held in memory.
+    Each chunk is converted with a single call to NumPy. Used by array_file_parser and stream_orthogonalisation.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file to be read. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
+    chunk_size : int
+        The approximate number of bytes read and converted at once. Defaults to default_chunk_size when None.
+        At least one whole line is always read.
+
+    Outputs
+    --------
+    chunk : array
+        Yields a 2-D array of the vectors in each chunk, which is complex if any entry of that chunk is complex.
+    '''
+    if chunk_size is None:
+        chunk_size = default_chunk_size
+
+    columns = None
+    with open(filename) as file:
+        while True:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                break
+            lines = [line for line in lines if line.lstrip()[:1] in vector_line_starts]
+            if not lines:
+                continue
+
+            try:
+                chunk = np.loadtxt(lines,delimiter = delimiter,dtype = complex if any("j" in line for line in lines) else float,ndmin = 2)
+            except ValueError:
+                print("Error: Unable to parse the file into a vector set. Check that every entry is a number and that all vectors have the same number of entries")
+                exit()
+            if columns is not None and chunk.shape[1] != columns:
+                print("Error: Unable to parse the file into a vector set. Check that every entry is a number and that all vectors have the same number of entries")
+                exit()
+            columns = chunk.shape[1]
+            yield chunk
+
+
+@_profile_stage("file_parser",reads = "filename")
+def file_parser(filename,delimiter = ","):
+    '''
+    Parses a CSV file and converts the vector set within the file to a nested list.
+    Compatible with vector set files output by NumPy. See array_file_parser, which returns the vector set as an array.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file to be parsed. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
+    
+    Outputs
+    --------
+    vector_set : list
+        The vector set contained within the file.
+    '''
+    return array_file_parser(filename,delimiter = delimiter).tolist()
+
+
+@_profile_stage("csv_file_creater",writes = "new_filename")
+def csv_file_creater(vector_set, new_filename, delimiter = "," ):
+    '''
+    Takes a vector set and converts it into a CSV file. 
+
+    Parameters
+    ------------
+    vector_set : list, array
+        The vector set that will be converted to a CSV file.
+    new_filename : str
+        The name of the file that will be created. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
+    
+    Outputs
+    --------
+    CSV file
+    '''
+    # create the new file
+    with open(new_filename,"w") as file:
+        #create the file contents, joining each line in one go rather than adding one entry at a time
+        for vector in vector_set:
+            file.write(delimiter.join([str(entry) for entry in vector]) + "\n")
+
+
+# the file extension of sparse vector sets, CSV files with a row,column,value line for each nonzero entry
+sparse_extension = ".coo"
+
+
+@_profile_stage("sparse_file_parser",reads = "filename")
+def sparse_file_parser(filename,delimiter = ","):
+    '''
+    Reads a sparse vector set from a CSV file with a line of row,column,value for each nonzero entry, counting rows and columns from 0.
+    A first line of shape,vectors,dimension gives the dimensions of the set, otherwise they are one more than the largest row and column.
+    The file is read a chunk at a time, so only the nonzero entries are ever held in memory.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file to be read. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate the row, column and value of each entry. Standard delimiter is a comma.
+
+    Outputs
+    --------
+    vector_set : Sparse_Vector_Set
+        The vector set contained within the file.
+    '''
+    dimensions = None
+    with open(filename) as file:
+        first_line = file.readline().split(delimiter)
+    if first_line[0].strip().lower() == "shape":
+        dimensions = (int(first_line[1]),int(first_line[2]))
+
+    chunks = list(iter_file_chunks(filename,delimiter = delimiter))
+    if chunks and chunks[0].shape[1] != 3:
+        print("Error: Unable to parse the file into a sparse vector set. Check that every line gives the row, column and value of one entry")
+        exit()
+    entries = np.concatenate(chunks) if chunks else np.zeros((0,3))
+    try:
+        return Sparse_Vector_Set((entries[:,0].real.astype(np.int64),entries[:,1].real.astype(np.int64),entries[:,2]),dimensions = dimensions)
+    except ValueError as error:
+        print("Error: Unable to parse the file into a sparse vector set. {0}".format(error))
+        exit()
+
+
+@_profile_stage("sparse_file_creater",writes = "new_filename")
+def sparse_file_creater(vector_set,new_filename,delimiter = ","):
+    '''
+    Saves a vector set to a CSV file with a line of row,column,value for each nonzero entry, after a first line of shape,vectors,dimension.
+    See sparse_file_parser.
+
+    Parameters
+    ------------
+    vector_set : Sparse_Vector_Set, list, array
+        The vector set that will be saved, in any form accepted by Sparse_Vector_Set.
+    new_filename : str
+        The name of the file that will be created. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate the row, column and value of each entry. Standard delimiter is a comma.
+    '''
+    vector_set = Sparse_Vector_Set(vector_set)
+    rows = np.repeat(np.arange(len(vector_set)),np.diff(vector_set.indptr))
+    with open(new_filename,"w") as file:
+        file.write(delimiter.join(["shape",str(vector_set.dimensions[0]),str(vector_set.dimensions[1])]) + "\n")
+        for row, column, value in zip(rows.tolist(),vector_set.indices.tolist(),vector_set.data.tolist()):
+            file.write(delimiter.join([str(row),str(column),str(value)]) + "\n")
+
+
+# the file extensions that are read and written as NumPy binary files rather than CSV files
+binary_extensions = (".npy",".npz")
+
+
+@_profile_stage("load_vector_set",reads = "filename")
+def load_vector_set(filename,delimiter = ",",mmap = True):
+    '''
+    Loads a vector set from a .npy, .npz, .coo or CSV file, depending on the file extension.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file to be loaded. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate entries within a vector of a CSV file. Standard delimiter is a comma.
+    mmap : bool
+        Set to True as default. If value is True then a .npy file is memory-mapped rather than read,
+        so only the parts of the set that are used are loaded into memory. The mapped array is read-only.
+
+    Outputs
+    --------
+    vector_set : array
+        The vector set contained within the file, one vector per row.
+        For a .npz file this is the array saved as "vectors", or the first array if there is no such array.
+        For a .coo file this is a Sparse_Vector_Set, see sparse_file_parser.
+    '''
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == sparse_extension:
+        return sparse_file_parser(filename,delimiter = delimiter)
+    if extension == ".npy":
+        return np.load(filename,mmap_mode = "r" if mmap else None)
+    if extension == ".npz":
+        with np.load(filename) as archive:
+            if "vectors" in archive.files:
+                return archive["vectors"]
+            return archive[archive.files[0]]
+    return array_file_parser(filename,delimiter = delimiter)
+
+
+@_profile_stage("save_vector_set",writes = "filename")
+def save_vector_set(vector_set,filename,delimiter = ","):
+    '''
+    Saves a vector set to a .npy, .npz, .coo or CSV file, depending on the file extension.
+    The binary files are written directly from the array, so no entries are converted to text and no precision is lost.
+    A .coo file only holds the nonzero entries, see sparse_file_creater. A Sparse_Vector_Set saved to any other file type is made dense.
+
+    Parameters
+    ------------
+    vector_set : list, array, Sparse_Vector_Set
+        The vector set that will be saved.
+    filename : str
+        The name of the file that will be created. The file extension should be included within this string.
+    delimiter : str
+        The delimiter used to seperate entries within a vector of a CSV file. Standard delimiter is a comma.
+    '''
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == sparse_extension:
+        sparse_file_creater(vector_set,filename,delimiter = delimiter)
+        return
+    if isinstance(vector_set,Sparse_Vector_Set):
+        vector_set = vector_set.toarray()
+    if extension == ".npy":
+        np.save(filename,np.asarray(vector_set))
+    elif extension == ".npz":
+        np.savez(filename,vectors = np.asarray(vector_set))
+    else:
+        csv_file_creater(vector_set,filename,delimiter = delimiter)
+
+
+@_profile_stage("stream_orthogonalisation",reads = "filename",writes = "output_filename")
+def stream_orthogonalisation(filename,output_filename,normalised = True,accuracy = 3,algorithm = "classical",tolerance = 1e-12,delimiter = ",",chunk_size = None,buffer_size = 1024 * 1024):
+    '''
+    Orthogonalises the vector set in a CSV file without reading the whole file into memory.
+    The file is read a chunk at a time, each vector is orthogonalised against the basis found so far as it arrives,
+    and each finished vector is written to the output file straight away, so memory use depends on the size of the basis rather than the file.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the CSV file containing the vector set.
+    output_filename : str
+        The name of the CSV file the orthogonal set will be written to.
+    normalised : bool
+        Set to True as default. If value is True then the orthogonal set will be normalised.
+    accuracy : int
+        The number of decimal places to which each entry in the output set will be rounded to. Value of None or False leaves the set unrounded.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+    tolerance : float
+        Vectors that are linearly dependent on the vectors before them within this tolerance are left out of the output.
+    delimiter : str
+        The delimiter used to seperate entries within a vector. Standard delimiter is a comma.
+    chunk_size : int
+        The approximate number of bytes of the input file read at once. Defaults to default_chunk_size when None.
+    buffer_size : int
+        The number of bytes of output held in memory before they are written to the file.
+
+    Outputs
+    --------
+    summary : dict
+        The number of vectors read under "vectors" and the number written to the output under "rank".
+    '''
+    basis = Incremental_Basis(algorithm = algorithm,tolerance = tolerance)
+    vectors_read = 0
+
+    with open(output_filename,"w",buffering = buffer_size) as file:
+        for chunk in iter_file_chunks(filename,delimiter = delimiter,chunk_size = chunk_size):
+            for vector in chunk:
+                vectors_read += 1
+                rank = basis.rank
+                coefficients = basis.add(vector)
+                if basis.rank == rank:
+                    continue
+
+                # as in Vector_Set.orthogonalisation, the first vector is always normalised
+                orthogonal_vector = basis.basis[rank]
+                if not normalised and rank > 0:
+                    orthogonal_vector = orthogonal_vector * coefficients[-1]
+                if accuracy:
+                    orthogonal_vector = np.round(orthogonal_vector,accuracy)
+                file.write(delimiter.join([str(entry) for entry in orthogonal_vector.tolist()]) + "\n")
+
+    return {"vectors": vectors_read, "rank": basis.rank}
+
+
+# the largest number of bytes of vectors that out_of_core_orthogonalisation holds in memory by default
+default_memory_budget = 1024 * 1024 * 1024
+
+
+def _tile_order(tiles,held,buffered):
+    '''
+    Gives the order in which out_of_core_orthogonalisation projects a panel against the earlier tiles of the basis.
+    The tiles held in memory are used first, then the others are read going away from the tile in the read buffer,
+    so the last tile read is at the far end and the next sweep, which goes back the other way, starts with it already in memory.
+
+    Parameters
+    ------------
+    tiles : list
+        The (start, end) rows of every tile the panel is projected against.
+    held : list
+        The (start, end) rows of the tiles held in memory.
+    buffered : tuple
+        The (start, end) rows of the tile in the read buffer, or None if no tile has been read.
+
+    Outputs
+    --------
+    order : list
+        The tiles in the order they are used.
+    '''
+    remaining = [tile for tile in tiles if tile not in held]
+    if remaining and (buffered is None or buffered[0] >= remaining[len(remaining) // 2][0]):
+        remaining.reverse()
+    return [tile for tile in tiles if tile in held] + remaining
+
+
+@_profile_stage("out_of_core_orthogonalisation",reads = "filename",writes = "output_filename")
+def out_of_core_orthogonalisation(filename,output_filename,normalised = True,accuracy = 3,algorithm = "classical",memory_budget = None,panel_size = None):
+    '''
+    Orthogonalises a vector set in a .npy file that may be larger than memory, writing the orthogonal set to another .npy file.
+    Both files are memory-mapped, so the input is read one panel of vectors at a time and the basis grows on disk rather than in memory.
+    Each panel is orthogonalised against the finished basis one tile at a time with matrix-matrix products, as in the blocked engine,
+    then the vectors inside the panel are orthogonalised against each other by the blocked engine.
+
+    Every panel has to read the whole basis before it, so the basis is read about (number of panels) / 2 times in total.
+    The panels are therefore made as large as the memory budget allows, with tiles of the same size so that each read is one long run of the file.
+    The newest panel is kept in memory for the next panel, and the tiles are swept in alternating directions so the last tile read is used again,
+    saving two tile reads per panel.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the .npy file containing the vector set, one vector per row.
+    output_filename : str
+        The name of the .npy file the orthogonal set will be written to.
+    normalised : bool
+        Set to True as default. If value is True then the orthogonal set will be normalised.
+    accuracy : int
+        The number of decimal places to which each entry in the output set will be rounded to. Value of None or False leaves the set unrounded.
+        The set is rounded by a final pass over the output, as the unrounded basis is needed until every panel is done.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use, one of "classical", "modified" or "cgs2".
+        The modified algorithm projects each panel against the tiles one at a time, the cgs2 algorithm sweeps the tiles twice.
+    memory_budget : int
+        The number of bytes of vectors held in memory at once, shared between the panel, its working copies, the newest panel and a tile of the basis.
+        Defaults to default_memory_budget when None. The arrays NumPy needs for the products of each tile are a small part of this for sets of many entries.
+    panel_size : int
+        The number of vectors in each panel and tile. Defaults to the largest that fits in the memory budget when None.
+
+    Outputs
+    --------
+    summary : dict
+        The "vectors" and "dimension" of the set, the "panel_size" and number of "panels" used, the number of "tile_reads" of the basis,
+        and the "bytes_read" and "bytes_written" over the whole run, giving the I/O volume.
+    '''
+    if algorithm not in algorithms:
+        print("Error: The algorithm should be one of {0}. An incorrect value of {1} has been inputted".format(algorithms,algorithm))
+        exit()
+    if not filename.lower().endswith(".npy") or not output_filename.lower().endswith(".npy"):
+        print("Error: The out-of-core orthogonalisation reads and writes .npy files only, so the sets can be memory-mapped")
+        exit()
+
+    vectors = np.load(filename,mmap_mode = "r")
+    if vectors.ndim != 2:
+        print("Error: The vector set should be a list of vectors, but has dimensions {0}".format(vectors.shape))
+        exit()
+    dtype = np.complex128 if np.iscomplexobj(vectors) else np.float64
+    row_bytes = max(1,vectors.shape[1] * np.dtype(dtype).itemsize)
+
+    # the panel, its original or running copy, the temporary of each product, the newest panel and the tile read from the basis
+    if panel_size is None:
+        panel_size = (default_memory_budget if memory_budget is None else memory_budget) // (5 * row_bytes)
+    panel_size = max(1,min(panel_size,vectors.shape[0]))
+
+    basis = np.lib.format.open_memmap(output_filename,mode = "w+",dtype = dtype,shape = vectors.shape)
+    norms = np.empty(vectors.shape[0])
+    summary = {"vectors": vectors.shape[0], "dimension": vectors.shape[1], "panel_size": panel_size, "panels": 0, "tile_reads": 0,
+               "bytes_read": 0, "bytes_written": 0}
+    # the (rows, array) of the panel finished last and of the tile read last, the rest of the basis stays on disk
+    newest = None
+    buffered = None
+    passes = 2 if algorithm == "cgs2" else 1
+
+    for start in range(0,vectors.shape[0],panel_size):
+        end = min(start + panel_size,vectors.shape[0])
+        panel = np.array(vectors[start:end],dtype = dtype)
+        summary["bytes_read"] += vectors[start:end].nbytes
+
+        tiles = [(tile_start,min(tile_start + panel_size,start)) for tile_start in range(0,start,panel_size)]
+        for _ in range(passes):
+            # the classical coefficients come from the panel before this pass, the modified ones from the running residual
+            original = panel if algorithm == "modified" else panel.copy()
+            held = [pair[0] for pair in (newest,buffered) if pair is not None]
+            for tile in _tile_order(tiles,held,buffered[0] if buffered is not None else None):
+                if newest is not None and tile == newest[0]:
+                    tile_basis = newest[1]
+                elif buffered is not None and tile == buffered[0]:
+                    tile_basis = buffered[1]
+                else:
+                    buffered = (tile,np.array(basis[tile[0]:tile[1]]))
+                    tile_basis = buffered[1]
+                    summary["tile_reads"] += 1
+                    summary["bytes_read"] += tile_basis.nbytes
+                panel -= (original @ tile_basis.conj().T) @ tile_basis
+
+        # the vectors inside the panel are orthogonalised with the blocked engine, as the panel may hold thousands of vectors
+        panel_basis, norms[start:end] = _blocked_gram_schmidt(panel,algorithm = algorithm)
+        basis[start:end] = panel_basis
+        summary["bytes_written"] += panel_basis.nbytes
+        summary["panels"] += 1
+        newest = ((start,end),panel_basis)
+
+    # the lengths and rounding are applied last, as every panel is projected against the unrounded orthonormal basis
+    if not normalised or accuracy:
+        for start in range(0,vectors.shape[0],panel_size):
+            end = min(start + panel_size,vectors.shape[0])
+            rows = np.array(basis[start:end])
+            summary["bytes_read"] += rows.nbytes
+            if not normalised:
+                # as in Vector_Set.orthogonalisation, the first vector is always normalised
+                lengths = norms[start:end].copy()
+                if start == 0:
+                    lengths[0] = 1.0
+                rows *= lengths[:,np.newaxis]
+            if accuracy:
+                rows = np.round(rows,accuracy)
+            basis[start:end] = rows
+            summary["bytes_written"] += rows.nbytes
+
+    basis.flush()
+    del basis
+    return summary
+
+
+def _orthogonalise_file(filename,output_filename,normalised,accuracy,engine,algorithm,precision = "double",report = False):
+    '''
+    Reads, orthogonalises and optionally saves the vector set in a single file. Used by orthogonalise_files in each worker process.
+    The time is measured inside the worker, so it does not include any time spent waiting for a free process.
+
+    Parameters
+    ------------
+    filename : str
+        The name of the file containing the vector set.
+    output_filename : str
+        The name of the file the orthogonal set will be saved to. Value of None does not save the set.
+    normalised : bool
+        If value is True then the orthogonal set will be normalised.
+    accuracy : int
+        The number of decimal places to which each entry in the output set will be rounded to.
+    engine : str
+        The backend used to carry out the process.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use.
+    precision : str
+        The floating point precision to use, see Vector_Set.orthogonalisation.
+    report : bool
+        If value is True then a dictionary describing the run is returned alongside the set.
+
+    Outputs
+    --------
+    orthogonal_set : list
+        The orthogonal or orthonormal set, or None if it was saved to a file.
+    file_report : dict
+        Only returned when report is True. The "seconds" key gives the time taken to read, orthogonalise and save the set,
+        the "vectors" and "dimension" keys give the size of the set.
+    '''
+    start = time.perf_counter()
+    vector_set = load_vector_set(filename)
+    # a set saved to a binary file is kept as an array, so its entries are never turned into Python numbers
+    as_array = bool(output_filename) and output_filename.lower().endswith(binary_extensions)
+    if isinstance(vector_set,Sparse_Vector_Set) and bool(output_filename) and output_filename.lower().endswith(sparse_extension):
+        # a sparse set saved to a sparse file is never made dense
+        orthogonal_set = sparse_orthogonalisation(vector_set,normalised = normalised,accuracy = accuracy,algorithm = algorithm)
+    else:
+        orthogonal_set = Vector_Set.orthogonalisation(vector_set,normalised = normalised,accuracy = accuracy,engine = engine,algorithm = algorithm,precision = precision,
+                                                      as_array = as_array)
+    if output_filename:
+        save_vector_set(orthogonal_set,output_filename)
+        orthogonal_set = None
+
+    if report:
+        vectors, dimension = Vector_Set.set_dimensions(vector_set)
+        return orthogonal_set, {"seconds": time.perf_counter() - start, "vectors": vectors, "dimension": dimension}
+    return orthogonal_set
+
+
+@_profile_stage("orthogonalise_files")
+def orthogonalise_files(filenames,output_filenames = None,normalised = True,accuracy = 3,engine = "numpy-gs",algorithm = "classical",workers = None,precision = "double",report = False):
+    '''
+    Orthogonalises the vector sets in many .npy, .npz or CSV files, splitting the files between a pool of processes.
+    Each process reads and writes its own files, so no vector sets are passed between processes when the outputs are saved.
+
+    Parameters
+    ------------
+    filenames : list
+        The names of the files containing the vector sets.
+    output_filenames : list
+        The names of the files the orthogonal sets will be saved to, in the same order as filenames. Value of None returns the sets instead.
+    normalised : bool
+        Set to True as default. If value is True then the orthogonal sets will be normalised.
+    accuracy : int
+        The number of decimal places to which each entry in the output sets will be rounded to.
+    engine : str
+        The backend used to carry out the process, see Vector_Set.orthogonalisation.
+    algorithm : str
+        The variant of the Gram-Schmidt process to use.
+    workers : int
+        The number of processes to use. Defaults to the number of CPU cores when None.
+    precision : str
+        The floating point precision to use, see Vector_Set.orthogonalisation.
+    report : bool
+        Set to False as default. If value is True then a dictionary describing the run of each file is returned alongside the sets,
+        giving the time taken and the size of the set, see _orthogonalise_file.
+
+    Outputs
+    --------
+    orthogonal_sets : list
+        The orthogonal or orthonormal set of each file in the input order, or None for each file that was saved.
+    file_reports : list
+        Only returned when report is True. The report of each file in the input order.
+    '''
+    if output_filenames is None:
+        output_filenames = [None] * len(filenames)
+    if len(output_filenames) != len(filenames):
+        print("Error: {0} output filenames were given for {1} files".format(len(output_filenames),len(filenames)))
+        exit()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(filenames) <= 1:
+        results = [_orthogonalise_file(filename,output_filename,normalised,accuracy,engine,algorithm,precision,report) for filename, output_filename in zip(filenames,output_filenames)]
+    else:
+        with concurrent_futures.ProcessPoolExecutor(max_workers = min(workers,len(filenames)),initializer = _start_worker_profiling,
+                                                    initargs = (profiling_enabled(),)) as executor:
+            futures = [executor.submit(_profiled_call,_orthogonalise_file,filename,output_filename,normalised,accuracy,engine,algorithm,precision,report)
+                       for filename, output_filename in zip(filenames,output_filenames)]
+            results = [_merge_worker_profile(*future.result()) for future in futures]
+
+    if report:
+        return [result[0] for result in results], [result[1] for result in results]
+    return results
+
+
+# the settings of Vector_Set.orthogonalisation that a request to the server can give
+server_settings = ("normalised","accuracy","engine","algorithm","block_size","tolerance","pivoting","precision")
+
+
+def _request_vectors(request):
+    '''
+    Reads the vector set of a server request, given either as lists or as a base64 encoded .npy file.
+    '''
+    if "npy" in request:
+        return np.load(io.BytesIO(base64.b64decode(request["npy"])),allow_pickle = False)
+
+    vectors = np.asarray(request["vectors"],dtype = float)
+    if "imaginary" in request:
+        vectors = vectors + 1j * np.asarray(request["imaginary"],dtype = float)
+    return vectors
+
+
+def handle_request(request,cache = None):
+    '''
+    Carries out a single request of the server protocol used by serve_stream and serve_socket.
+
+    A request is a dictionary with the vector set given in one of two ways. "vectors" is a nested list of the real parts of the entries,
+    along with "imaginary", a nested list of the imaginary parts, for a complex set. Otherwise "npy" is a .npy file encoded in base64,
+    which keeps every entry exactly and is faster to read for large sets. Any of the settings in server_settings can also be given,
+    and an "id" that is copied into the response so that responses can be matched to requests.
+    A "report" of true asks for the report of the run, which is otherwise not worked out as it takes a product of the whole set with itself.
+
+    Parameters
+    ------------
+    request : dict
+        The request.
+    cache : Orthogonalisation_Cache
+        Set to None as default. If a cache is given then it is used for every request.
+
+    Outputs
+    --------
+    response : dict
+        The orthogonal set in the same form as the request ("vectors" and "imaginary", or "npy") along with the "report" of the run when it is asked for,
+        see Vector_Set.orthogonalisation. A request that cannot be carried out gives a response with an "error" message instead.
+    '''
+    response = {"id": request.get("id")}
+    unknown = set(request) - set(server_settings) - {"id","vectors","imaginary","npy","report"}
+    if unknown:
+        response["error"] = "Error: The request contains unknown keys {0}. The settings that can be given are {1}".format(sorted(unknown),list(server_settings))
+        return response
+
+    # the functions of this file print their errors and exit, so the message is kept and the server carries on.
+    # exit() also closes sys.stdin, which may be where the requests come from, so it is given a stand-in to close instead
+    printed = io.StringIO()
+    standard_input = sys.stdin
+    sys.stdin = io.StringIO()
+    try:
+        with redirect_stdout(printed):
+            vectors = _request_vectors(request)
+            settings = {name: request[name] for name in server_settings if name in request}
+            report = bool(request.get("report",False))
+            orthogonal_set = Vector_Set.orthogonalisation(vectors,report = report,cache = cache,as_array = True,**settings)
+            if report:
+                orthogonal_set, orthogonalisation_report = orthogonal_set
+    except SystemExit:
+        response["error"] = printed.getvalue().strip()
+        return response
+    except (KeyError,ValueError,TypeError) as error:
+        response["error"] = "Error: The vector set could not be read from the request. {0}".format(error)
+        return response
+    finally:
+        sys.stdin = standard_input
+
+    if "npy" in request:
+        encoded = io.BytesIO()
+        np.save(encoded,orthogonal_set)
+        response["npy"] = base64.b64encode(encoded.getvalue()).decode("ascii")
+    else:
+        response["vectors"] = orthogonal_set.real.tolist()
+        if np.iscomplexobj(orthogonal_set):
+            response["imaginary"] = orthogonal_set.imag.tolist()
+    if report:
+        response["report"] = orthogonalisation_report
+    return response
+
+
+def _respond(line,cache = None):
+    '''
+    Gives the JSON response line to a JSON request line of the server protocol.
+    '''
+    try:
+        request = json.loads(line)
+    except ValueError as error:
+        return json.dumps({"id": None, "error": "Error: The request is not valid JSON. {0}".format(error)})
+    if not isinstance(request,dict):
+        return json.dumps({"id": None, "error": "Error: The request should be a JSON object"})
+    return json.dumps(handle_request(request,cache = cache))
+
+
+def serve_stream(input_stream = None,output_stream = None,cache = None):
+    '''
+    Answers requests given one per line as JSON objects, writing one JSON response per line, until the input ends.
+    Keeping a single process running this way means each request does not pay for starting Python and importing NumPy.
+    See handle_request for the form of the requests and responses.
+
+    Parameters
+    ------------
+    input_stream : file
+        The text stream the requests are read from. Defaults to stdin when None.
+    output_stream : file
+        The text stream the responses are written to. Defaults to stdout when None.
+    cache : Orthogonalisation_Cache
+        Set to None as default. If a cache is given then it is used for every request.
+
+    Outputs
+    --------
+    requests : int
+        The number of requests answered.
+    '''
+    input_stream = sys.stdin if input_stream is None else input_stream
+    output_stream = sys.stdout if output_stream is None else output_stream
+
+    _import_numpy()
+
+    requests = 0
+    for line in input_stream:
+        if not line.strip():
+            continue
+        output_stream.write(_respond(line,cache = cache) + "\n")
+        output_stream.flush()
+        requests += 1
+    return requests
+
+
+def serve_socket(path,cache = None):
+    '''
+    Answers requests sent to a Unix socket, using the same line protocol as serve_stream for each connection.
+    Connections are answered one at a time until the process is interrupted, then the socket file is removed.
+
+    Parameters
+    ------------
+    path : str
+        The filename of the socket. An old socket file left at the path is replaced.
+    cache : Orthogonalisation_Cache
+        Set to None as default. If a cache is given then it is used for every request.
+    '''
+    import socketserver
+    if not hasattr(socketserver,"UnixStreamServer"):
+        print("Error: Unix sockets are not supported on this system, use serve_stream instead")
+        exit()
+
+    class Request_Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write((_respond(line.decode("utf-8"),cache = cache) + "\n").encode("utf-8"))
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    _import_numpy()
+    with socketserver.UnixStreamServer(path,Request_Handler) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(path)
+
+
+# the engines that give the same vectors as orthogonalise_batch, so that small sets using them can be coalesced by Async_Orthogonaliser
+batch_engines = ("loop","numpy-gs","blocked-gs")
+# the largest number of entries (vectors times entries per vector) of a set that Async_Orthogonaliser coalesces with other sets.
+# Larger sets spend long enough in NumPy that the cost of handling each set separately does not matter
+default_coalesce_size = 4096
+# the Async_Orthogonaliser used by orthogonalise_async, made again for each event loop
+_default_orthogonaliser = None
+
+
+def _orthogonalise_request(vector_set,settings):
+    '''
+    Carries out Vector_Set.orthogonalisation with a dictionary of settings. Used by Async_Orthogonaliser in each worker.
+    '''
+    return Vector_Set.orthogonalisation(vector_set,**settings)
+
+
+def _set_shape(vector_set):
+    '''
+    Gives the number of vectors and entries per vector of a vector set without converting it to an array, or None if it cannot be found.
+    '''
+    shape = getattr(vector_set,"dimensions",None) or getattr(vector_set,"shape",None)
+    try:
+        if shape is None:
+            shape = (len(vector_set),len(vector_set[0]))
+    except (TypeError,IndexError,KeyError):
+        return None
+    return tuple(shape) if len(shape) == 2 else None
+
+
+def _set_size(vector_set):
+    '''
+    Gives the number of entries of a vector set without converting it to an array, or None if it cannot be found.
+    '''
+    shape = _set_shape(vector_set)
+    return None if shape is None else shape[0] * shape[1]
+
+
+class Async_Orthogonaliser:
+    """
+    A class used to orthogonalise vector sets from asyncio code without blocking the event loop.
+    The work is carried out by a pool of threads or processes. NumPy releases the GIL during its larger operations, so threads suit most sets,
+    while processes also run the Python parts of the loop engine side by side.
+
+    Requests wait in a queue of at most max_pending sets, and at most workers sets are worked on at once, so a burst of requests
+    makes the callers wait in orthogonalise rather than piling up work without limit.
+    Small sets that can be given by orthogonalise_batch are coalesced: the sets that arrive within coalesce_window seconds of each other
+    are orthogonalised by a single call of orthogonalise_batch. The busier the pool, the more sets wait in the queue and the larger the batches,
+    so the cost of each set falls as the load rises.
+
+    Attributes
+    --------------
+    executor : str
+        "thread" or "process", the kind of pool the sets are orthogonalised in.
+    workers : int
+        The number of threads or processes in the pool.
+    max_pending : int
+        The largest number of sets waiting in the queue.
+    coalesce_window : float
+        The number of seconds the first small set of a batch waits for more sets to join it.
+    coalesce_size : int
+        The largest number of entries a set can have to be coalesced.
+    max_batch : int
+        The largest number of sets in one batch.
+    requests : int
+        The number of sets given to orthogonalise.
+    batches : int
+        The number of calls of orthogonalise_batch carried out.
+    coalesced : int
+        The number of sets orthogonalised by those calls.
+    """
+
+    def __init__(self,executor = "thread",workers = None,max_pending = 256,coalesce_window = 0.002,coalesce_size = default_coalesce_size,max_batch = 256):
+        """
+        Constructs all necessary attributes for the Async_Orthogonaliser object. The pool is started by the first request.
+
+        Parameters
+        -----------
+        executor : str
+            Set to "thread" as default. A value of "process" uses a pool of processes instead.
+        workers : int
+            The number of threads or processes. Defaults to the number of CPU cores when None.
+        max_pending : int
+            Set to 256 as default. The largest number of sets waiting in the queue.
+        coalesce_window : float
+            Set to 0.002 as default. The number of seconds the first small set of a batch waits for more sets to join it.
+        coalesce_size : int
+            The largest number of entries a set can have to be coalesced. Defaults to default_coalesce_size. Value of 0 turns off coalescing.
+        max_batch : int
+            Set to 256 as default. The largest number of sets in one batch.
+        """
+        if executor not in ("thread","process"):
+            print("Error: The executor should be one of ('thread', 'process'). An incorrect value of {0} has been inputted".format(executor))
+            exit()
+        self.executor = executor
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.coalesce_window = coalesce_window
+        self.coalesce_size = coalesce_size
+        self.max_batch = max_batch
+        self.requests = 0
+        self.batches = 0
+        self.coalesced = 0
+        self._loop = None
+        self._pool = None
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        self._running = set()
+
+    async def start(self):
+        """
+        Starts the pool and the task that takes sets from the queue, if they are not running already.
+        They belong to the running event loop, so an Async_Orthogonaliser is used from one event loop only.
+        """
+        if self._dispatcher is not None:
+            return
+        if self.executor == "thread":
+            self._pool = concurrent_futures.ThreadPoolExecutor(max_workers = self.workers)
+        else:
+            # the workers are not profiled, so profiling that a forked worker starts with is turned off
+            self._pool = concurrent_futures.ProcessPoolExecutor(max_workers = self.workers,initializer = _start_worker_profiling,initargs = (False,))
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize = self.max_pending)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = self._loop.create_task(self._dispatch())
+
+    async def close(self):
+        """
+        Waits for every set in the queue to be orthogonalised, then shuts down the pool.
+        """
+        if self._dispatcher is None:
+            return
+        await self._queue.put(None)
+        await self._dispatcher
+        while self._running:
+            await asyncio.gather(*list(self._running))
+        self._pool.shutdown()
+        self._dispatcher = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self,*exception):
+        await self.close()
+
+    async def orthogonalise(self,vector_set,normalised = True,accuracy = 3,engine = "loop",algorithm = "classical",report = False,block_size = None,tolerance = None,
+                            pivoting = False,precision = "double",as_array = False):
+        """
+        Orthogonalises a vector set in the pool, waiting for a place in the queue when it is full.
+        The parameters and outputs are the same as for Vector_Set.orthogonalisation, which is what is carried out for any set that is not coalesced.
+
+        Raises
+        --------
+        ValueError
+            If a setting is incorrect, with the message Vector_Set.orthogonalisation would print. The settings are checked before the set is queued,
+            as the exit() of the blocking call would close sys.stdin for the whole process rather than only the request.
+        """
+        error = _settings_error(engine_aliases.get(engine,engine),algorithm,precision,tolerance = tolerance,dimensions = _set_shape(vector_set))
+        if error is not None:
+            raise ValueError(error)
+
+        await self.start()
+        settings = {"normalised": normalised, "accuracy": accuracy, "engine": engine, "algorithm": algorithm, "report": report, "block_size": block_size,
+                    "tolerance": tolerance, "pivoting": pivoting, "precision": precision, "as_array": as_array}
+
+        # only small full rank double precision sets are coalesced, as orthogonalise_batch gives the same vectors for them
+        vectors = None
+        size = _set_size(vector_set)
+        if (size is not None and 0 < size <= self.coalesce_size and engine_aliases.get(engine,engine) in batch_engines and not _is_sparse(vector_set)
+                and not report and tolerance is None and precision == "double"):
+            try:
+                vectors = Vector_Set(vector_set).all_vectors
+            except ValueError:
+                vectors = None
+
+        future = self._loop.create_future()
+        await self._queue.put((vector_set if vectors is None else vectors,settings,vectors is not None,future))
+        self.requests += 1
+        return await future
+
+    def statistics(self):
+        """
+        Gives the counters of the Async_Orthogonaliser, which can be used to choose coalesce_window and max_batch.
+
+        Outputs
+        --------
+        statistics : dict
+            The requests, batches and coalesced sets so far, along with the number of sets waiting in the queue.
+        """
+        return {"requests": self.requests, "batches": self.batches, "coalesced": self.coalesced,
+                "pending": self._queue.qsize() if self._queue is not None else 0}
+
+    async def _dispatch(self):
+        """
+        Takes sets from the queue until close is called, gathering the small sets that arrive together into batches.
+        """
+        closing = False
+        while not closing:
+            request = await self._queue.get()
+            if request is None:
+                break
+            if not request[2]:
+                await self._submit(self._run_single(request))
+                continue
+
+            # a full queue already holds a batch, otherwise the first set waits a moment for others to join it
+            batch = [request]
+            if self._queue.qsize() < self.max_batch:
+                await asyncio.sleep(self.coalesce_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                request = self._queue.get_nowait()
+                if request is None:
+                    closing = True
+                    break
+                if request[2]:
+                    batch.append(request)
+                else:
+                    await self._submit(self._run_single(request))
+
+            groups = {}
+            for request in batch:
+                settings = request[1]
+                groups.setdefault((settings["normalised"],settings["accuracy"],settings["algorithm"]),[]).append(request)
+            for group in groups.values():
+                await self._submit(self._run_batch(group))
+
+    async def _submit(self,coroutine):
+        """
+        Runs a coroutine that uses the pool once one of the workers is free.
+        """
+        await self._slots.acquire()
+        task = self._loop.create_task(coroutine)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_single(self,request):
+        """
+        Orthogonalises a single set with Vector_Set.orthogonalisation and gives the result to its caller.
+        """
+        vector_set, settings, _, future = request
+        try:
+            result = await self._loop.run_in_executor(self._pool,_orthogonalise_request,vector_set,settings)
+        except (Exception,SystemExit) as error:
+            # the error of an incorrect setting reaches the caller, just as it would from the blocking call
+            if not future.done():
+                future.set_exception(error)
+            return
+        finally:
+            self._slots.release()
+        if not future.done():
+            future.set_result(result)
+
+    async def _run_batch(self,batch):
+        """
+        Orthogonalises a batch of sets with the same settings in one call of orthogonalise_batch and gives each result to its caller.
+        """
+        settings = batch[0][1]
+        try:
+            orthogonal_sets, ranks = await self._loop.run_in_executor(self._pool,orthogonalise_batch,[request[0] for request in batch],
+                                                                      settings["normalised"],settings["accuracy"],settings["algorithm"])
+        except (Exception,SystemExit) as error:
+            for request in batch:
+                if not request[3].done():
+                    request[3].set_exception(error)
+            return
+        finally:
+            self._slots.release()
+
+        self.batches += 1
+        self.coalesced += len(batch)
+        for request, orthogonal_set, rank in zip(batch,orthogonal_sets,ranks):
+            if rank < len(orthogonal_set):
+                # a linearly dependent set is orthogonalised on its own, so it is handled exactly as the blocking call would handle it
+                await self._submit(self._run_single(request))
+            elif not request[3].done():
+                request[3].set_result(np.array(orthogonal_set) if request[1]["as_array"] else orthogonal_set.tolist())
+
+
+async def orthogonalise_async(vector_set,normalised = True,accuracy = 3,engine = "loop",algorithm = "classical",report = False,block_size = None,tolerance = None,
+                              pivoting = False,precision = "double",as_array = False,orthogonaliser = None):
+    '''
+    Orthogonalises a vector set from asyncio code without blocking the event loop, for example "await orthogonalise_async(vector_set)".
+    The parameters and outputs are the same as for Vector_Set.orthogonalisation.
+
+    Parameters
+    ------------
+    orthogonaliser : Async_Orthogonaliser
+        Set to None as default, which uses an Async_Orthogonaliser with a thread for each CPU core, shared by every call in the same event loop.
+        Give an Async_Orthogonaliser to choose the pool, the size of the queue and how sets are coalesced.
+    '''
+    global _default_orthogonaliser
+    if orthogonaliser is None:
+        loop = asyncio.get_running_loop()
+        if _default_orthogonaliser is None or _default_orthogonaliser._loop is not loop:
+            if _default_orthogonaliser is not None and _default_orthogonaliser._pool is not None:
+                _default_orthogonaliser._pool.shutdown(wait = False)
+            _default_orthogonaliser = Async_Orthogonaliser()
+            await _default_orthogonaliser.start()
+        orthogonaliser = _default_orthogonaliser
+    return await orthogonaliser.orthogonalise(vector_set,normalised = normalised,accuracy = accuracy,engine = engine,algorithm = algorithm,report = report,
+                                              block_size = block_size,tolerance = tolerance,pivoting = pivoting,precision = precision,as_array = as_array)
+
+
+# profiling can be turned on without changing any code by setting the environment variable named by profile_variable
+if os.environ.get(profile_variable,"") not in ("","0"):
+    _profile_filename = None if os.environ[profile_variable] == "1" else os.environ[profile_variable]
+    enable_profiling(cprofile = _profile_filename is not None)
+    atexit.register(report_profile,_profile_filename)